@@ -4,7 +4,9 @@ from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
-from app.models import Base
+# The tables the migrations manage are defined in app/models.py, which the
+# app/models/ package shadows; roster_models loads it by path.
+from app.roster_models import Base
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
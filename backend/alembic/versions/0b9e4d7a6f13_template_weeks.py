@@ -0,0 +1,138 @@
+"""Template weeks
+
+Revision ID: 0b9e4d7a6f13
+Revises: f7b3d8e15c62
+Create Date: 2026-10-19 15:40:52.671930
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b9e4d7a6f13'
+down_revision: Union[str, None] = 'f7b3d8e15c62'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('template_weeks',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_weeks_id'), 'template_weeks', ['id'], unique=False)
+    op.create_index(op.f('ix_template_weeks_template_id'), 'template_weeks', ['template_id'], unique=False)
+    op.create_table('template_week_days',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('week_id', sa.Integer(), nullable=False),
+    sa.Column('day_of_week', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['week_id'], ['template_weeks.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_week_days_id'), 'template_week_days', ['id'], unique=False)
+    op.create_index(op.f('ix_template_week_days_week_id'), 'template_week_days', ['week_id'], unique=False)
+    op.create_table('template_week_day_slots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('week_day_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('time_slot_id', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['time_slot_id'], ['location_time_slots.id'], ),
+    sa.ForeignKeyConstraint(['week_day_id'], ['template_week_days.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_week_day_slots_id'), 'template_week_day_slots', ['id'], unique=False)
+    op.create_index(op.f('ix_template_week_day_slots_week_day_id'), 'template_week_day_slots', ['week_day_id'], unique=False)
+    op.create_table('template_week_day_slot_staff',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('day_slot_id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['day_slot_id'], ['template_week_day_slots.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_week_day_slot_staff_day_slot_id'), 'template_week_day_slot_staff', ['day_slot_id'], unique=False)
+    op.create_index(op.f('ix_template_week_day_slot_staff_id'), 'template_week_day_slot_staff', ['id'], unique=False)
+    op.create_table('template_week_day_slot_staff_requirements',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('slot_staff_id', sa.Integer(), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=True),
+    sa.Column('min_staff', sa.Integer(), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+    sa.ForeignKeyConstraint(['slot_staff_id'], ['template_week_day_slot_staff.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_week_day_slot_staff_requirements_id'), 'template_week_day_slot_staff_requirements', ['id'], unique=False)
+    op.create_index(op.f('ix_template_week_day_slot_staff_requirements_slot_staff_id'), 'template_week_day_slot_staff_requirements', ['slot_staff_id'], unique=False)
+    op.create_table('template_week_day_slot_staff_requirement_groups',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('requirement_id', sa.Integer(), nullable=False),
+    sa.Column('staff_group_id', sa.Integer(), nullable=True),
+    sa.Column('min_staff', sa.Integer(), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['requirement_id'], ['template_week_day_slot_staff_requirements.id'], ),
+    sa.ForeignKeyConstraint(['staff_group_id'], ['staff_groups.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_template_requirement_groups_requirement_id', 'template_week_day_slot_staff_requirement_groups', ['requirement_id'], unique=False)
+    op.create_index(op.f('ix_template_week_day_slot_staff_requirement_groups_id'), 'template_week_day_slot_staff_requirement_groups', ['id'], unique=False)
+    op.create_table('template_week_day_slot_staff_requirement_group_staff',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['group_id'], ['template_week_day_slot_staff_requirement_groups.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_template_requirement_group_staff_group_id', 'template_week_day_slot_staff_requirement_group_staff', ['group_id'], unique=False)
+    op.create_index(op.f('ix_template_week_day_slot_staff_requirement_group_staff_id'), 'template_week_day_slot_staff_requirement_group_staff', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_template_week_day_slot_staff_requirement_group_staff_id'), table_name='template_week_day_slot_staff_requirement_group_staff')
+    op.drop_index('ix_template_requirement_group_staff_group_id', table_name='template_week_day_slot_staff_requirement_group_staff')
+    op.drop_table('template_week_day_slot_staff_requirement_group_staff')
+    op.drop_index(op.f('ix_template_week_day_slot_staff_requirement_groups_id'), table_name='template_week_day_slot_staff_requirement_groups')
+    op.drop_index('ix_template_requirement_groups_requirement_id', table_name='template_week_day_slot_staff_requirement_groups')
+    op.drop_table('template_week_day_slot_staff_requirement_groups')
+    op.drop_index(op.f('ix_template_week_day_slot_staff_requirements_slot_staff_id'), table_name='template_week_day_slot_staff_requirements')
+    op.drop_index(op.f('ix_template_week_day_slot_staff_requirements_id'), table_name='template_week_day_slot_staff_requirements')
+    op.drop_table('template_week_day_slot_staff_requirements')
+    op.drop_index(op.f('ix_template_week_day_slot_staff_id'), table_name='template_week_day_slot_staff')
+    op.drop_index(op.f('ix_template_week_day_slot_staff_day_slot_id'), table_name='template_week_day_slot_staff')
+    op.drop_table('template_week_day_slot_staff')
+    op.drop_index(op.f('ix_template_week_day_slots_week_day_id'), table_name='template_week_day_slots')
+    op.drop_index(op.f('ix_template_week_day_slots_id'), table_name='template_week_day_slots')
+    op.drop_table('template_week_day_slots')
+    op.drop_index(op.f('ix_template_week_days_week_id'), table_name='template_week_days')
+    op.drop_index(op.f('ix_template_week_days_id'), table_name='template_week_days')
+    op.drop_table('template_week_days')
+    op.drop_index(op.f('ix_template_weeks_template_id'), table_name='template_weeks')
+    op.drop_index(op.f('ix_template_weeks_id'), table_name='template_weeks')
+    op.drop_table('template_weeks')
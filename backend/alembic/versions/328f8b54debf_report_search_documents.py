@@ -0,0 +1,48 @@
+"""Report search documents
+
+Revision ID: 328f8b54debf
+Revises: ad3bd9ad01ff
+Create Date: 2026-10-19 09:12:31.408115
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '328f8b54debf'
+down_revision: Union[str, None] = 'ad3bd9ad01ff'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _is_mysql() -> bool:
+    return op.get_context().dialect.name in ('mysql', 'mariadb')
+
+
+def upgrade() -> None:
+    op.create_table('report_search_documents',
+    sa.Column('report_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.Column('study', sa.String(length=255), nullable=False),
+    sa.Column('report_date', sa.Date(), nullable=True),
+    sa.Column('body', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=False),
+    sa.ForeignKeyConstraint(['owner_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('report_id')
+    )
+    op.create_index('ix_report_search_owner_date', 'report_search_documents', ['owner_id', 'report_date'], unique=False)
+    # Only the MySQL store queries this table; other databases search a local FTS5 file
+    if _is_mysql():
+        op.create_index('ft_report_search_text', 'report_search_documents', ['study', 'body'], unique=False, mysql_prefix='FULLTEXT')
+        op.create_index('ft_report_search_study', 'report_search_documents', ['study'], unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade() -> None:
+    if _is_mysql():
+        op.drop_index('ft_report_search_study', table_name='report_search_documents')
+        op.drop_index('ft_report_search_text', table_name='report_search_documents')
+    op.drop_index('ix_report_search_owner_date', table_name='report_search_documents')
+    op.drop_table('report_search_documents')
@@ -0,0 +1,44 @@
+"""Leave overlap indexes and slot coverage counts
+
+Revision ID: 539b767e9745
+Revises: 89e7f0366bb2
+Create Date: 2026-10-19 10:52:40.117386
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '539b767e9745'
+down_revision: Union[str, None] = '89e7f0366bb2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_leave_requests_overlap', 'leave_requests', ['status', 'active', 'end_date', 'start_date', 'staff_id'], unique=False)
+    op.create_index('ix_leave_requests_staff_dates', 'leave_requests', ['staff_id', 'end_date', 'start_date'], unique=False)
+    op.create_index('ix_roster_assignments_staff_date', 'roster_assignments', ['staff_id', 'date'], unique=False)
+    op.create_table('slot_coverage_counts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('time_slot_id', sa.Integer(), nullable=False),
+    sa.Column('staffed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['time_slot_id'], ['location_time_slots.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('date', 'time_slot_id', name='uq_slot_coverage_count')
+    )
+    op.create_index(op.f('ix_slot_coverage_counts_id'), 'slot_coverage_counts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_slot_coverage_counts_id'), table_name='slot_coverage_counts')
+    op.drop_table('slot_coverage_counts')
+    op.drop_index('ix_roster_assignments_staff_date', table_name='roster_assignments')
+    op.drop_index('ix_leave_requests_staff_dates', table_name='leave_requests')
+    op.drop_index('ix_leave_requests_overlap', table_name='leave_requests')
@@ -0,0 +1,61 @@
+"""Reports and templates
+
+Revision ID: 5e0c9a7d4b21
+Revises: d2c4b15a1796
+Create Date: 2026-10-19 14:02:41.318245
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import mysql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0c9a7d4b21'
+down_revision: Union[str, None] = 'd2c4b15a1796'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('templates',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('name', sa.String(length=255), nullable=False),
+    sa.Column('description', sa.String(length=300), nullable=True),
+    sa.Column('template_text', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=False),
+    sa.Column('template_html', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_templates_id'), 'templates', ['id'], unique=False)
+    op.create_index('ix_templates_name', 'templates', ['name'], unique=False)
+    op.create_table('reports',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('unique_identifier', sa.String(length=36), nullable=False),
+    sa.Column('report_by', sa.Integer(), nullable=False),
+    sa.Column('template_used', sa.Integer(), nullable=True),
+    sa.Column('report_data', sa.Text().with_variant(mysql.LONGTEXT(), 'mysql'), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['report_by'], ['users.id'], ),
+    sa.ForeignKeyConstraint(['template_used'], ['templates.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('unique_identifier')
+    )
+    op.create_index(op.f('ix_reports_id'), 'reports', ['id'], unique=False)
+    op.create_index('ix_reports_owner', 'reports', ['report_by', 'active'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_reports_owner', table_name='reports')
+    op.drop_index(op.f('ix_reports_id'), table_name='reports')
+    op.drop_table('reports')
+    op.drop_index('ix_templates_name', table_name='templates')
+    op.drop_index(op.f('ix_templates_id'), table_name='templates')
+    op.drop_table('templates')
@@ -0,0 +1,116 @@
+"""Template parts
+
+Revision ID: 6c1f0a83d5e7
+Revises: 0b9e4d7a6f13
+Create Date: 2026-10-19 16:12:37.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c1f0a83d5e7'
+down_revision: Union[str, None] = '0b9e4d7a6f13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('template_time_slots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.String(length=5), nullable=False),
+    sa.Column('end_time', sa.String(length=5), nullable=False),
+    sa.Column('days_of_week', sa.String(length=50), nullable=False),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_time_slots_id'), 'template_time_slots', ['id'], unique=False)
+    op.create_index(op.f('ix_template_time_slots_template_id'), 'template_time_slots', ['template_id'], unique=False)
+    op.create_table('template_helpers',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('location_id', sa.Integer(), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['location_id'], ['locations.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_helpers_id'), 'template_helpers', ['id'], unique=False)
+    op.create_index(op.f('ix_template_helpers_template_id'), 'template_helpers', ['template_id'], unique=False)
+    op.create_table('template_slots',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('time_slot_id', sa.Integer(), nullable=False),
+    sa.Column('day_of_week', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ),
+    sa.ForeignKeyConstraint(['time_slot_id'], ['template_time_slots.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_slots_id'), 'template_slots', ['id'], unique=False)
+    op.create_index(op.f('ix_template_slots_template_id'), 'template_slots', ['template_id'], unique=False)
+    op.create_table('template_requirements',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('slot_id', sa.Integer(), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=True),
+    sa.Column('min_staff', sa.Integer(), nullable=True),
+    sa.Column('max_staff', sa.Integer(), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+    sa.ForeignKeyConstraint(['slot_id'], ['template_slots.id'], ),
+    sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_requirements_id'), 'template_requirements', ['id'], unique=False)
+    op.create_index(op.f('ix_template_requirements_template_id'), 'template_requirements', ['template_id'], unique=False)
+    op.create_table('template_staff',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('template_id', sa.Integer(), nullable=False),
+    sa.Column('slot_id', sa.Integer(), nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['slot_id'], ['template_slots.id'], ),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.ForeignKeyConstraint(['template_id'], ['templates.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_template_staff_id'), 'template_staff', ['id'], unique=False)
+    op.create_index(op.f('ix_template_staff_template_id'), 'template_staff', ['template_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_template_staff_template_id'), table_name='template_staff')
+    op.drop_index(op.f('ix_template_staff_id'), table_name='template_staff')
+    op.drop_table('template_staff')
+    op.drop_index(op.f('ix_template_requirements_template_id'), table_name='template_requirements')
+    op.drop_index(op.f('ix_template_requirements_id'), table_name='template_requirements')
+    op.drop_table('template_requirements')
+    op.drop_index(op.f('ix_template_slots_template_id'), table_name='template_slots')
+    op.drop_index(op.f('ix_template_slots_id'), table_name='template_slots')
+    op.drop_table('template_slots')
+    op.drop_index(op.f('ix_template_helpers_template_id'), table_name='template_helpers')
+    op.drop_index(op.f('ix_template_helpers_id'), table_name='template_helpers')
+    op.drop_table('template_helpers')
+    op.drop_index(op.f('ix_template_time_slots_template_id'), table_name='template_time_slots')
+    op.drop_index(op.f('ix_template_time_slots_id'), table_name='template_time_slots')
+    op.drop_table('template_time_slots')
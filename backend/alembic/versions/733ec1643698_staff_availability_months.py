@@ -0,0 +1,39 @@
+"""Staff availability months
+
+Revision ID: 733ec1643698
+Revises: e04f9338d3f6
+Create Date: 2026-10-19 10:05:52.630417
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '733ec1643698'
+down_revision: Union[str, None] = 'e04f9338d3f6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('staff_availability_months',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('shift_type', sa.String(length=20), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('bits', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('staff_id', 'shift_type', 'month', name='uq_staff_availability_month')
+    )
+    op.create_index(op.f('ix_staff_availability_months_id'), 'staff_availability_months', ['id'], unique=False)
+    op.create_index('ix_staff_availability_month_shift', 'staff_availability_months', ['shift_type', 'month'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_staff_availability_month_shift', table_name='staff_availability_months')
+    op.drop_index(op.f('ix_staff_availability_months_id'), table_name='staff_availability_months')
+    op.drop_table('staff_availability_months')
@@ -0,0 +1,37 @@
+"""Availability daily counts
+
+Revision ID: 89e7f0366bb2
+Revises: 733ec1643698
+Create Date: 2026-10-19 10:31:18.904722
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '89e7f0366bb2'
+down_revision: Union[str, None] = '733ec1643698'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('availability_daily_counts',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('shift_type', sa.String(length=20), nullable=False),
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.Column('group_id', sa.Integer(), nullable=False),
+    sa.Column('available', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('date', 'shift_type', 'role_id', 'group_id', name='uq_availability_daily_count')
+    )
+    op.create_index(op.f('ix_availability_daily_counts_id'), 'availability_daily_counts', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_availability_daily_counts_id'), table_name='availability_daily_counts')
+    op.drop_table('availability_daily_counts')
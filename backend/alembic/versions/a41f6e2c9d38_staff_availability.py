@@ -0,0 +1,42 @@
+"""Staff availability
+
+Revision ID: a41f6e2c9d38
+Revises: 5e0c9a7d4b21
+Create Date: 2026-10-19 14:31:07.842116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a41f6e2c9d38'
+down_revision: Union[str, None] = '5e0c9a7d4b21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('staff_availability',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('date', sa.Date(), nullable=False),
+    sa.Column('shift_type', sa.String(length=20), nullable=False),
+    sa.Column('is_available', sa.Boolean(), nullable=False),
+    sa.Column('note', sa.String(length=300), nullable=True),
+    sa.Column('date_created', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('date_modified', sa.TIMESTAMP(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('active', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_staff_availability_id'), 'staff_availability', ['id'], unique=False)
+    op.create_index('ix_staff_availability_staff_date', 'staff_availability', ['staff_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_staff_availability_staff_date', table_name='staff_availability')
+    op.drop_index(op.f('ix_staff_availability_id'), table_name='staff_availability')
+    op.drop_table('staff_availability')
@@ -0,0 +1,39 @@
+"""Leave balances
+
+Revision ID: d2c4b15a1796
+Revises: 539b767e9745
+Create Date: 2026-10-19 11:07:18.562904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2c4b15a1796'
+down_revision: Union[str, None] = '539b767e9745'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('leave_balances',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('staff_id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('leave_type', sa.String(length=20), nullable=False),
+    sa.Column('days_used', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['staff_id'], ['staff.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('staff_id', 'year', 'leave_type', name='uq_leave_balance')
+    )
+    op.create_index(op.f('ix_leave_balances_id'), 'leave_balances', ['id'], unique=False)
+    op.create_index('ix_leave_balances_year', 'leave_balances', ['year', 'staff_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_leave_balances_year', table_name='leave_balances')
+    op.drop_index(op.f('ix_leave_balances_id'), table_name='leave_balances')
+    op.drop_table('leave_balances')
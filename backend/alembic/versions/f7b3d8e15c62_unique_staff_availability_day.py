@@ -0,0 +1,38 @@
+"""Unique staff availability day
+
+Revision ID: f7b3d8e15c62
+Revises: a41f6e2c9d38
+Create Date: 2026-10-19 14:58:23.104395
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7b3d8e15c62'
+down_revision: Union[str, None] = 'a41f6e2c9d38'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keep the newest record of any (staff_id, date, shift_type) entered more than once;
+    # the derived table lets MySQL read the table it deletes from
+    op.execute(
+        "DELETE FROM staff_availability WHERE id NOT IN ("
+        "SELECT id FROM (SELECT MAX(id) AS id FROM staff_availability "
+        "GROUP BY staff_id, date, shift_type) AS newest)"
+    )
+    # The unique key leads with staff_id, so it also serves the staff_id foreign key
+    with op.batch_alter_table('staff_availability') as batch_op:
+        batch_op.create_unique_constraint('uq_staff_availability_day', ['staff_id', 'date', 'shift_type'])
+        batch_op.drop_index('ix_staff_availability_staff_date')
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('staff_availability') as batch_op:
+        batch_op.create_index('ix_staff_availability_staff_date', ['staff_id', 'date'], unique=False)
+        batch_op.drop_constraint('uq_staff_availability_day', type_='unique')
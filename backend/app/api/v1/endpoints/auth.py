@@ -6,8 +6,9 @@ from typing import List
 
 from app import models, schemas, auth
 from app.database import get_db
+from app.metrics import InstrumentedAPIRoute
 from app.models.base import User
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedAPIRoute)
 
 @router.get("/test")
 def test_endpoint():
@@ -4,8 +4,9 @@ from typing import List
 
 from app import models, schemas, auth
 from app.database import get_db
+from app.metrics import InstrumentedAPIRoute
 
-router = APIRouter()
+router = APIRouter(route_class=InstrumentedAPIRoute)
 
 @router.post("/", response_model=schemas.Availability)
 def create_availability(
@@ -0,0 +1,187 @@
+"""
+Daily availability counts for the team heatmap.
+
+availability_daily_counts holds, for every date, shift type, role and staff
+group, how many active staff are available and not on approved leave. The
+counts are kept current by deltas rather than recounted:
+
+    availability  set_days() reports which bits it actually flipped, and
+                  each flipped day off leave moves one count by +-1
+    leave         a leave approved (or no longer approved) moves the counts
+                  of the days it adds (or frees), for every shift type the
+                  staff member is available on, by -1 (or +1); days already
+                  covered by the staff member's other approved leave do not
+                  count twice
+
+so a quarter-wide heatmap is one indexed range read. Changes this module
+does not see (a staff member's role, group or active flag, bulk SQL) are
+corrected by `python -m app.rebuild availability_aggregates`.
+"""
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .leave_overlap import changed_leave_days, leave_days, overlapping_leave
+from .reference_data import get_reference_data
+from .upsert import add_deltas, replace_rows
+
+NO_GROUP = 0  # group_id stored for staff without a group, so the unique key holds
+
+CountKey = Tuple[date, str, int, int]  # date, shift_type, role_id, group_id
+
+
+def _days(start: date, end: date) -> List[date]:
+    return [start + timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _bit_days(month: date, bits: int) -> List[date]:
+    return [month.replace(day=i + 1) for i in range(31) if bits >> i & 1]
+
+
+def _staff_key(db: Session, staff_id: int) -> Optional[Tuple[int, int]]:
+    """(role_id, group_id) of an active staff member, None otherwise."""
+    staff = db.execute(
+        select(models.Staff.role_id, models.Staff.group_id)
+        .where(models.Staff.id == staff_id, models.Staff.active == True)
+    ).first()
+    return (staff.role_id, staff.group_id or NO_GROUP) if staff else None
+
+
+def _leave_days(db: Session, staff_id: int, start: date, end: date) -> Set[date]:
+    """Days in [start, end] covered by the staff member's approved leave."""
+    intervals = overlapping_leave(db, start, end, ("approved",), [staff_id])
+    return leave_days(intervals, start, end).get(staff_id, set())
+
+
+def apply_deltas(db: Session, deltas: Dict[CountKey, int]) -> None:
+    """Add the deltas to their counts with one upsert. Does not commit."""
+    add_deltas(db, models.AvailabilityDailyCount, ["date", "shift_type", "role_id", "group_id"], "available", deltas)
+
+
+def availability_changed(db: Session, staff_id: int, shift_type: str,
+                         flipped: Dict[date, Tuple[int, int]]) -> None:
+    """
+    Count the days whose bits set_days() flipped, as {month: (bits set,
+    bits cleared)}. Does not commit.
+    """
+    flipped = {month: change for month, change in flipped.items() if any(change)}
+    key = _staff_key(db, staff_id) if flipped else None
+    if key is None:
+        return
+    start = min(flipped)
+    end = max(flipped) + timedelta(days=31)
+    on_leave = _leave_days(db, staff_id, start, end)
+    deltas: Dict[CountKey, int] = defaultdict(int)
+    for month, (added, removed) in flipped.items():
+        for day in _bit_days(month, added):
+            if day not in on_leave:
+                deltas[(day, shift_type, *key)] += 1
+        for day in _bit_days(month, removed):
+            if day not in on_leave:
+                deltas[(day, shift_type, *key)] -= 1
+    apply_deltas(db, deltas)
+
+
+def leave_changed(db: Session, leave_id: int, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Move the counts for a leave request that changed from `before` to
+    `after` (app.leave_overlap.leave_snapshot()s; None when it did not exist). Does not commit.
+    """
+    # Give back the days the leave covered, then take the days it covers now
+    deltas: Dict[CountKey, int] = defaultdict(int)
+    for staff_id, start, end, days, sign in changed_leave_days(db, leave_id, before, after):
+        key = _staff_key(db, staff_id)
+        if key is None:
+            continue
+        for shift_type, day in _available_days(db, staff_id, start, end):
+            if day in days:
+                deltas[(day, shift_type, *key)] += sign
+    apply_deltas(db, deltas)
+
+
+def _available_days(db: Session, staff_id: int, start: date, end: date) -> Iterable[Tuple[str, date]]:
+    Month = models.StaffAvailabilityMonth
+    rows = db.execute(select(Month.shift_type, Month.month, Month.bits).where(
+        Month.staff_id == staff_id,
+        Month.month >= start.replace(day=1),
+        Month.month <= end,
+    ))
+    for shift_type, month, bits in rows:
+        for day in _bit_days(month, bits):
+            if start <= day <= end:
+                yield shift_type, day
+
+
+def heatmap(db: Session, start: date, end: date, by: str = "role",
+            shift_types: Optional[List[str]] = None) -> dict:
+    """
+    Available staff per (date, shift type, role or group) from the counts,
+    and the staff the open locations require per (date, role or group).
+    """
+    if by not in ("role", "group"):
+        raise ValueError("by must be role or group")
+    Count = models.AvailabilityDailyCount
+    key = Count.role_id if by == "role" else Count.group_id
+    query = (
+        select(Count.date, Count.shift_type, key, func.sum(Count.available))
+        .where(Count.date >= start, Count.date <= end)
+        .group_by(Count.date, Count.shift_type, key)
+        .order_by(Count.date, Count.shift_type, key)
+    )
+    if shift_types:
+        query = query.where(Count.shift_type.in_(shift_types))
+    reference = get_reference_data(db)
+    names = reference.roles if by == "role" else reference.staff_groups
+    available = [
+        {"date": day, "shift_type": shift_type, "id": key_id or None, "name": names.get(key_id), "count": int(count)}
+        for day, shift_type, key_id, count in db.execute(query) if count
+    ]
+
+    Requirement = models.LocationStaffRequirement
+    requirement_key = Requirement.role_id if by == "role" else Requirement.group_id
+    weekly: Dict[int, Dict[int, int]] = defaultdict(lambda: defaultdict(int))  # location -> key -> staff
+    for location_id, key_id, min_staff in db.execute(
+        select(Requirement.location_id, requirement_key, Requirement.min_staff)
+        .where(Requirement.active == True, requirement_key.isnot(None))
+    ):
+        weekly[location_id][key_id] += min_staff or 0
+    required = []
+    for day in _days(start, end):
+        totals: Dict[int, int] = defaultdict(int)
+        for location_id in {slot.location_id for slot in reference.slots_on(day)}:
+            for key_id, staff in weekly.get(location_id, {}).items():
+                totals[key_id] += staff
+        required.extend(
+            {"date": day, "id": key_id, "name": names.get(key_id), "count": staff}
+            for key_id, staff in sorted(totals.items()) if staff
+        )
+    return {"start_date": start, "end_date": end, "by": by, "available": available, "required": required}
+
+
+def rebuild(db: Session) -> int:
+    """Recount everything from the bitmaps and approved leave and commit; returns the counts written."""
+    Month, Staff, Leave = models.StaffAvailabilityMonth, models.Staff, models.LeaveRequest
+    leave: Dict[int, Set[date]] = defaultdict(set)
+    for staff_id, leave_start, leave_end in db.execute(
+        select(Leave.staff_id, Leave.start_date, Leave.end_date)
+        .where(Leave.active == True, Leave.status == "approved")
+    ):
+        leave[staff_id].update(_days(leave_start.date(), leave_end.date()))
+    counts: Dict[CountKey, int] = defaultdict(int)
+    for staff_id, role_id, group_id, shift_type, month, bits in db.execute(
+        select(Month.staff_id, Staff.role_id, Staff.group_id, Month.shift_type, Month.month, Month.bits)
+        .join(Staff, Staff.id == Month.staff_id)
+        .where(Staff.active == True)
+    ).yield_per(10000):
+        for day in _bit_days(month, bits):
+            if day not in leave[staff_id]:
+                counts[(day, shift_type, role_id, group_id or NO_GROUP)] += 1
+    rows = [
+        {"date": day, "shift_type": shift_type, "role_id": role_id, "group_id": group_id, "available": count}
+        for (day, shift_type, role_id, group_id), count in counts.items()
+    ]
+    return replace_rows(db, models.AvailabilityDailyCount, rows)
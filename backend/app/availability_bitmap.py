@@ -0,0 +1,207 @@
+"""
+Staff availability as one bitmap per staff member, shift type and month.
+
+Bit d - 1 of a month's `bits` is set when the staff member is available on
+day d. A month is one row however many days are marked, ranges are set or
+cleared with one locked read and one update per call, and questions
+such as "who is available on all of these days" are answered by loading the
+months involved once and comparing masks:
+
+    staff available on every day  <=>  (bits & wanted) == wanted, per month
+
+For a roster solve, `availability_bits` gives each staff member's range as a
+single integer (bit i = start + i days), so intersecting staff, counting
+days (int.bit_count) or testing a day are plain integer operations.
+
+The per-day StaffAvailability rows remain the record of what staff entered;
+the availability endpoints keep the bitmaps in step with them, and
+`python -m app.rebuild availability_bitmap` recreates the bitmaps from them.
+Every change also updates the daily counts in app.availability_aggregates.
+"""
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .availability_aggregates import availability_changed, rebuild as rebuild_counts
+from .upsert import insert_missing, replace_rows
+
+MAX_RANGE_DAYS = 366
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return (month + timedelta(days=32)).replace(day=1)
+
+
+def as_date(day) -> date:
+    """A date, or the date of a datetime."""
+    return day.date() if isinstance(day, datetime) else day
+
+
+def month_masks(days: Iterable[date]) -> Dict[date, int]:
+    """The bits of the given days, by month."""
+    masks: Dict[date, int] = defaultdict(int)
+    for day in days:
+        day = as_date(day)
+        masks[month_start(day)] |= 1 << (day.day - 1)
+    return dict(masks)
+
+
+def range_masks(start: date, end: date, weekdays: Optional[Set[int]] = None) -> Dict[date, int]:
+    """
+    Bits of the days from `start` to `end` inclusive, by month; with
+    `weekdays` (ISO, 1 = Monday) only those days of the week.
+    """
+    if end < start:
+        raise ValueError("end_date is before start_date")
+    if (end - start).days >= MAX_RANGE_DAYS:
+        raise ValueError(f"At most {MAX_RANGE_DAYS} days at a time")
+    if not weekdays:
+        masks = {}
+        month = month_start(start)
+        while month <= end:
+            first = max(start, month).day
+            last = min(end, next_month(month) - timedelta(days=1)).day
+            masks[month] = ((1 << last) - 1) ^ ((1 << (first - 1)) - 1)
+            month = next_month(month)
+        return masks
+    days = (start + timedelta(days=i) for i in range((end - start).days + 1))
+    return month_masks(day for day in days if day.isoweekday() in weekdays)
+
+
+def set_days(db: Session, staff_id: int, shift_type: str, masks: Dict[date, int], available: bool) -> None:
+    """
+    Mark the days in `masks` available (or not) and update the daily counts
+    by the days that actually changed. Does not commit, so it can join the
+    transaction that changed the rows.
+    """
+    if not masks:
+        return
+    Month = models.StaffAvailabilityMonth
+    if available:
+        # FOR UPDATE locks nothing for a month without a row, so two first writes
+        # would both count its days; create the missing months empty, then lock them
+        insert_missing(db, Month, [
+            {"staff_id": staff_id, "shift_type": shift_type, "month": month, "bits": 0} for month in masks
+        ], ["staff_id", "shift_type", "month"])
+    current = dict(db.execute(
+        select(Month.month, Month.bits)
+        .where(Month.staff_id == staff_id, Month.shift_type == shift_type, Month.month.in_(list(masks)))
+        .with_for_update()
+    ).all())
+    # Months without a row have nothing to clear
+    bits = {
+        month: current[month] | mask if available else current[month] & ~mask
+        for month, mask in masks.items() if month in current
+    }
+    changed = [month for month in bits if bits[month] != current[month]]
+    if changed:
+        # On the Core table, since an ORM update with a list of parameters expects primary keys
+        table = Month.__table__
+        db.execute(
+            update(table)
+            .where(table.c.staff_id == staff_id, table.c.shift_type == shift_type, table.c.month == bindparam("m"))
+            .values(bits=bindparam("new_bits")),
+            [{"m": month, "new_bits": bits[month]} for month in changed],
+        )
+    availability_changed(db, staff_id, shift_type, {
+        month: (bits[month] & ~current[month], current[month] & ~bits[month]) for month in changed
+    })
+
+
+def _months(start: date, end: date) -> List[date]:
+    months, month = [], month_start(start)
+    while month <= end:
+        months.append(month)
+        month = next_month(month)
+    return months
+
+
+def _load(db: Session, shift_type: str, months: List[date],
+          staff_ids: Optional[Iterable[int]] = None) -> Dict[int, Dict[date, int]]:
+    """Bitmaps of active staff for the months, as {staff_id: {month: bits}}; one query."""
+    Month, Staff = models.StaffAvailabilityMonth, models.Staff
+    query = (
+        select(Month.staff_id, Month.month, Month.bits)
+        .join(Staff, Staff.id == Month.staff_id)
+        .where(Month.shift_type == shift_type, Month.month.in_(months), Staff.active == True)
+    )
+    if staff_ids is not None:
+        query = query.where(Month.staff_id.in_(list(staff_ids)))
+    bitmaps: Dict[int, Dict[date, int]] = defaultdict(dict)
+    for staff_id, month, bits in db.execute(query):
+        bitmaps[staff_id][month] = bits
+    return bitmaps
+
+
+def available_staff(db: Session, days: Iterable[date], shift_type: str,
+                    staff_ids: Optional[Iterable[int]] = None) -> List[int]:
+    """Ids of active staff available for `shift_type` on every one of `days`."""
+    wanted = month_masks(days)
+    if not wanted:
+        return []
+    bitmaps = _load(db, shift_type, list(wanted), staff_ids)
+    return sorted(
+        staff_id for staff_id, months in bitmaps.items()
+        if all(months.get(month, 0) & mask == mask for month, mask in wanted.items())
+    )
+
+
+def availability_bits(db: Session, start: date, end: date, shift_type: str,
+                      staff_ids: Optional[Iterable[int]] = None) -> Dict[int, int]:
+    """
+    Each active staff member's availability from `start` to `end` as one
+    integer, bit i set when available on start + i days. Staff with no
+    available day in the range are left out.
+    """
+    if end < start:
+        raise ValueError("end_date is before start_date")
+    length = (end - start).days + 1
+    result = {}
+    for staff_id, months in _load(db, shift_type, _months(start, end), staff_ids).items():
+        bits = 0
+        for month, month_bits in months.items():
+            offset = (month - start).days
+            bits |= month_bits << offset if offset >= 0 else month_bits >> -offset
+        bits &= (1 << length) - 1
+        if bits:
+            result[staff_id] = bits
+    return result
+
+
+def days_of(bits: int, start: date) -> List[date]:
+    days = []
+    while bits:
+        low = bits & -bits
+        days.append(start + timedelta(days=low.bit_length() - 1))
+        bits ^= low
+    return days
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recreate every bitmap from the active StaffAvailability rows, then the
+    daily counts from the bitmaps, and commit; returns the bitmaps written.
+    """
+    Availability, Month = models.StaffAvailability, models.StaffAvailabilityMonth
+    masks: Dict[Tuple[int, str, date], int] = defaultdict(int)
+    query = select(Availability.staff_id, Availability.shift_type, Availability.date).where(
+        Availability.active == True, Availability.is_available == True
+    )
+    for staff_id, shift_type, day in db.execute(query).yield_per(10000):
+        day = as_date(day)
+        masks[(staff_id, shift_type, month_start(day))] |= 1 << (day.day - 1)
+    rows = [
+        {"staff_id": staff_id, "shift_type": shift_type, "month": month, "bits": bits}
+        for (staff_id, shift_type, month), bits in masks.items()
+    ]
+    count = replace_rows(db, Month, rows)
+    rebuild_counts(db)
+    return count
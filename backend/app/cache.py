@@ -0,0 +1,64 @@
+"""
+Size-bounded in-process caches.
+
+Hits and misses of every cache are counted in cache_lookups_total, labelled
+with the cache's name.
+"""
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Tuple
+
+from .metrics import Counter, registry
+
+CACHE_LOOKUPS = registry.register(Counter(
+    "cache_lookups_total",
+    "In-process cache lookups by cache and outcome (hit, miss).",
+    ("cache", "outcome"),
+))
+
+
+class LRUCache:
+    """
+    Least-recently-used map bounded by the total `sizeof` of its values.
+
+    Values larger than the whole cache are not stored. Access is locked, so
+    a cache may be shared between threads.
+    """
+
+    def __init__(self, name: str, max_size: int, sizeof: Callable[[Any], int] = lambda value: 1):
+        self.name = name
+        self.max_size = max_size
+        self.sizeof = sizeof
+        self.size = 0
+        self._items: "OrderedDict[Any, Tuple[Any, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+        CACHE_LOOKUPS.inc(cache=self.name, outcome="hit" if item is not None else "miss")
+        return item[0] if item is not None else None
+
+    def put(self, key, value) -> None:
+        size = self.sizeof(value)
+        if size > self.max_size:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= old[1]
+            self._items[key] = (value, size)
+            self.size += size
+            while self.size > self.max_size:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+
+    def __len__(self):
+        return len(self._items)
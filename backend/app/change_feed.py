@@ -0,0 +1,152 @@
+"""
+Change feed for roster data.
+
+Every committed insert, update or delete of a roster assignment, leave request
+or staff availability row is turned into a compact delta and published to the
+live-update hub, which stamps it with a monotonic sequence number:
+
+    {"type": "change", "data": {"seq": 42, "entity": "roster_assignment",
+     "op": "update", "id": 7, "changes": {"location_id": 3}}}
+
+Inserts carry the loaded column values, updates only the columns that changed
+and deletes (including soft deletes through ``active``) only the id. Clients
+resume after a reconnect by subscribing with the last seq they saw.
+
+Flushed objects are picked up by a Session hook. Bulk statements (Query.update,
+upserts, multi-row INSERTs) never reach it, so the code issuing them queues
+its deltas with row_changed(), or rows_changed() for a "bulk" delta that
+tells clients to reload a range. Either way they are published on commit and
+dropped on rollback.
+"""
+import logging
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from .realtime import Event, FanoutHub, as_date
+
+logger = logging.getLogger("database")
+
+# table name -> (entity name, start date column, end date column)
+TRACKED_TABLES: Dict[str, Tuple[str, str, Optional[str]]] = {
+    "roster_assignments": ("roster_assignment", "date", None),
+    "leave_requests": ("leave_request", "start_date", "end_date"),
+    "staff_availability": ("staff_availability", "date", None),
+}
+
+# Bookkeeping columns that never need to reach clients
+IGNORED_COLUMNS = {"date_created", "date_modified"}
+
+_PENDING_KEY = "change_feed_pending"
+
+
+def _tracked(obj) -> Optional[Tuple[str, str, Optional[str]]]:
+    return TRACKED_TABLES.get(getattr(obj, "__tablename__", None))
+
+
+def _columns(state) -> List[str]:
+    return [attr.key for attr in state.mapper.column_attrs if attr.key not in IGNORED_COLUMNS]
+
+
+def _delta(obj, op: str) -> Optional[Event]:
+    state = inspect(obj)
+    loaded = state.dict
+
+    if op == "insert":
+        changes = {key: loaded[key] for key in _columns(state) if loaded.get(key) is not None}
+    elif op == "update":
+        changes = {}
+        for key in _columns(state):
+            history = state.attrs[key].history
+            if history.added or history.deleted:
+                changes[key] = history.added[0] if history.added else None
+        if not changes:
+            return None
+    return _event(obj.__tablename__, op, loaded, changes)
+
+
+def _event(table: str, op: str, values: Dict[str, Any], changes: Dict[str, Any]) -> Event:
+    """The delta for one row: `values` address it, `changes` are what is sent."""
+    entity, start_column, end_column = TRACKED_TABLES[table]
+    if op == "delete" or (op == "update" and changes.get("active") is False):
+        op, changes = "delete", {}
+    changes = {key: value for key, value in changes.items() if key != "id" and key not in IGNORED_COLUMNS}
+    data = {"entity": entity, "op": op, "id": values.get("id")}
+    if changes:
+        data["changes"] = changes
+    return Event(
+        type="change",
+        data=data,
+        key=f"{entity}:{data['id']}",
+        location_id=values.get("location_id"),
+        staff_id=values.get("staff_id"),
+        start_date=as_date(values.get(start_column)),
+        end_date=as_date(values.get(end_column)) if end_column else None,
+    )
+
+
+def _after_flush(session, flush_context):
+    pending = session.info.setdefault(_PENDING_KEY, [])
+    for op, objects in (("insert", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for obj in objects:
+            if _tracked(obj) is None:
+                continue
+            if op == "update" and not session.is_modified(obj, include_collections=False):
+                continue
+            delta = _delta(obj, op)
+            if delta is not None:
+                pending.append(delta)
+
+
+def row_changed(session: Session, table: str, op: str, values: Dict[str, Any],
+                changes: Optional[Dict[str, Any]] = None) -> None:
+    """
+    Queue the delta for a row of `table` written by a bulk statement.
+    `values` is the row after the write, with its id; `changes` what the
+    statement set, by default all of `values`.
+    """
+    session.info.setdefault(_PENDING_KEY, []).append(
+        _event(table, op, values, values if changes is None else changes)
+    )
+
+
+def rows_changed(session: Session, table: str, start: date, end: date,
+                 location_id: Optional[int] = None, staff_id: Optional[int] = None) -> None:
+    """
+    Queue a "bulk" delta: rows of `table` at the location and/or staff
+    member changed between start and end (inclusive) in ways too many to
+    list, so subscribers should reload that range.
+    """
+    entity = TRACKED_TABLES[table][0]
+    data = {"entity": entity, "op": "bulk", "location_id": location_id, "staff_id": staff_id,
+            "start_date": start.isoformat(), "end_date": end.isoformat()}
+    session.info.setdefault(_PENDING_KEY, []).append(Event(
+        type="change",
+        data=data,
+        key=f"{entity}:bulk:{location_id}:{staff_id}:{start}:{end}",
+        location_id=location_id,
+        staff_id=staff_id,
+        start_date=start,
+        end_date=end,
+    ))
+
+
+def _discard(session, *args):
+    session.info.pop(_PENDING_KEY, None)
+
+
+def install_change_feed(hub: FanoutHub) -> None:
+    """Publish deltas for every session commit in this process."""
+    if event.contains(Session, "after_flush", _after_flush):
+        return
+
+    def after_commit(session):
+        deltas = session.info.pop(_PENDING_KEY, None)
+        if deltas:
+            hub.publish_threadsafe(*deltas)
+
+    event.listen(Session, "after_flush", _after_flush)
+    event.listen(Session, "after_commit", after_commit)
+    event.listen(Session, "after_rollback", _discard)
@@ -2,4 +2,12 @@ from .config import settings
 from .database import get_db
 from .database import Base
 from .database import engine
-from .redis_db import redis
\ No newline at end of file
+
+
+def __getattr__(name):
+    # redis_om is slow to import and connects on first use, so only load it
+    # when something actually asks for the client.
+    if name == "redis":
+        from .redis_db import redis
+        return redis
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
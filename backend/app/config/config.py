@@ -35,6 +35,55 @@ class Settings(BaseSettings):
     allowed_methods: list = ["*"]
     allowed_headers: list = ["*"]
 
+    # Observability settings
+    metrics_enabled: bool = True
+    metrics_token: Optional[str] = None
+    sql_profiling_enabled: bool = False
+    sql_slow_query_ms: float = 100.0
+    sql_n_plus_one_threshold: int = 5
+
+    # Startup settings (disable create_all when the schema is managed by Alembic)
+    db_create_all: bool = True
+    log_routes: bool = False
+
+    # Seconds before a worker rebuilds its cached roles/groups/locations (0 = never)
+    reference_data_ttl_seconds: int = 300
+
+    # Live roster updates over WebSocket ("memory" for a single worker, "redis" across workers)
+    realtime_backend: str = "memory"
+    realtime_channel: str = "roster:events"
+    ws_send_queue_size: int = 256
+    ws_send_timeout_seconds: float = 5.0
+    change_feed_retain: int = 10000  # changes kept for resume-from-seq
+
+    # Report extraction model ("local" runs it in this worker, "redis" queues jobs for `python -m app.infer`)
+    inference_backend: str = "local"
+    inference_model: str = "deepseek-vl2"  # deepseek-vl2, deepseek-vl2-int8 or regex
+    inference_models_by_report_type: dict = {}  # e.g. {"thyroid": "regex"}
+    inference_model_path: str = "deepseek-ai/deepseek-vl2-tiny"
+    inference_device: str = "auto"  # auto, cpu or cuda
+    inference_dtype: str = "auto"
+    inference_max_new_tokens: int = 512
+    inference_image_cache_mb: int = 512  # image features kept per model, by image hash
+    inference_prefix_cache_size: int = 16  # prompt prefixes whose KV cache is kept (0 = off)
+    inference_max_batch_size: int = 4
+    inference_max_batch_wait_ms: float = 50.0
+    inference_queue_size: int = 64
+    inference_queue_prefix: str = "inference"
+    inference_job_ttl_seconds: int = 3600
+
+    # Template rendering caches
+    template_compiled_cache_size: int = 512  # compiled templates, by id and version
+    template_render_cache_mb: int = 64  # rendered HTML, by template version and values
+
+    # Report search ("auto" uses MySQL FULLTEXT on MySQL and a local SQLite FTS5 file otherwise)
+    report_search_backend: str = "auto"  # auto, mysql or sqlite
+    report_search_path: str = "report_search.db"
+    report_draft_cache_mb: int = 64  # recent draft versions kept in memory per worker
+
+    # Leave balances
+    leave_entitlement_days: float = 25.0  # a year at 1.0 FTE, pro rata by FTE
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
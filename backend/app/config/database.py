@@ -3,9 +3,10 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from .config import settings
 import os
-connector = "mysql+mysqlconnector"
-SQLALCHEMY_DATABASE_URL = f"{connector}://{settings.database_username}:{settings.database_password}@{settings.database_hostname}:{settings.database_port}/{settings.database_name}"
-os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
+# Built from the database_* settings unless DATABASE_URL is set
+SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
+if settings.OPENAI_API_KEY:
+    os.environ["OPENAI_API_KEY"] = settings.OPENAI_API_KEY
 engine = create_engine(SQLALCHEMY_DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -0,0 +1,279 @@
+"""
+Shared create/read/update/delete for simple tables, as a service and as a
+router factory.
+
+Every table served here has an integer `id` and an `active` flag; deletes
+are soft. Besides the per-row endpoints each router has batch endpoints
+that take a list and return a list in one transaction:
+
+    POST   /batch   [{...}, ...]            -> created rows
+    PUT    /batch   [{"id": 1, ...}, ...]   -> updated rows
+    DELETE /batch   [1, 2, ...]             -> deleted ids
+
+Updates are one executemany by primary key and deletes one UPDATE ... WHERE
+id IN, whatever the batch size. Inserts are one INSERT ... RETURNING where
+the dialect can return the new ids in input order (PostgreSQL, MariaDB);
+elsewhere, MySQL included, SQLAlchemy inserts row by row, still in one
+transaction. Batches are all or nothing: an unknown id fails the whole
+batch with 404.
+"""
+import inspect
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from pydantic import BaseModel, create_model
+from sqlalchemy import insert, update
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .config.database import get_db
+from .oauth2 import get_current_user
+
+MAX_BATCH_SIZE = 1000
+
+
+class MissingRows(LookupError):
+    def __init__(self, ids: Sequence[int]):
+        super().__init__(f"Not found: {', '.join(map(str, ids))}")
+        self.ids = list(ids)
+
+
+class CRUDService:
+    """Active-row queries and writes for one model."""
+
+    def __init__(self, model):
+        self.model = model
+
+    def query(self, db: Session):
+        return db.query(self.model).filter(self.model.active == True)
+
+    def get(self, db: Session, item_id: int):
+        return self.query(db).filter(self.model.id == item_id).first()
+
+    def list(self, db: Session, skip: int = 0, limit: int = 100, **filters):
+        query = self.query(db)
+        for field, value in filters.items():
+            if value:
+                query = query.filter(getattr(self.model, field) == value)
+        return query.offset(skip).limit(limit).all()
+
+    def create(self, db: Session, values: Dict[str, Any]):
+        item = self.model(**values)
+        db.add(item)
+        db.commit()
+        db.refresh(item)
+        return item
+
+    def update(self, db: Session, item_id: int, values: Dict[str, Any]):
+        item = self.get(db, item_id)
+        if item is None:
+            return None
+        for key, value in values.items():
+            setattr(item, key, value)
+        db.commit()
+        db.refresh(item)
+        return item
+
+    def delete(self, db: Session, item_id: int) -> bool:
+        item = self.get(db, item_id)
+        if item is None:
+            return False
+        item.active = False
+        db.commit()
+        return True
+
+    def _load(self, db: Session, ids: Sequence[int]) -> list:
+        """Rows by id in the given order, with one query."""
+        found = {item.id: item for item in self.query(db).filter(self.model.id.in_(ids))}
+        return [found[item_id] for item_id in ids if item_id in found]
+
+    def _check_exist(self, db: Session, ids: Sequence[int]) -> None:
+        found = {item_id for (item_id,) in self.query(db).with_entities(self.model.id).filter(self.model.id.in_(ids))}
+        missing = [item_id for item_id in ids if item_id not in found]
+        if missing:
+            raise MissingRows(missing)
+
+    def create_many(self, db: Session, rows: List[Dict[str, Any]]) -> list:
+        if not rows:
+            return []
+        try:
+            if db.get_bind().dialect.insert_executemany_returning:
+                ids = list(db.scalars(insert(self.model).returning(self.model.id, sort_by_parameter_order=True), rows))
+            else:
+                items = [self.model(**row) for row in rows]
+                db.add_all(items)
+                db.flush()
+                ids = [item.id for item in items]
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return self._load(db, ids)
+
+    def update_many(self, db: Session, rows: List[Dict[str, Any]]) -> list:
+        """Apply [{"id": ..., changed columns}, ...]; raises MissingRows for unknown ids."""
+        if not rows:
+            return []
+        ids = [row["id"] for row in rows]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Each id may appear only once in a batch")
+        try:
+            self._check_exist(db, ids)
+            changed = [row for row in rows if len(row) > 1]
+            if changed:
+                db.execute(update(self.model), changed)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return self._load(db, ids)
+
+    def delete_many(self, db: Session, ids: List[int]) -> List[int]:
+        """Soft-delete rows by id; raises MissingRows for unknown ids."""
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        try:
+            self._check_exist(db, ids)
+            db.execute(
+                update(self.model).where(self.model.id.in_(ids)).values(active=False)
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return ids
+
+
+def crud_router(
+    model,
+    *,
+    prefix: str,
+    tags: List[str],
+    create_schema: Type[BaseModel],
+    update_schema: Type[BaseModel],
+    response_schema: Type[BaseModel],
+    plural: str,
+    not_found: str,
+    filter_field: Optional[str] = None,
+) -> APIRouter:
+    """
+    A router with per-row and batch endpoints for `model`. Reads are open;
+    writes need an admin. `plural` names the rows in 403 messages
+    ("template weeks"), `not_found` is the 404 message, and `filter_field`
+    adds an optional query parameter of that name to the list endpoint.
+    """
+    service = CRUDService(model)
+    router = APIRouter(prefix=prefix, tags=tags)
+    batch_update_schema = create_model(f"{update_schema.__name__}Batch", __base__=update_schema, id=(int, ...))
+
+    def require_admin(user: models.User, action: str) -> None:
+        if user.role != "admin":
+            raise HTTPException(status_code=403, detail=f"Not authorized to {action} {plural}")
+
+    def check_batch(items: list) -> None:
+        if len(items) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} items per batch")
+
+    def missing(e: MissingRows) -> HTTPException:
+        return HTTPException(status_code=404, detail=f"{not_found}: {', '.join(map(str, e.ids))}")
+
+    # Batch routes come first so "/batch" is not taken for an item id
+    @router.post("/batch", response_model=List[response_schema])
+    def create_items(
+        items: List[create_schema],
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user)
+    ):
+        require_admin(current_user, "create")
+        check_batch(items)
+        return service.create_many(db, [item.dict() for item in items])
+
+    @router.put("/batch", response_model=List[response_schema])
+    def update_items(
+        items: List[batch_update_schema],
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user)
+    ):
+        require_admin(current_user, "update")
+        check_batch(items)
+        try:
+            return service.update_many(db, [item.dict(exclude_unset=True) for item in items])
+        except MissingRows as e:
+            raise missing(e)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @router.delete("/batch", response_model=List[int])
+    def delete_items(
+        ids: List[int],
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user)
+    ):
+        require_admin(current_user, "delete")
+        check_batch(ids)
+        try:
+            return service.delete_many(db, ids)
+        except MissingRows as e:
+            raise missing(e)
+
+    @router.post("/", response_model=response_schema)
+    def create_item(
+        item: create_schema,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user)
+    ):
+        require_admin(current_user, "create")
+        return service.create(db, item.dict())
+
+    def list_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db), **filters):
+        return service.list(db, skip=skip, limit=limit, **filters)
+
+    if filter_field:
+        # Expose the filter under its own name, e.g. ?week_id=3
+        signature = inspect.signature(list_items)
+        parameters = [p for p in signature.parameters.values() if p.kind is not p.VAR_KEYWORD]
+        parameters.insert(2, inspect.Parameter(
+            filter_field, inspect.Parameter.KEYWORD_ONLY, default=Query(None), annotation=Optional[int]
+        ))
+        list_items.__signature__ = signature.replace(parameters=[
+            p.replace(kind=inspect.Parameter.KEYWORD_ONLY) for p in parameters
+        ])
+    router.get("/", response_model=List[response_schema])(list_items)
+
+    @router.get("/{item_id}", response_model=response_schema)
+    def get_item(
+        item_id: int,
+        db: Session = Depends(get_db)
+    ):
+        item = service.get(db, item_id)
+        if not item:
+            raise HTTPException(status_code=404, detail=not_found)
+        return item
+
+    @router.put("/{item_id}", response_model=response_schema)
+    def update_item(
+        item_id: int,
+        item_update: update_schema,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user)
+    ):
+        require_admin(current_user, "update")
+        item = service.update(db, item_id, item_update.dict(exclude_unset=True))
+        if not item:
+            raise HTTPException(status_code=404, detail=not_found)
+        return item
+
+    @router.delete("/{item_id}", status_code=status.HTTP_204_NO_CONTENT)
+    def delete_item(
+        item_id: int,
+        db: Session = Depends(get_db),
+        current_user: models.User = Depends(get_current_user)
+    ):
+        require_admin(current_user, "delete")
+        if not service.delete(db, item_id):
+            raise HTTPException(status_code=404, detail=not_found)
+        return None
+
+    return router
@@ -1,85 +1,946 @@
-import torch
-from transformers import AutoModelForCausalLM
+"""
+Report extraction model server.
 
-from deepseek_vl2.models import DeepseekVLV2Processor, DeepseekVLV2ForCausalLM
-from deepseek_vl2.utils.io import load_pil_images
+An extraction model is loaded once and serves extraction requests (an image
+and/or report text plus a prompt) from a queue. Requests that arrive within
+`inference_max_batch_wait_ms` of each other run as one batch of up to
+`inference_max_batch_size` requests.
 
+Models are interchangeable (see MODELS): the DeepSeek-VL2 vision model, the
+same model int8-quantized for CPU-only nodes, and a deterministic regex
+extractor for report text that needs no model at all. Report types can be
+routed to the cheapest model that is accurate enough for them with
+`inference_models_by_report_type`; `benchmarks.extraction` compares them.
 
-# specify the path to the model
-model_path = "deepseek-ai/deepseek-vl2-tiny"
-vl_chat_processor: DeepseekVLV2Processor = DeepseekVLV2Processor.from_pretrained(model_path)
-tokenizer = vl_chat_processor.tokenizer
+With INFERENCE_BACKEND=local the server runs on a thread of the API worker,
+which is fine for development but loads one model per worker. With
+INFERENCE_BACKEND=redis the API workers only enqueue jobs in Redis and a single
+long-lived process serves them:
+
+    python -m app.infer                              # serve jobs from Redis
+    python -m app.infer --model deepseek-vl2-int8    # serve one model's jobs
+    python -m app.infer --image image.jpg            # one-off extraction
+"""
+import argparse
+import asyncio
+import concurrent.futures
+import hashlib
+import io
+import json
+import logging
+import queue
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cache import LRUCache
+from .metrics import Histogram, registry
+
+logger = logging.getLogger("api")
+
+INFERENCE_BATCH_SIZE = registry.register(Histogram(
+    "inference_batch_size",
+    "Extraction requests run together in one model call.",
+    buckets=(1, 2, 4, 8, 16, 32),
+))
+INFERENCE_LATENCY = registry.register(Histogram(
+    "inference_latency_seconds",
+    "Time from an extraction request being queued to its result.",
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 40, 80),
+))
+INFERENCE_FIRST_TOKEN = registry.register(Histogram(
+    "inference_first_token_seconds",
+    "Time from a streamed extraction being queued to its first text.",
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+))
+
+DEFAULT_PROMPT = "This image has Ultrasound measurements. Extract all of them and put in a JSON."
 
-vl_gpt: DeepseekVLV2ForCausalLM = AutoModelForCausalLM.from_pretrained(model_path, trust_remote_code=True)
-vl_gpt = vl_gpt.to(torch.bfloat16).cuda().eval()
 template = "<h2>EXAM:</h2> THYROID ULTRASOUND<h2>HISTORY:</h2><h2>TECHNIQUE:</h2><p>The thyroid gland was interrogated with a high-frequency linear transducer, employing grayscale imaging, duplex Doppler and color flow Doppler imaging.</p><h2>COMPARISON:</h2><p>None available.</p><h2>FINDINGS:</h2> <p>The thyroid gland is normal in size; the right lobe measures approximately _ cm; the left lobe measures approximately _ cm; and the isthmus measures approximately _ mm thick.<br>There is no suspicious thyroid mass lesions seen. No perithyroid fluid collection is noted. The partially imaged carotid arteries and jugular veins appear grossly unremarkable.</p><h2>IMPRESSION:</h2><p>1.   Unremarkable thyroid gland ultrasound as described above.</p><h2>RECOMMENDATIONS:</h2>"
-## single image conversation example
-conversation = [
-    {
-        "role": "<|User|>",
-        "content": "<image>This image has Ultrasound measurements. Extract all of them and put in a JSON.",
-        "images": ["image.jpg"],
-    },
-    {"role": "<|Assistant|>", "content": ""},
-]
-
-## multiple images (or in-context learning) conversation example
-# conversation = [
-#     {
-#         "role": "User",
-#         "content": "<image_placeholder>A dog wearing nothing in the foreground, "
-#                    "<image_placeholder>a dog wearing a santa hat, "
-#                    "<image_placeholder>a dog wearing a wizard outfit, and "
-#                    "<image_placeholder>what's the dog wearing?",
-#         "images": [
-#             "images/dog_a.png",
-#             "images/dog_b.png",
-#             "images/dog_c.png",
-#             "images/dog_d.png",
-#         ],
-#     },
-#     {"role": "Assistant", "content": ""}
-# ]
-
-# load images and prepare for inputs
-pil_images = load_pil_images(conversation)
-prepare_inputs = vl_chat_processor.__call__(
-    conversations=conversation,
-    images=pil_images,
-    force_batchify=True,
-    system_prompt=""
-).to(vl_gpt.device)
-with torch.no_grad():
-    # run image encoder to get the image embeddings
-    inputs_embeds = vl_gpt.prepare_inputs_embeds(**prepare_inputs)
-    past_key_values = None
-    # run the model to get the response
-    outputs = vl_gpt.generate(
-             # inputs_embeds=inputs_embeds[:, -1:],
-            # input_ids=prepare_inputs.input_ids[:, -1:],
+
+
+class InferenceBusy(Exception):
+    """The extraction queue is full; the caller should retry later."""
+
+
+class GenerationCancelled(Exception):
+    """Raised from a stream's emit callback to stop generating for a client that went away."""
+
+
+@dataclass
+class ExtractionRequest:
+    image: Optional[bytes] = None
+    prompt: str = DEFAULT_PROMPT
+    text: Optional[str] = None  # report text, e.g. a dictation transcript
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    submitted_at: float = field(default_factory=time.time)
+    owner: Optional[int] = None  # id of the user who submitted it; only they can look the job up
+
+
+class ExtractionModel:
+    """
+    Interface of an extraction backend.
+
+    `load()` is called once on the serving thread before the first batch;
+    `generate()` returns one output per request, in order, and `stream()`
+    produces one output piece by piece through `emit` as it is decoded.
+    Outputs are text, normally JSON; use parse_measurements() to compare
+    them across models.
+    """
+
+    name = ""
+    needs_image = False
+
+    def load(self):
+        pass
+
+    def generate(self, requests: List[ExtractionRequest]) -> List[str]:
+        raise NotImplementedError
+
+    def stream(self, request: ExtractionRequest, emit: Callable[[str], None]) -> str:
+        # Models that cannot stream deliver their whole output at once
+        text = self.generate([request])[0]
+        emit(text)
+        return text
+
+
+def _tensor_bytes(tensor) -> int:
+    return tensor.numel() * tensor.element_size()
+
+
+class DeepseekVL2Model(ExtractionModel):
+    """
+    DeepSeek-VL2 on CUDA when available, otherwise on the CPU.
+
+    Two caches avoid repeated work across requests:
+
+    - image features, keyed by a hash of the image bytes, so an image seen
+      before (a study re-submitted while a report is edited) skips the
+      vision encoder entirely, whatever the prompt;
+    - the KV cache of the text before the image (system prompt and
+      instructions), keyed by its token ids, so the shared preamble is
+      prefilled once. Only used when a batch needs no padding, since left
+      padding would shift the prefix positions.
+    """
+
+    name = "deepseek-vl2"
+    needs_image = True
+
+    def __init__(self, model_path="deepseek-ai/deepseek-vl2-tiny", device="auto", dtype="auto",
+                 max_new_tokens=512, temperature=0.4, top_p=0.9, repetition_penalty=1.1,
+                 image_cache_mb=512, prefix_cache_size=16):
+        self.model_path = model_path
+        self.device = device
+        self.dtype = dtype
+        self.max_new_tokens = max_new_tokens
+        self.temperature = temperature
+        self.top_p = top_p
+        self.repetition_penalty = repetition_penalty
+        self.processor = None
+        self.tokenizer = None
+        self.model = None
+        self.image_cache = LRUCache("image_features", image_cache_mb * 1024 * 1024, _tensor_bytes)
+        self.prefix_cache = LRUCache("prompt_prefix", prefix_cache_size) if prefix_cache_size > 0 else None
+
+    def load(self):
+        import torch
+        from transformers import AutoModelForCausalLM
+        from deepseek_vl2.models import DeepseekVLV2Processor
+
+        device = self.device
+        if device == "auto":
+            device = "cuda" if torch.cuda.is_available() else "cpu"
+        dtype = self.dtype
+        if dtype == "auto":
+            # bfloat16 matmuls are slow on most CPUs
+            dtype = "bfloat16" if device.startswith("cuda") else "float32"
+
+        started = time.perf_counter()
+        self.processor = DeepseekVLV2Processor.from_pretrained(self.model_path)
+        self.tokenizer = self.processor.tokenizer
+        model = AutoModelForCausalLM.from_pretrained(self.model_path, trust_remote_code=True)
+        self.model = self.prepare(model.to(getattr(torch, dtype)).to(device).eval())
+        logger.info(f"Loaded {self.model_path} on {device} ({dtype}) in {time.perf_counter() - started:.1f}s")
+
+    def prepare(self, model):
+        return model
+
+    def _process(self, request: ExtractionRequest):
+        from PIL import Image
+
+        # Instructions before the image so requests with the same prompt share a prefix
+        conversation = [
+            {"role": "<|User|>", "content": f"{request.prompt}\n<image>"},
+            {"role": "<|Assistant|>", "content": ""},
+        ]
+        image = Image.open(io.BytesIO(request.image)).convert("RGB")
+        return self.processor.process_one(
+            conversations=conversation, images=[image], inference_mode=True, system_prompt=""
+        )
+
+    def _image_features(self, prepared, digests):
+        """Image-token embeddings per distinct image, running the vision encoder only for new ones."""
+        features = {}
+        missing = []
+        for index, digest in enumerate(digests):
+            if digest in features:
+                continue
+            cached = self.image_cache.get(digest)
+            if cached is not None:
+                features[digest] = cached
+            else:
+                features[digest] = None
+                missing.append(index)
+        if missing:
+            batch = self.processor.batchify([prepared[i] for i in missing]).to(self.model.device)
+            embeds = self.model.prepare_inputs_embeds(**batch)
+            for row, index in enumerate(missing):
+                image_part = embeds[row][batch.images_seq_mask[row]].clone()
+                features[digests[index]] = image_part
+                self.image_cache.put(digests[index], image_part)
+        return features
+
+    def _prefix_cache_for(self, inputs, inputs_embeds):
+        """KV cache of the shared text before the image, repeated for the batch, or None."""
+        import torch
+        from transformers import DynamicCache
+
+        if self.prefix_cache is None or not bool(inputs.attention_mask.all()):
+            return None
+        first_image = inputs.images_seq_mask.int().argmax(dim=1)
+        length = int(first_image[0])
+        if length == 0 or not bool((first_image == length).all()):
+            return None
+        prefix_ids = inputs.input_ids[:, :length]
+        if not bool((prefix_ids == prefix_ids[:1]).all()):
+            return None
+
+        key = hashlib.sha256(prefix_ids[0].cpu().numpy().tobytes()).hexdigest()
+        layers = self.prefix_cache.get(key)
+        if layers is None:
+            output = self.model.language(inputs_embeds=inputs_embeds[:1, :length], use_cache=True)
+            cache = output.past_key_values
+            layers = cache.to_legacy_cache() if hasattr(cache, "to_legacy_cache") else cache
+            self.prefix_cache.put(key, layers)
+        batch_size = inputs_embeds.shape[0]
+        # A fresh cache per call: generate() appends to it
+        return DynamicCache.from_legacy_cache(tuple(
+            tuple(torch.repeat_interleave(tensor, batch_size, dim=0) for tensor in layer) for layer in layers
+        ))
+
+    def _generate(self, inputs_embeds, attention_mask, past_key_values=None, streamer=None):
+        return self.model.language.generate(
             inputs_embeds=inputs_embeds,
-            input_ids=prepare_inputs.input_ids,
-            images=prepare_inputs.images,
-            images_seq_mask=prepare_inputs.images_seq_mask,
-            images_spatial_crop=prepare_inputs.images_spatial_crop,
-            attention_mask=prepare_inputs.attention_mask,
+            attention_mask=attention_mask,
             past_key_values=past_key_values,
+            streamer=streamer,
+            pad_token_id=self.tokenizer.eos_token_id,
+            bos_token_id=self.tokenizer.bos_token_id,
+            eos_token_id=self.tokenizer.eos_token_id,
+            max_new_tokens=self.max_new_tokens,
+            do_sample=True,
+            temperature=self.temperature,
+            top_p=self.top_p,
+            repetition_penalty=self.repetition_penalty,
+            use_cache=True,
+        )
 
-            pad_token_id=tokenizer.eos_token_id,
-            bos_token_id=tokenizer.bos_token_id,
-            eos_token_id=tokenizer.eos_token_id,
-            max_new_tokens=512,
+    def generate(self, requests: List[ExtractionRequest], streamer=None) -> List[str]:
+        import torch
 
-            # do_sample=False,
-            # repetition_penalty=1.1,
+        prepared = [self._process(request) for request in requests]
+        digests = [hashlib.sha256(request.image).hexdigest() for request in requests]
+        inputs = self.processor.batchify(prepared).to(self.model.device)
 
-            do_sample=True,
-            temperature=0.4,
-            top_p=0.9,
-            repetition_penalty=1.1,
+        with torch.no_grad():
+            features = self._image_features(prepared, digests)
+            # Text embeddings with the (cached) image features scattered into the image positions
+            inputs_embeds = self.model.language.get_input_embeddings()(inputs.input_ids)
+            for row, digest in enumerate(digests):
+                inputs_embeds[row][inputs.images_seq_mask[row]] = features[digest].to(inputs_embeds.dtype)
+
+            past_key_values = None
+            try:
+                past_key_values = self._prefix_cache_for(inputs, inputs_embeds)
+                outputs = self._generate(inputs_embeds, inputs.attention_mask, past_key_values, streamer)
+            except GenerationCancelled:
+                raise
+            except Exception:
+                if past_key_values is None:
+                    raise
+                logger.exception("Generation from a cached prompt prefix failed; prefix caching disabled")
+                self.prefix_cache = None
+                outputs = self._generate(inputs_embeds, inputs.attention_mask, streamer=streamer)
+        return [self.tokenizer.decode(output.cpu().tolist(), skip_special_tokens=True) for output in outputs]
+
+    def stream(self, request: ExtractionRequest, emit: Callable[[str], None]) -> str:
+        from transformers import TextStreamer
+
+        class _Streamer(TextStreamer):
+            # Called on this thread by generate() whenever decoded text is complete words
+            def on_finalized_text(self, text, stream_end=False):
+                if text:
+                    emit(text)
+
+        streamer = _Streamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        return self.generate([request], streamer=streamer)[0]
+
+
+class QuantizedDeepseekVL2Model(DeepseekVL2Model):
+    """
+    DeepSeek-VL2 with its linear layers dynamically quantized to int8.
+
+    Runs on the CPU only; roughly a quarter of the memory of the float32 model
+    and faster on CPUs with VNNI, at some cost in accuracy.
+    """
+
+    name = "deepseek-vl2-int8"
+
+    def __init__(self, model_path="deepseek-ai/deepseek-vl2-tiny", device="cpu", dtype="float32", **kwargs):
+        super().__init__(model_path, device="cpu", dtype="float32", **kwargs)
+
+    def prepare(self, model):
+        import torch
+
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+_NUMBER = r"\d+(?:\.\d+)?"
+MEASUREMENT = re.compile(
+    rf"(?P<values>{_NUMBER}(?:\s*[x\u00d7]\s*{_NUMBER})*)\s*(?P<unit>cm/s|m/s|mm|cm|ml|cc)(?![a-z])",
+    re.IGNORECASE,
+)
+_LABEL_FILLER = {"measures", "measure", "measuring", "measured", "approximately", "about", "is", "are",
+                 "of", "at", "the", "and", "thick", "size", "in"}
+
+
+def _label(prefix: str) -> str:
+    # The words just before a measurement, back to the last punctuation mark
+    clause = re.split(r"[.;:,()\n<>]", prefix)[-1]
+    words = [w for w in re.findall(r"[a-z]+", clause.lower()) if w not in _LABEL_FILLER]
+    return " ".join(words[-4:])
+
+
+def extract_measurements(text: str) -> List[Dict[str, Any]]:
+    """Measurements written out in text, e.g. "the right lobe measures 4.1 x 1.5 x 1.2 cm"."""
+    found = []
+    for match in MEASUREMENT.finditer(text):
+        values = [float(v) for v in re.findall(_NUMBER, match.group("values"))]
+        found.append({
+            "label": _label(text[:match.start()]),
+            "value": values[0] if len(values) == 1 else values,
+            "unit": match.group("unit").lower(),
+        })
+    return found
+
+
+def parse_measurements(output: str) -> List[Dict[str, Any]]:
+    """
+    Normalise a model's output to a list of {label, value, unit}.
+
+    Uses the JSON object in the output when there is one (string values are
+    scanned for measurements, numeric ones take their unit from the key), and
+    falls back to scanning the whole text.
+    """
+    start, end = output.find("{"), output.rfind("}")
+    try:
+        data = json.loads(output[start:end + 1]) if start != -1 else None
+    except ValueError:
+        data = None
+    if data is None:
+        return extract_measurements(output)
+    if isinstance(data, dict) and isinstance(data.get("measurements"), list):
+        if all(isinstance(m, dict) and "value" in m for m in data["measurements"]):
+            return data["measurements"]
+
+    found = []
+
+    def walk(value, key=""):
+        if isinstance(value, dict):
+            for k, v in value.items():
+                walk(v, k)
+        elif isinstance(value, list):
+            for v in value:
+                walk(v, key)
+        elif isinstance(value, str):
+            for m in extract_measurements(value):
+                m["label"] = m["label"] or key.replace("_", " ").lower()
+                found.append(m)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            unit = re.search(r"(mm|cm|ml|cc)$", key, re.IGNORECASE)
+            label = key[:unit.start()] if unit else key
+            found.append({"label": label.replace("_", " ").strip().lower(), "value": float(value),
+                          "unit": unit.group(1).lower() if unit else None})
+
+    walk(data)
+    return found
+
+
+class RegexExtractor(ExtractionModel):
+    """
+    Deterministic rule-based extraction from report text.
+
+    Needs no model or GPU, so it is the backend for tests and for report
+    types whose measurements are dictated rather than only shown on images.
+    A request without text is read as UTF-8 text if its payload decodes.
+    """
+
+    name = "regex"
+
+    def generate(self, requests: List[ExtractionRequest]) -> List[str]:
+        outputs = []
+        for request in requests:
+            text = request.text
+            if text is None and request.image is not None:
+                try:
+                    text = request.image.decode("utf-8")
+                except UnicodeDecodeError:
+                    text = ""
+            outputs.append(json.dumps({"measurements": extract_measurements(text or "")}))
+        return outputs
+
+
+MODELS: Dict[str, type] = {
+    model.name: model for model in (DeepseekVL2Model, QuantizedDeepseekVL2Model, RegexExtractor)
+}
+
+
+def collect_batch(get: Callable[[Optional[float]], Optional[object]], max_size: int, max_wait: float) -> list:
+    """
+    Block for the first item, then keep taking items until the batch is full
+    or `max_wait` seconds have passed since the first one arrived.
+
+    `get(timeout)` returns the next item or None once the timeout expires.
+    """
+    first = get(None)
+    if first is None:
+        return []
+    batch = [first]
+    deadline = time.monotonic() + max_wait
+    while len(batch) < max_size:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        item = get(remaining)
+        if item is None:
+            break
+        batch.append(item)
+    return batch
+
+
+def run_batch(model, requests: List[ExtractionRequest]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Run one batch, returning (result, error) per request."""
+    INFERENCE_BATCH_SIZE.observe(len(requests))
+    try:
+        results = [(text, None) for text in model.generate(requests)]
+    except Exception as e:
+        logger.exception(f"Extraction batch of {len(requests)} failed")
+        results = [(None, f"{type(e).__name__}: {e}")] * len(requests)
+    now = time.time()
+    for request in requests:
+        INFERENCE_LATENCY.observe(now - request.submitted_at)
+    return results
+
+
+def run_stream(model, request: ExtractionRequest, emit: Callable[[str], None]) -> Tuple[Optional[str], Optional[str]]:
+    """Run one streamed request, returning (result, error)."""
+    INFERENCE_BATCH_SIZE.observe(1)
+    first = True
+
+    def timed_emit(text):
+        nonlocal first
+        if first:
+            INFERENCE_FIRST_TOKEN.observe(time.time() - request.submitted_at)
+            first = False
+        emit(text)
+
+    try:
+        result = (model.stream(request, timed_emit), None)
+    except GenerationCancelled:
+        result = (None, "Cancelled")
+    except Exception as e:
+        logger.exception(f"Streamed extraction {request.id} failed")
+        result = (None, f"{type(e).__name__}: {e}")
+    INFERENCE_LATENCY.observe(time.time() - request.submitted_at)
+    return result
+
+
+class ModelServer:
+    """
+    Owns the model on a dedicated thread and serves a bounded request queue.
+
+    The model is loaded on the thread before the first batch, so the caller
+    that triggers the start never blocks on it.
+    """
+
+    _STOP = object()
+
+    def __init__(self, model, max_batch_size=4, max_batch_wait=0.05, max_queue=64):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_batch_wait = max_batch_wait
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._load_error: Optional[str] = None
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f"model-server-{self.model.name}",
+                                                daemon=True)
+                self._thread.start()
+
+    def submit(self, request: ExtractionRequest,
+               on_text: Optional[Callable[[str], None]] = None) -> concurrent.futures.Future:
+        """Queue a request; with `on_text` it is streamed on its own instead of batched."""
+        self.start()
+        future = concurrent.futures.Future()
+        try:
+            self._queue.put_nowait((request, future, on_text))
+        except queue.Full:
+            raise InferenceBusy("Extraction queue is full")
+        return future
+
+    def _get(self, timeout):
+        try:
+            item = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return None if item is self._STOP else item
+
+    def _run(self):
+        try:
+            self.model.load()
+        except Exception as e:
+            logger.exception("Could not load the extraction model")
+            self._load_error = f"Model unavailable: {type(e).__name__}: {e}"
+
+        while True:
+            batch = collect_batch(self._get, self.max_batch_size, self.max_batch_wait)
+            if not batch:
+                return
+            batch = [item for item in batch if item[1].set_running_or_notify_cancel()]
+            if self._load_error:
+                for _, future, _ in batch:
+                    future.set_exception(RuntimeError(self._load_error))
+                continue
+
+            plain = [item for item in batch if item[2] is None]
+            if plain:
+                results = run_batch(self.model, [request for request, _, _ in plain])
+                for (_, future, _), outcome in zip(plain, results):
+                    self._resolve(future, *outcome)
+            # Streamed requests run one at a time, so their first text is not held back by a batch
+            for request, future, on_text in batch:
+                if on_text is not None:
+                    self._resolve(future, *run_stream(self.model, request, on_text))
+
+    @staticmethod
+    def _resolve(future, text, error):
+        if error is None:
+            future.set_result(text)
+        else:
+            future.set_exception(RuntimeError(error))
+
+    def stop(self, timeout=None):
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join(timeout)
+            self._thread = None
+
+
+def _job(status: str, result: Optional[str] = None, error: Optional[str] = None) -> Dict[str, Optional[str]]:
+    return {"status": status, "result": result, "error": error}
+
+
+class TokenStream:
+    """
+    Text of one streamed extraction, iterated asynchronously as it is decoded.
+
+    Once iteration ends, `result` holds the full output or `error` says why
+    there is none. Text is fed from any thread through emit() and finish().
+    """
+
+    def __init__(self, job_id: str):
+        self.job_id = job_id
+        self.result: Optional[str] = None
+        self.error: Optional[str] = None
+        self.cancelled = False
+        self._loop = asyncio.get_running_loop()
+        self._pieces: asyncio.Queue = asyncio.Queue()
+
+    def emit(self, text: str) -> None:
+        if self.cancelled:
+            raise GenerationCancelled()
+        self._loop.call_soon_threadsafe(self._pieces.put_nowait, text)
+
+    def finish(self, result: Optional[str] = None, error: Optional[str] = None) -> None:
+        def done():
+            self.result, self.error = result, error
+            self._pieces.put_nowait(None)
+        self._loop.call_soon_threadsafe(done)
+
+    def cancel(self) -> None:
+        """Stop generating; the model notices at its next piece of text."""
+        self.cancelled = True
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        piece = await self._pieces.get()
+        if piece is None:
+            raise StopAsyncIteration
+        return piece
+
+
+class LocalJobQueue:
+    """Jobs served by ModelServer threads in this process, one per model in use."""
+
+    def __init__(self, create_server: Callable[[str], ModelServer], retain: int = 1000):
+        self.create_server = create_server
+        self.retain = retain
+        self._servers: Dict[str, ModelServer] = {}
+        self._jobs: "OrderedDict[str, concurrent.futures.Future]" = OrderedDict()
+        self._owners: Dict[str, Optional[int]] = {}
+
+    def _server(self, model: str) -> ModelServer:
+        server = self._servers.get(model)
+        if server is None:
+            server = self._servers[model] = self.create_server(model)
+        return server
+
+    def _track(self, request: ExtractionRequest, future: concurrent.futures.Future) -> None:
+        self._jobs[request.id] = future
+        self._owners[request.id] = request.owner
+        while len(self._jobs) > self.retain:
+            job_id, _ = self._jobs.popitem(last=False)
+            self._owners.pop(job_id, None)
+
+    def _future(self, job_id: str, owner: Optional[int]) -> Optional[concurrent.futures.Future]:
+        if owner is not None and self._owners.get(job_id) != owner:
+            return None
+        return self._jobs.get(job_id)
+
+    async def submit(self, request: ExtractionRequest, model: str) -> str:
+        self._track(request, self._server(model).submit(request))
+        return request.id
+
+    async def submit_stream(self, request: ExtractionRequest, model: str) -> TokenStream:
+        stream = TokenStream(request.id)
+        future = self._server(model).submit(request, on_text=stream.emit)
+        future.add_done_callback(
+            lambda f: stream.finish(error=str(f.exception())) if f.exception() else stream.finish(f.result())
+        )
+        self._track(request, future)
+        return stream
+
+    async def get(self, job_id: str, owner: Optional[int] = None) -> Optional[Dict[str, Optional[str]]]:
+        """The job's status, or None when it is unknown or, given `owner`, submitted by someone else."""
+        future = self._future(job_id, owner)
+        if future is None:
+            return None
+        if not future.done():
+            return _job("running" if future.running() else "queued")
+        if future.exception() is not None:
+            return _job("failed", error=str(future.exception()))
+        return _job("done", result=future.result())
+
+    async def wait(self, job_id: str, timeout: float, owner: Optional[int] = None) -> Optional[Dict[str, Optional[str]]]:
+        future = self._future(job_id, owner)
+        if future is not None and not future.done() and timeout > 0:
+            loop = asyncio.get_running_loop()
+            finished = asyncio.Event()
+            future.add_done_callback(lambda _: loop.call_soon_threadsafe(finished.set))
+            try:
+                await asyncio.wait_for(finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return await self.get(job_id, owner)
+
+    async def close(self):
+        for server in self._servers.values():
+            await asyncio.to_thread(server.stop, 5)
+        self._servers = {}
+
+
+class RedisJobQueue:
+    """
+    Jobs handed to the `python -m app.infer` process through Redis.
+
+    Each job is a hash at {prefix}:job:{id} holding the image, text, prompt
+    and status; its id is pushed onto the {prefix}:jobs:{model} list, and the
+    worker serving that model pushes to {prefix}:job:{id}:done when it has
+    written the result.
+    """
+
+    def __init__(self, url: str, prefix: str = "inference", max_queue: int = 64, ttl: int = 3600):
+        self.url = url
+        self.prefix = prefix
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self._redis = None
+
+    def _client(self):
+        if self._redis is None:
+            import redis.asyncio as aioredis
+
+            self._redis = aioredis.from_url(self.url)
+        return self._redis
+
+    def job_key(self, job_id: str) -> str:
+        return f"{self.prefix}:job:{job_id}"
+
+    async def submit(self, request: ExtractionRequest, model: str, stream: bool = False) -> str:
+        redis = self._client()
+        jobs_key = f"{self.prefix}:jobs:{model}"
+        if await redis.llen(jobs_key) >= self.max_queue:
+            raise InferenceBusy("Extraction queue is full")
+        key = self.job_key(request.id)
+        job = {"status": "queued", "prompt": request.prompt, "submitted_at": request.submitted_at}
+        if request.image is not None:
+            job["image"] = request.image
+        if request.text is not None:
+            job["text"] = request.text
+        if stream:
+            job["stream"] = 1
+        if request.owner is not None:
+            job["owner"] = request.owner
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping=job)
+            pipe.expire(key, self.ttl)
+            pipe.rpush(jobs_key, request.id)
+            await pipe.execute()
+        return request.id
+
+    async def submit_stream(self, request: ExtractionRequest, model: str) -> TokenStream:
+        # Subscribe before queueing so no text published by the worker is missed
+        pubsub = self._client().pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(f"{self.job_key(request.id)}:stream")
+        try:
+            await self.submit(request, model, stream=True)
+        except BaseException:
+            await pubsub.aclose()
+            raise
+        return RedisTokenStream(request.id, pubsub)
+
+    async def get(self, job_id: str, owner: Optional[int] = None) -> Optional[Dict[str, Optional[str]]]:
+        """The job's status, or None when it is unknown or, given `owner`, submitted by someone else."""
+        status, result, error, job_owner = await self._client().hmget(
+            self.job_key(job_id), "status", "result", "error", "owner"
+        )
+        if status is None or (owner is not None and (job_owner is None or int(job_owner) != owner)):
+            return None
+        decode = lambda value: value.decode() if value is not None else None
+        return _job(decode(status), decode(result), decode(error))
+
+    async def wait(self, job_id: str, timeout: float, owner: Optional[int] = None) -> Optional[Dict[str, Optional[str]]]:
+        job = await self.get(job_id, owner)
+        if job is None or job["status"] in ("done", "failed") or timeout <= 0:
+            return job
+        done_key = f"{self.job_key(job_id)}:done"
+        if await self._client().blpop([done_key], timeout=timeout):
+            # Put the signal back for anyone else waiting on the same job
+            await self._client().rpush(done_key, 1)
+        return await self.get(job_id, owner)
+
+    async def close(self):
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
+
+
+class RedisTokenStream(TokenStream):
+    """
+    Reads a job's text from the {prefix}:job:{id}:stream channel.
+
+    Cancelling only stops listening; the worker finishes the job.
+    """
+
+    def __init__(self, job_id: str, pubsub):
+        super().__init__(job_id)
+        self._pubsub = pubsub
+        self._reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        try:
+            async for message in self._pubsub.listen():
+                data = json.loads(message["data"])
+                if "text" in data:
+                    self._pieces.put_nowait(data["text"])
+                else:
+                    self.result, self.error = data.get("result"), data.get("error")
+                    break
+        except asyncio.CancelledError:
+            self.error = "Cancelled"
+            raise
+        finally:
+            self._pieces.put_nowait(None)
+            await self._pubsub.aclose()
+
+    def cancel(self) -> None:
+        super().cancel()
+        self._reader.cancel()
+
+
+def create_model(settings, name: Optional[str] = None) -> ExtractionModel:
+    name = name or settings.inference_model
+    if name not in MODELS:
+        raise ValueError(f"Unknown extraction model {name!r}; expected one of {', '.join(MODELS)}")
+    model_class = MODELS[name]
+    if issubclass(model_class, DeepseekVL2Model):
+        return model_class(
+            model_path=settings.inference_model_path,
+            device=settings.inference_device,
+            dtype=settings.inference_dtype,
+            max_new_tokens=settings.inference_max_new_tokens,
+            image_cache_mb=settings.inference_image_cache_mb,
+            prefix_cache_size=settings.inference_prefix_cache_size,
+        )
+    return model_class()
+
+
+def model_for(settings, report_type: Optional[str] = None) -> str:
+    """The model configured for a report type, falling back to the default model."""
+    return settings.inference_models_by_report_type.get(report_type or "", settings.inference_model)
+
+
+def resolve_model(settings, report_type: Optional[str], has_image: bool, has_text: bool) -> str:
+    """Model to run a request on; raises ValueError when the request cannot be served."""
+    model = model_for(settings, report_type)
+    if model not in MODELS:
+        raise ValueError(f"Unknown extraction model {model!r}")
+    if not has_image and not has_text:
+        raise ValueError("An image or report text is required")
+    if not has_image and MODELS[model].needs_image:
+        raise ValueError(f"The {model} model needs an image")
+    return model
+
+
+def redis_url(settings) -> str:
+    return f"redis://{settings.redis_host}:{settings.redis_port}"
+
+
+_job_queue = None
+
+
+def get_job_queue():
+    """The extraction job queue of this worker, created on first use."""
+    global _job_queue
+    if _job_queue is None:
+        from .config.config import settings
+
+        if settings.inference_backend == "redis":
+            _job_queue = RedisJobQueue(redis_url(settings), settings.inference_queue_prefix,
+                                       max_queue=settings.inference_queue_size,
+                                       ttl=settings.inference_job_ttl_seconds)
+        else:
+            _job_queue = LocalJobQueue(lambda name: ModelServer(
+                create_model(settings, name),
+                max_batch_size=settings.inference_max_batch_size,
+                max_batch_wait=settings.inference_max_batch_wait_ms / 1000,
+                max_queue=settings.inference_queue_size,
+            ))
+    return _job_queue
+
+
+async def close_job_queue():
+    global _job_queue
+    if _job_queue is not None:
+        await _job_queue.close()
+        _job_queue = None
+
+
+def serve_redis(model, url: str, prefix: str = "inference", max_batch_size=4, max_batch_wait=0.05,
+                ttl: int = 3600):
+    """Serve jobs queued by RedisJobQueue until interrupted."""
+    import redis
+
+    client = redis.Redis.from_url(url)
+    jobs_key = f"{prefix}:jobs:{model.name}"
+
+    def get(timeout):
+        # BLPOP treats 0 as "forever"; poll so Ctrl-C is noticed
+        while True:
+            item = client.blpop([jobs_key], timeout=max(timeout, 0.01) if timeout is not None else 1)
+            if item is not None:
+                return item[1].decode()
+            if timeout is not None:
+                return None
+
+    model.load()
+    logger.info(f"Serving extraction jobs from {jobs_key}")
+    while True:
+        job_ids = collect_batch(get, max_batch_size, max_batch_wait)
+        requests, streamed = [], []
+        for job_id in job_ids:
+            key = f"{prefix}:job:{job_id}"
+            image, text, prompt, submitted_at, stream = client.hmget(
+                key, "image", "text", "prompt", "submitted_at", "stream"
+            )
+            if prompt is None:
+                continue  # expired before we got to it
+            client.hset(key, "status", "running")
+            request = ExtractionRequest(image=image, text=text.decode() if text is not None else None,
+                                        prompt=prompt.decode(), id=job_id, submitted_at=float(submitted_at))
+            (streamed if stream else requests).append(request)
+
+        outcomes = list(zip(requests, run_batch(model, requests))) if requests else []
+        for request in streamed:
+            channel = f"{prefix}:job:{request.id}:stream"
+            text, error = run_stream(model, request, lambda piece: client.publish(channel, json.dumps({"text": piece})))
+            client.publish(channel, json.dumps({"result": text, "error": error}))
+            outcomes.append((request, (text, error)))
+
+        pipe = client.pipeline(transaction=False)
+        for request, (text, error) in outcomes:
+            key = f"{prefix}:job:{request.id}"
+            pipe.hset(key, mapping={"status": "failed" if error else "done", "result": text or "",
+                                    "error": error or ""})
+            pipe.hdel(key, "image", "text")
+            pipe.expire(key, ttl)
+            pipe.rpush(f"{key}:done", 1)
+            pipe.expire(f"{key}:done", ttl)
+        pipe.execute()
+
+
+def main(argv=None):
+    from .config.config import settings
+
+    parser = argparse.ArgumentParser(description="Serve report extraction jobs, or run one extraction")
+    parser.add_argument("--model", default=settings.inference_model, choices=sorted(MODELS))
+    parser.add_argument("--image", help="extract from this image and exit")
+    parser.add_argument("--text", help="extract from this report text and exit")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--device", default=settings.inference_device, help="auto, cpu or cuda")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    settings.inference_device = args.device
+    model = create_model(settings, args.model)
+
+    if args.image or args.text:
+        model.load()
+        image = None
+        if args.image:
+            with open(args.image, "rb") as f:
+                image = f.read()
+        print(model.generate([ExtractionRequest(image=image, text=args.text, prompt=args.prompt)])[0])
+        return
+
+    try:
+        serve_redis(model, redis_url(settings), settings.inference_queue_prefix,
+                    max_batch_size=settings.inference_max_batch_size,
+                    max_batch_wait=settings.inference_max_batch_wait_ms / 1000,
+                    ttl=settings.inference_job_ttl_seconds)
+    except KeyboardInterrupt:
+        pass
 
-            use_cache=True,
-    )
 
-    answer = tokenizer.decode(outputs[0].cpu().tolist(), skip_special_tokens=True)
-    print(f"{prepare_inputs['sft_format'][0]}", answer)
+if __name__ == "__main__":
+    main()
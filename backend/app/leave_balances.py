@@ -0,0 +1,137 @@
+"""
+Leave taken against entitlement, per staff member and year.
+
+leave_balances holds the days of approved leave each staff member has taken
+in a year, by leave type. Approving, changing or cancelling a leave request
+moves those totals in the same transaction (the leave endpoints call
+leave_changed() next to the availability and coverage counts), so a balance
+is a few rows read per staff member rather than a sum over their leave
+history. Leave counts in calendar days, inclusive; a request that crosses
+New Year counts towards both years.
+
+The entitlement is settings.leave_entitlement_days a year at 1.0 FTE, pro
+rata by the staff member's total FTE, and accrues evenly over the year; the
+remaining balance is what has accrued so far less what has been taken.
+`python -m app.rebuild leave_balances` recounts the totals from the leave
+requests.
+"""
+from collections import defaultdict
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .config.config import settings
+from .leave_overlap import as_day, leave_span
+from .upsert import add_deltas, replace_rows
+
+BalanceKey = Tuple[int, int, str]  # staff_id, year, leave_type
+
+
+def leave_type_name(leave_type) -> str:
+    return getattr(leave_type, "value", leave_type)
+
+
+def days_by_year(start: date, end: date) -> Dict[int, int]:
+    """Calendar days from `start` to `end` inclusive, by year."""
+    days = {}
+    for year in range(start.year, end.year + 1):
+        first, last = max(start, date(year, 1, 1)), min(end, date(year, 12, 31))
+        days[year] = (last - first).days + 1
+    return days
+
+
+def apply_deltas(db: Session, deltas: Dict[BalanceKey, int]) -> None:
+    """Add the deltas to the totals with one upsert. Does not commit."""
+    add_deltas(db, models.LeaveBalance, ["staff_id", "year", "leave_type"], "days_used", deltas)
+
+
+def leave_changed(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Move the totals for a leave request that changed from `before` to
+    `after` (app.leave_overlap.leave_snapshot()s; None when it did not
+    exist). Does not commit.
+    """
+    deltas: Dict[BalanceKey, int] = defaultdict(int)
+    for snapshot, sign in ((before, -1), (after, +1)):
+        span = leave_span(snapshot)
+        if span is None:
+            continue
+        leave_type = leave_type_name(snapshot["leave_type"])
+        for year, days in days_by_year(*span).items():
+            deltas[(snapshot["staff_id"], year, leave_type)] += sign * days
+    apply_deltas(db, deltas)
+
+
+def entitlement(staff) -> float:
+    """Days of leave a year for the staff member's total FTE."""
+    fte = (staff.fte_clinical or 0) + (staff.fte_research or 0) + (staff.fte_admin or 0)
+    return settings.leave_entitlement_days * fte
+
+
+def accrued(yearly: float, year: int, as_of: date) -> float:
+    """How much of a year's entitlement has accrued by the end of `as_of`."""
+    first, last = date(year, 1, 1), date(year, 12, 31)
+    if as_of < first:
+        return 0.0
+    if as_of >= last:
+        return yearly
+    return yearly * ((as_of - first).days + 1) / ((last - first).days + 1)
+
+
+def balances(db: Session, year: int, staff_ids: Optional[Iterable[int]] = None,
+             skip: int = 0, limit: int = 100, as_of: Optional[date] = None) -> List[dict]:
+    """
+    The leave balance of each active staff member (or of `staff_ids`) for
+    `year`, in staff id order: two queries whatever the history.
+    """
+    as_of = as_of or date.today()
+    query = select(models.Staff).where(models.Staff.active == True)
+    if staff_ids is not None:
+        query = query.where(models.Staff.id.in_(list(staff_ids)))
+    staff = db.scalars(query.order_by(models.Staff.id).offset(skip).limit(limit)).all()
+    if not staff:
+        return []
+    Balance = models.LeaveBalance
+    used: Dict[int, Dict[str, int]] = defaultdict(dict)
+    for staff_id, leave_type, days in db.execute(
+        select(Balance.staff_id, Balance.leave_type, Balance.days_used)
+        .where(Balance.year == year, Balance.staff_id.in_([member.id for member in staff]))
+    ):
+        if days:
+            used[staff_id][leave_type] = days
+
+    result = []
+    for member in staff:
+        yearly = entitlement(member)
+        earned = accrued(yearly, year, as_of)
+        taken = sum(used[member.id].values())
+        result.append({
+            "staff_id": member.id,
+            "year": year,
+            "entitlement": round(yearly, 2),
+            "accrued": round(earned, 2),
+            "used": taken,
+            "used_by_type": used[member.id],
+            "remaining": round(earned - taken, 2),
+        })
+    return result
+
+
+def rebuild(db: Session) -> int:
+    """Recount every total from the approved leave and commit; returns the totals written."""
+    Leave = models.LeaveRequest
+    totals: Dict[BalanceKey, int] = defaultdict(int)
+    for staff_id, leave_type, start, end in db.execute(
+        select(Leave.staff_id, Leave.leave_type, Leave.start_date, Leave.end_date)
+        .where(Leave.active == True, Leave.status == "approved")
+    ).yield_per(10000):
+        for year, days in days_by_year(as_day(start), as_day(end)).items():
+            totals[(staff_id, year, leave_type_name(leave_type))] += days
+    rows = [
+        {"staff_id": staff_id, "year": year, "leave_type": leave_type, "days_used": days}
+        for (staff_id, year, leave_type), days in totals.items() if days
+    ]
+    return replace_rows(db, models.LeaveBalance, rows)
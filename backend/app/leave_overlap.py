@@ -0,0 +1,109 @@
+"""
+Overlap lookups over leave requests.
+
+The leave overlapping a period is an interval query,
+
+    start_date < day after the period  AND  end_date >= period start
+
+and a B-tree index can range-scan only one of the two bounds. The
+ix_leave_requests_overlap index is (status, active, end_date, start_date,
+staff_id): equality on status and active, a range scan on end_date, and the
+start_date test and staff_id answered from the same index entries, so the
+table is never read. Scanning on end_date reads only the leave that ends on
+or after the period start, which for the current and coming weeks is the
+open leave rather than the history that makes up most of the table. Lookups
+for given staff use ix_leave_requests_staff_dates the same way.
+"""
+from collections import defaultdict
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+
+OPEN_STATUSES = ("approved", "pending")
+
+
+def as_day(value) -> date:
+    return value.date() if isinstance(value, datetime) else value
+
+
+@dataclass(frozen=True)
+class LeaveInterval:
+    id: int
+    staff_id: int
+    start_date: date
+    end_date: date
+    status: str
+
+
+def overlapping_leave(db: Session, start: date, end: date, statuses: Sequence[str] = OPEN_STATUSES,
+                      staff_ids: Optional[Iterable[int]] = None,
+                      exclude_leave_id: Optional[int] = None) -> List[LeaveInterval]:
+    """Active leave requests in one of `statuses` covering any day from `start` to `end` inclusive."""
+    Leave = models.LeaveRequest
+    query = select(Leave.id, Leave.staff_id, Leave.start_date, Leave.end_date, Leave.status).where(
+        Leave.status.in_(list(statuses)),
+        Leave.active == True,
+        Leave.end_date >= datetime.combine(start, time.min),
+        Leave.start_date < datetime.combine(end + timedelta(days=1), time.min),
+    )
+    if staff_ids is not None:
+        query = query.where(Leave.staff_id.in_(list(staff_ids)))
+    if exclude_leave_id is not None:
+        query = query.where(Leave.id != exclude_leave_id)
+    return [
+        LeaveInterval(row.id, row.staff_id, as_day(row.start_date), as_day(row.end_date), row.status)
+        for row in db.execute(query)
+    ]
+
+
+def leave_days(intervals: Iterable[LeaveInterval], start: date, end: date) -> Dict[int, Set[date]]:
+    """The days from `start` to `end` each staff member's intervals cover."""
+    days: Dict[int, Set[date]] = defaultdict(set)
+    for interval in intervals:
+        day, last = max(interval.start_date, start), min(interval.end_date, end)
+        while day <= last:
+            days[interval.staff_id].add(day)
+            day += timedelta(days=1)
+    return days
+
+
+def leave_snapshot(leave) -> dict:
+    """The fields of a LeaveRequest that decide what it covers, to compare before and after a change."""
+    return {key: getattr(leave, key) for key in ("staff_id", "leave_type", "start_date", "end_date", "status", "active")}
+
+
+def leave_span(leave: Optional[dict]) -> Optional[Tuple[date, date]]:
+    """The days an approved, active leave snapshot covers, or None for any other leave."""
+    if leave is None or leave.get("status") != "approved" or leave.get("active") is False:
+        return None
+    return as_day(leave["start_date"]), as_day(leave["end_date"])
+
+
+def changed_leave_days(db: Session, leave_id: int, before: Optional[dict],
+                       after: Optional[dict]) -> List[Tuple[int, date, date, Set[date], int]]:
+    """
+    The days a leave request that changed from `before` to `after`
+    (leave_snapshot()s; None when it did not exist) gave back and now takes,
+    as (staff_id, start, end, days, sign): sign +1 for the span it covered
+    and -1 for the span it covers now, with `days` the days of the span
+    that none of the staff member's other approved leave covers. Empty when
+    the approved span and staff member did not change.
+    """
+    before_span, after_span = leave_span(before), leave_span(after)
+    if before_span == after_span and (before or {}).get("staff_id") == (after or {}).get("staff_id"):
+        return []
+    changes = []
+    for snapshot, span, sign in ((before, before_span, +1), (after, after_span, -1)):
+        if span is None:
+            continue
+        staff_id = snapshot["staff_id"]
+        start, end = span
+        other = leave_days(overlapping_leave(db, start, end, ("approved",), [staff_id], leave_id), start, end)
+        days = {start + timedelta(days=i) for i in range((end - start).days + 1)} - other.get(staff_id, set())
+        changes.append((staff_id, start, end, days, sign))
+    return changes
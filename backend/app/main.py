@@ -1,13 +1,28 @@
-from fastapi import FastAPI, Body, HTTPException
+from fastapi import FastAPI, Body, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from . import models
 from .database import engine
 from .api.v1.api import api_router
+from .routers import (
+    auth as auth_routes, availability, fte_management, location_management, report, roster_management,
+    staff_management, template, template_helper, template_requirement,
+    template_slot, template_staff, template_time_slot, template_week, template_week_day,
+    template_week_day_slot, template_week_day_slot_staff, template_week_day_slot_staff_requirement,
+    template_week_day_slot_staff_requirement_group, template_week_day_slot_staff_requirement_group_staff,
+    websockets,
+)
 from .config.config import settings
+from .metrics import setup_metrics
+from .oauth2 import get_current_admin
+from .profiling import setup_sql_profiling
+from .realtime import hub
+from .change_feed import install_change_feed
+from .reference_data import install_reference_data_invalidation
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
+# Create database tables (skipped when Alembic manages the schema)
+if settings.db_create_all:
+    models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title=settings.app_name,
@@ -31,6 +46,33 @@ app.add_middleware(
     allow_headers=settings.allowed_headers,
 )
 
+# Request, database and serialization metrics exposed on /metrics
+if settings.metrics_enabled:
+    setup_metrics(app, token=settings.metrics_token)
+
+# Opt-in per-request SQL profile headers and /debug/sql/slow-queries
+if settings.sql_profiling_enabled:
+    setup_sql_profiling(
+        app,
+        slow_query_ms=settings.sql_slow_query_ms,
+        n_plus_one_threshold=settings.sql_n_plus_one_threshold,
+        dependencies=[Depends(get_current_admin)]
+    )
+
+# Live roster updates: subscribe to the broker so writes in any worker reach
+# this worker's WebSocket clients, and publish committed roster changes.
+# Reference data invalidations travel the same way to every worker.
+install_change_feed(hub)
+install_reference_data_invalidation(hub)
+
+@app.on_event("startup")
+async def start_realtime():
+    await hub.start()
+
+@app.on_event("shutdown")
+async def stop_realtime():
+    await hub.stop()
+
 # Health check endpoint
 @app.get("/health")
 def health_check():
@@ -65,9 +107,22 @@ def test_signup(email: str = Body(...), password: str = Body(...)):
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
+# Endpoints on the roster schema (app.roster_models)
+for roster_routes in (
+    auth_routes, report, template, roster_management,
+    staff_management, fte_management, location_management, availability,
+    template_week, template_week_day, template_week_day_slot, template_week_day_slot_staff,
+    template_week_day_slot_staff_requirement, template_week_day_slot_staff_requirement_group,
+    template_week_day_slot_staff_requirement_group_staff,
+    template_time_slot, template_slot, template_requirement, template_staff, template_helper,
+    websockets,
+):
+    app.include_router(roster_routes.router)
+
 # Print all routes for debugging
-@app.on_event("startup")
-async def startup_event():
-    print("\nAll registered routes:")
-    for route in app.routes:
-        print(f"{route.path} - {route.methods}")
+if settings.log_routes:
+    @app.on_event("startup")
+    async def startup_event():
+        print("\nAll registered routes:")
+        for route in app.routes:
+            print(f"{route.path} - {getattr(route, 'methods', None)}")
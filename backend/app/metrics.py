@@ -0,0 +1,439 @@
+"""
+Prometheus-style metrics for the Roster Monster API.
+
+Request latency, in-flight requests, database query timings and response
+serialization time are recorded in process memory. When the
+``PROMETHEUS_MULTIPROC_DIR`` environment variable points at a writable
+directory (as it should under gunicorn), every worker periodically flushes a
+snapshot of its values there and the ``/metrics`` endpoint sums the snapshots
+of all workers.
+
+The endpoint answers only scrapers that send ``Authorization: Bearer
+<METRICS_TOKEN>``; with no token configured it answers only loopback clients,
+such as a sidecar or an SSH tunnel on the same host.
+"""
+import asyncio
+import functools
+import glob
+import hmac
+import json
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+# Snapshots are written at most this often per worker (seconds).
+FLUSH_INTERVAL = 1.0
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+LOOPBACK_HOSTS = {"127.0.0.1", "::1", "localhost"}
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            samples = [[list(key), value] for key, value in self._values.items()]
+        return {
+            "type": self.type_name,
+            "help": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": samples,
+        }
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(_Metric):
+    type_name = "gauge"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket (non-cumulative) counts; made cumulative on render.
+                state = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+                self._values[key] = state
+            index = len(self.buckets)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    index = i
+                    break
+            state["buckets"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def snapshot(self) -> dict:
+        data = super().snapshot()
+        data["buckets"] = list(self.buckets)
+        # Copy the mutable per-key state so later observations don't leak in.
+        data["samples"] = [[key, {"buckets": list(v["buckets"]), "sum": v["sum"], "count": v["count"]}]
+                           for key, v in data["samples"]]
+        return data
+
+
+class Registry:
+    """Holds the metrics of this process and handles multiprocess snapshots."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._last_flush = 0.0
+        self._flush_lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def snapshot(self) -> Dict[str, dict]:
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+
+    @staticmethod
+    def multiprocess_dir() -> Optional[str]:
+        return os.getenv("PROMETHEUS_MULTIPROC_DIR") or None
+
+    def flush(self, force: bool = False) -> None:
+        """Write this worker's snapshot to the multiprocess directory."""
+        directory = self.multiprocess_dir()
+        if not directory:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_flush < FLUSH_INTERVAL:
+            return
+        if not self._flush_lock.acquire(blocking=False):
+            return
+        try:
+            self._last_flush = now
+            path = os.path.join(directory, f"metrics_{os.getpid()}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.snapshot(), f)
+            os.replace(tmp_path, path)
+        finally:
+            self._flush_lock.release()
+
+    def collect(self) -> Dict[str, dict]:
+        """Return metric snapshots, summed across workers when possible."""
+        directory = self.multiprocess_dir()
+        if not directory:
+            return self.snapshot()
+        self.flush(force=True)
+        snapshots = []
+        for path in glob.glob(os.path.join(directory, "metrics_*.json")):
+            try:
+                with open(path) as f:
+                    snapshots.append(json.load(f))
+            except (OSError, ValueError):
+                # A worker may be replacing its file right now.
+                continue
+        return _merge_snapshots(snapshots)
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for name, data in sorted(self.collect().items()):
+            labelnames = data["labelnames"]
+            lines.append(f"# HELP {name} {data['help']}")
+            lines.append(f"# TYPE {name} {data['type']}")
+            for key, value in sorted(data["samples"], key=lambda sample: sample[0]):
+                if data["type"] == "histogram":
+                    cumulative = 0
+                    bounds = list(data["buckets"]) + [float("inf")]
+                    for bound, count in zip(bounds, value["buckets"]):
+                        cumulative += count
+                        le = f'le="{_format_value(bound)}"'
+                        lines.append(f"{name}_bucket{_format_labels(labelnames, key, le)} {cumulative}")
+                    labels = _format_labels(labelnames, key)
+                    lines.append(f"{name}_sum{labels} {_format_value(value['sum'])}")
+                    lines.append(f"{name}_count{labels} {value['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _merge_snapshots(snapshots: List[Dict[str, dict]]) -> Dict[str, dict]:
+    merged: Dict[str, dict] = {}
+    for snapshot in snapshots:
+        for name, data in snapshot.items():
+            target = merged.setdefault(name, {**data, "samples": {}})
+            for key, value in data["samples"]:
+                key = tuple(key)
+                current = target["samples"].get(key)
+                if data["type"] == "histogram":
+                    if current is None:
+                        current = {"buckets": [0] * len(value["buckets"]), "sum": 0.0, "count": 0}
+                        target["samples"][key] = current
+                    current["buckets"] = [a + b for a, b in zip(current["buckets"], value["buckets"])]
+                    current["sum"] += value["sum"]
+                    current["count"] += value["count"]
+                else:
+                    target["samples"][key] = (current or 0.0) + value
+    for data in merged.values():
+        data["samples"] = [[list(key), value] for key, value in data["samples"].items()]
+    return merged
+
+
+def mark_process_dead(pid: int) -> None:
+    """Drop the gauges of a dead worker; its counters and histograms are kept."""
+    directory = Registry.multiprocess_dir()
+    if not directory:
+        return
+    path = os.path.join(directory, f"metrics_{pid}.json")
+    try:
+        with open(path) as f:
+            snapshot = json.load(f)
+    except (OSError, ValueError):
+        return
+    snapshot = {name: data for name, data in snapshot.items() if data["type"] != "gauge"}
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(snapshot, f)
+    os.replace(tmp_path, path)
+
+
+def clear_multiprocess_dir() -> None:
+    """Remove snapshots left behind by a previous server run."""
+    directory = Registry.multiprocess_dir()
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "metrics_*.json*")):
+        os.remove(path)
+
+
+registry = Registry()
+
+REQUEST_LATENCY = registry.register(Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route and status code.",
+    ("method", "route", "status"),
+))
+REQUESTS_IN_PROGRESS = registry.register(Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being processed.",
+    ("method",),
+))
+SERIALIZATION_TIME = registry.register(Histogram(
+    "http_response_serialization_seconds",
+    "Time spent validating and serializing the endpoint return value.",
+    ("route",),
+    buckets=DB_BUCKETS,
+))
+DB_QUERY_LATENCY = registry.register(Histogram(
+    "db_query_duration_seconds",
+    "Database statement execution time by statement type.",
+    ("operation",),
+    buckets=DB_BUCKETS,
+))
+DB_QUERY_ERRORS = registry.register(Counter(
+    "db_query_errors_total",
+    "Database statements that raised an error.",
+    ("operation",),
+))
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and in-flight requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc(method=method)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            REQUESTS_IN_PROGRESS.dec(method=method)
+            # The router stores the matched route in the scope; using its
+            # path template keeps label cardinality bounded.
+            route = scope.get("route")
+            REQUEST_LATENCY.observe(
+                time.perf_counter() - start_time,
+                method=method,
+                route=getattr(route, "path", UNMATCHED_ROUTE),
+                status=str(status_code),
+            )
+            registry.flush()
+
+
+_endpoint_finished: ContextVar[Optional[list]] = ContextVar("endpoint_finished", default=None)
+
+
+def _mark_endpoint_finished() -> None:
+    marker = _endpoint_finished.get()
+    if marker is not None:
+        marker[0] = time.perf_counter()
+
+
+class InstrumentedAPIRoute(APIRoute):
+    """API route that records how long response serialization takes."""
+
+    def get_route_handler(self):
+        call = self.dependant.call
+        if call is not None and not getattr(call, "_metrics_wrapped", False):
+            if asyncio.iscoroutinefunction(call):
+                async def timed_call(*args, **kwargs):
+                    try:
+                        return await call(*args, **kwargs)
+                    finally:
+                        _mark_endpoint_finished()
+            else:
+                def timed_call(*args, **kwargs):
+                    try:
+                        return call(*args, **kwargs)
+                    finally:
+                        _mark_endpoint_finished()
+            functools.update_wrapper(timed_call, call)
+            timed_call._metrics_wrapped = True
+            self.dependant.call = timed_call
+
+        original_route_handler = super().get_route_handler()
+
+        async def instrumented_route_handler(request: Request) -> Response:
+            # A list is shared with the threadpool copy of the context, so
+            # sync endpoints can report back when they finished.
+            marker = [None]
+            token = _endpoint_finished.set(marker)
+            try:
+                response = await original_route_handler(request)
+            finally:
+                _endpoint_finished.reset(token)
+            if marker[0] is not None:
+                SERIALIZATION_TIME.observe(time.perf_counter() - marker[0], route=self.path)
+            return response
+
+        return instrumented_route_handler
+
+
+def _statement_operation(statement: str) -> str:
+    parts = statement.lstrip().split(None, 1)
+    return parts[0].upper() if parts else "UNKNOWN"
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    starts = conn.info.get("metrics_query_start")
+    if starts:
+        DB_QUERY_LATENCY.observe(time.perf_counter() - starts.pop(), operation=_statement_operation(statement))
+
+
+def _handle_error(exception_context):
+    conn = exception_context.connection
+    if conn is not None:
+        starts = conn.info.get("metrics_query_start")
+        if starts:
+            starts.pop()
+    statement = exception_context.statement or ""
+    DB_QUERY_ERRORS.inc(operation=_statement_operation(statement))
+
+
+def instrument_engines() -> None:
+    """Attach query timing to every SQLAlchemy engine in the process."""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def scrape_allowed(request: Request, token: Optional[str]) -> bool:
+    """Whether `request` may read the metrics: the bearer token if one is set, else loopback only."""
+    if token:
+        scheme, _, supplied = request.headers.get("authorization", "").partition(" ")
+        return scheme.lower() == "bearer" and hmac.compare_digest(supplied.encode(), token.encode())
+    return request.client is not None and request.client.host in LOOPBACK_HOSTS
+
+
+def setup_metrics(app: FastAPI, path: str = "/metrics", token: Optional[str] = None) -> None:
+    """Install the metrics middleware, database hooks and the scrape endpoint."""
+    instrument_engines()
+    app.add_middleware(MetricsMiddleware)
+
+    @app.get(path, include_in_schema=False)
+    def metrics(request: Request):
+        if not scrape_allowed(request, token):
+            # Not found rather than forbidden, so the endpoint is not advertised
+            raise HTTPException(status_code=404, detail="Not Found")
+        return Response(content=registry.render(), media_type=CONTENT_TYPE_LATEST)
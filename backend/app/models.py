@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, UniqueConstraint, Boolean, Index, Float, Enum
+from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, UniqueConstraint, Boolean, Index, Float, Enum, Date, Text
 from .config import Base
 from sqlalchemy.sql.expression import text
 from sqlalchemy.sql.sqltypes import TIMESTAMP
@@ -130,6 +130,12 @@ class LeaveRequest(Base):
 
     staff = relationship("Staff", foreign_keys=[staff_id])
 
+    __table_args__ = (
+        # Overlap lookups read only these entries (see app.leave_overlap)
+        Index("ix_leave_requests_overlap", "status", "active", "end_date", "start_date", "staff_id"),
+        Index("ix_leave_requests_staff_dates", "staff_id", "end_date", "start_date"),
+    )
+
 class RosterAssignment(Base):
     __tablename__ = "roster_assignments"
     
@@ -150,6 +156,10 @@ class RosterAssignment(Base):
     time_slot = relationship("LocationTimeSlot", foreign_keys=[time_slot_id])
     double_station_pair = relationship("RosterAssignment", remote_side=[id])
 
+    __table_args__ = (
+        Index("ix_roster_assignments_staff_date", "staff_id", "date"),
+    )
+
 class FTEConfiguration(Base):
     __tablename__ = "fte_configurations"
     
@@ -160,4 +170,299 @@ class FTEConfiguration(Base):
     hours_per_shift = Column(Float, nullable=False)
     date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
     date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
-    active = Column(Boolean, default=True)
\ No newline at end of file
+    active = Column(Boolean, default=True)
+
+class Template(Base):
+    """A report template; the study of every report written from it."""
+    __tablename__ = "templates"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    name = Column(String(255), nullable=False)
+    description = Column(String(300))
+    template_text = Column(Text().with_variant(LONGTEXT, "mysql"), nullable=False)
+    template_html = Column(Text().with_variant(LONGTEXT, "mysql"))
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        Index("ix_templates_name", "name"),
+    )
+
+class TemplateWeek(Base):
+    """A week of a template's rotation; the weeks apply in id order (see app.roster_expansion)."""
+    __tablename__ = "template_weeks"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
+    name = Column(String(100))
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateWeekDay(Base):
+    __tablename__ = "template_week_days"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    week_id = Column(Integer, ForeignKey("template_weeks.id"), nullable=False, index=True)
+    day_of_week = Column(Integer, nullable=False)  # ISO, 1 = Monday
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateWeekDaySlot(Base):
+    __tablename__ = "template_week_day_slots"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    week_day_id = Column(Integer, ForeignKey("template_week_days.id"), nullable=False, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    time_slot_id = Column(Integer, ForeignKey("location_time_slots.id"), nullable=False)
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateWeekDaySlotStaff(Base):
+    __tablename__ = "template_week_day_slot_staff"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    day_slot_id = Column(Integer, ForeignKey("template_week_day_slots.id"), nullable=False, index=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"))  # None while the place is unfilled
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateWeekDaySlotStaffRequirement(Base):
+    """Who may fill a place in a template slot, by role."""
+    __tablename__ = "template_week_day_slot_staff_requirements"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    slot_staff_id = Column(Integer, ForeignKey("template_week_day_slot_staff.id"), nullable=False, index=True)
+    role_id = Column(Integer, ForeignKey("roles.id"))
+    min_staff = Column(Integer, default=1)
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateWeekDaySlotStaffRequirementGroup(Base):
+    """A staff group that meets a requirement."""
+    __tablename__ = "template_week_day_slot_staff_requirement_groups"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    requirement_id = Column(Integer, ForeignKey("template_week_day_slot_staff_requirements.id"), nullable=False)
+    staff_group_id = Column(Integer, ForeignKey("staff_groups.id"))
+    min_staff = Column(Integer, default=1)
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        # Named here: the generated name would pass MySQL's 64 character limit
+        Index("ix_template_requirement_groups_requirement_id", "requirement_id"),
+    )
+
+class TemplateWeekDaySlotStaffRequirementGroupStaff(Base):
+    """A staff member named in a requirement group."""
+    __tablename__ = "template_week_day_slot_staff_requirement_group_staff"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    group_id = Column(Integer, ForeignKey("template_week_day_slot_staff_requirement_groups.id"), nullable=False)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        Index("ix_template_requirement_group_staff_group_id", "group_id"),
+    )
+
+class TemplateTimeSlot(Base):
+    """A shift a template defines for a location, like LocationTimeSlot."""
+    __tablename__ = "template_time_slots"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    start_time = Column(String(5), nullable=False)  # Format: "HH:MM"
+    end_time = Column(String(5), nullable=False)    # Format: "HH:MM"
+    days_of_week = Column(String(50), nullable=False)  # Comma-separated days: "1,2,3,4,5"
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateSlot(Base):
+    """A template time slot staffed on one day of the week."""
+    __tablename__ = "template_slots"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
+    time_slot_id = Column(Integer, ForeignKey("template_time_slots.id"), nullable=False)
+    day_of_week = Column(Integer, nullable=False)  # ISO, 1 = Monday
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateRequirement(Base):
+    """How many staff of a role a template slot needs."""
+    __tablename__ = "template_requirements"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
+    slot_id = Column(Integer, ForeignKey("template_slots.id"), nullable=False)
+    role_id = Column(Integer, ForeignKey("roles.id"))
+    min_staff = Column(Integer, default=1)
+    max_staff = Column(Integer)  # None for no limit
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateStaff(Base):
+    """A staff member a template puts in one of its slots."""
+    __tablename__ = "template_staff"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
+    slot_id = Column(Integer, ForeignKey("template_slots.id"), nullable=False)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class TemplateHelper(Base):
+    """A staff member who may cover a template's slots at a location beyond its requirements."""
+    __tablename__ = "template_helpers"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    template_id = Column(Integer, ForeignKey("templates.id"), nullable=False, index=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"))  # None for any location
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+class Report(Base):
+    __tablename__ = "reports"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    unique_identifier = Column(String(36), nullable=False, unique=True, default=lambda: str(uuid.uuid4()))
+    report_by = Column(Integer, ForeignKey("users.id"), nullable=False)
+    template_used = Column(Integer, ForeignKey("templates.id"))
+    report_data = Column(Text().with_variant(LONGTEXT, "mysql"))
+    status = Column(String(20), nullable=False, default="DRAFT")  # DRAFT or COMPLETED
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        Index("ix_reports_owner", "report_by", "active"),
+    )
+
+class ReportSearchDocument(Base):
+    """A report's searchable text, kept current by app.report_search (MySQL store)."""
+    __tablename__ = "report_search_documents"
+
+    report_id = Column(Integer, primary_key=True, autoincrement=False)
+    owner_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    study = Column(String(255), nullable=False, default="")
+    report_date = Column(Date)
+    body = Column(Text().with_variant(LONGTEXT, "mysql"), nullable=False)
+
+    __table_args__ = (
+        Index("ix_report_search_owner_date", "owner_id", "report_date"),
+        Index("ft_report_search_text", "study", "body", mysql_prefix="FULLTEXT"),
+        Index("ft_report_search_study", "study", mysql_prefix="FULLTEXT"),
+    )
+
+class StaffAvailability(Base):
+    """A day a staff member marked themselves available or not for a shift type."""
+    __tablename__ = "staff_availability"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
+    date = Column(Date, nullable=False)
+    shift_type = Column(String(20), nullable=False)
+    is_available = Column(Boolean, nullable=False, default=True)
+    note = Column(String(300))
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+    date_modified = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'), onupdate=text('now()'))
+    active = Column(Boolean, default=True)
+
+    __table_args__ = (
+        # One record per day and shift type, so the availability endpoints can upsert
+        UniqueConstraint("staff_id", "date", "shift_type", name="uq_staff_availability_day"),
+    )
+
+class StaffAvailabilityMonth(Base):
+    """Days of a month a staff member is available for a shift type, as bits (see app.availability_bitmap)."""
+    __tablename__ = "staff_availability_months"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
+    shift_type = Column(String(20), nullable=False)
+    month = Column(Date, nullable=False)  # first day of the month
+    bits = Column(Integer, nullable=False, default=0)  # bit d - 1 = day d
+
+    __table_args__ = (
+        UniqueConstraint("staff_id", "shift_type", "month", name="uq_staff_availability_month"),
+        Index("ix_staff_availability_month_shift", "shift_type", "month"),
+    )
+
+class AvailabilityDailyCount(Base):
+    """Staff available per day, shift type, role and group, net of leave (see app.availability_aggregates)."""
+    __tablename__ = "availability_daily_counts"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    date = Column(Date, nullable=False)
+    shift_type = Column(String(20), nullable=False)
+    role_id = Column(Integer, nullable=False)
+    group_id = Column(Integer, nullable=False, default=0)  # 0 for staff without a group
+    available = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("date", "shift_type", "role_id", "group_id", name="uq_availability_daily_count"),
+    )
+
+class LeaveBalance(Base):
+    """Days of approved leave a staff member took in a year, by leave type (see app.leave_balances)."""
+    __tablename__ = "leave_balances"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    staff_id = Column(Integer, ForeignKey("staff.id"), nullable=False)
+    year = Column(Integer, nullable=False)
+    leave_type = Column(String(20), nullable=False)  # a LeaveType value
+    days_used = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("staff_id", "year", "leave_type", name="uq_leave_balance"),
+        Index("ix_leave_balances_year", "year", "staff_id"),
+    )
+
+class SlotCoverageCount(Base):
+    """Active assignments per day and time slot, net of approved leave (see app.slot_coverage)."""
+    __tablename__ = "slot_coverage_counts"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    date = Column(Date, nullable=False)
+    location_id = Column(Integer, ForeignKey("locations.id"), nullable=False)
+    time_slot_id = Column(Integer, ForeignKey("location_time_slots.id"), nullable=False)
+    staffed = Column(Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        UniqueConstraint("date", "time_slot_id", name="uq_slot_coverage_count"),
+    )
+
+class ReportRevision(Base):
+    """One autosave of a report draft; rows are only ever added (see app.report_drafts)."""
+    __tablename__ = "report_revisions"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    report_id = Column(Integer, nullable=False)
+    version = Column(Integer, nullable=False)
+    kind = Column(String(10), nullable=False)  # snapshot (full text) or patch (JSON edits)
+    data = Column(Text().with_variant(LONGTEXT, "mysql"), nullable=False)
+    length = Column(Integer, nullable=False)  # characters in the text at this version
+    author_id = Column(Integer, ForeignKey("users.id"))
+    date_created = Column(TIMESTAMP(timezone=True), nullable=False, server_default=text('now()'))
+
+    __table_args__ = (
+        UniqueConstraint("report_id", "version", name="uq_report_revision_version"),
+    )
\ No newline at end of file
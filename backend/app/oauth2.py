@@ -1,9 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketException, status
 from sqlalchemy.orm import Session
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
+from typing import Optional
 from fastapi.security import OAuth2PasswordBearer
-from . import models, schemas
+from . import roster_models as models
 from .config import get_db, settings
 
 router = APIRouter()
@@ -45,8 +46,37 @@ def get_current_user(token: str = Depends(oauth2_schema), db: Session = Depends(
         detail="Invalid authentication credentials",
         headers={"WWW-Authenticate": "Bearer"}
     )
+    return user_for_token(token, db, credentials_exception)
+
+def get_websocket_user(websocket: WebSocket, token: Optional[str] = Query(None), db: Session = Depends(get_db)):
+    """
+    get_current_user for websockets. Browsers cannot set headers on a
+    websocket, so the access token may also come as ?token=. A missing or
+    invalid token closes the handshake with 1008 (policy violation).
+    """
+    if token is None:
+        scheme, _, credentials = websocket.headers.get("authorization", "").partition(" ")
+        if scheme.lower() == "bearer":
+            token = credentials
+    credentials_exception = WebSocketException(
+        code=status.WS_1008_POLICY_VIOLATION,
+        reason="Invalid authentication credentials"
+    )
+    if not token:
+        raise credentials_exception
+    user = user_for_token(token, db, credentials_exception)
+    # The socket outlives the lookup; give its connection back to the pool
+    db.close()
+    return user
+
+def user_for_token(token: str, db: Session, credentials_exception):
     user_id = verify_token(token, credentials_exception)
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if user is None:
         raise credentials_exception
     return user
+
+def get_current_admin(current_user: models.User = Depends(get_current_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized")
+    return current_user
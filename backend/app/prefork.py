@@ -0,0 +1,67 @@
+"""
+Hooks for running the API under gunicorn with preload_app.
+
+warm_up() runs in the master once the app is imported: it builds the OpenAPI
+schema and the reference data, closes every database connection it opened and
+freezes the heap so the forked workers share those objects copy-on-write.
+after_fork() runs in each worker and resets the inherited connection pools.
+"""
+import gc
+import logging
+import sys
+import time
+from typing import Iterator
+
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("database")
+
+# Modules that create an engine at import time
+ENGINE_MODULES = ("app.database", "app.config.database", "app.core.database")
+
+
+def iter_engines() -> Iterator[Engine]:
+    """Yield the engines of the already imported database modules."""
+    seen = set()
+    for name in ENGINE_MODULES:
+        engine = getattr(sys.modules.get(name), "engine", None)
+        if isinstance(engine, Engine) and id(engine) not in seen:
+            seen.add(id(engine))
+            yield engine
+
+
+def warm_up(app) -> None:
+    started = time.perf_counter()
+
+    # FastAPI builds and caches the OpenAPI document on first request to /docs
+    app.openapi()
+
+    try:
+        from .config.database import SessionLocal
+        from .reference_data import preload_reference_data
+
+        db = SessionLocal()
+        try:
+            preload_reference_data(db)
+        finally:
+            db.close()
+    except Exception as e:
+        # Workers load the reference data lazily on first use instead
+        logger.warning(f"Could not preload reference data: {e}")
+
+    # Connections must not be shared across fork
+    for engine in iter_engines():
+        engine.dispose()
+
+    # Move everything built so far to the permanent generation so the
+    # collector does not touch (and copy) these pages in the workers
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded application state in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+
+def after_fork() -> None:
+    # Drop pooled connections inherited from the master without closing
+    # the parent's sockets
+    for engine in iter_engines():
+        engine.dispose(close=False)
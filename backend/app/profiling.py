@@ -0,0 +1,232 @@
+"""
+Opt-in SQL profiler for the Roster Monster API.
+
+When ``settings.sql_profiling_enabled`` is set, every request collects the
+statements it executed, grouped by fingerprint (the SQL with literals and
+parameters replaced by ``?``). The summary is returned in the
+``X-SQL-Profile`` and ``Server-Timing`` response headers, repeated SELECTs are
+reported as likely N+1 patterns, and slow statements feed a rolling report
+served to admins by ``/debug/sql/slow-queries``. Nothing is attached when
+profiling is disabled, so the default configuration pays no cost.
+"""
+import logging
+import re
+import threading
+import time
+from collections import deque
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("database")
+
+_COMMENT_RE = re.compile(r"--[^\n]*|/\*.*?\*/", re.S)
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_PARAM_RE = re.compile(r"%\([^)]+\)s|%s|:\w+|\?")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_IN_LIST_RE = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.I)
+_VALUES_RE = re.compile(r"\bVALUES\s*(\(\s*\?(?:\s*,\s*\?)*\s*\))(?:\s*,\s*\1)+", re.I)
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def fingerprint(statement: str) -> str:
+    """Normalise a statement so executions with different values group together."""
+    sql = _COMMENT_RE.sub(" ", statement)
+    sql = _STRING_RE.sub("?", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _IN_LIST_RE.sub("IN (...)", sql)
+    sql = _VALUES_RE.sub(r"VALUES \1, ...", sql)
+    return _WHITESPACE_RE.sub(" ", sql).strip()
+
+
+class RequestProfile:
+    """Statements executed while serving one request."""
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.count = 0
+        self.total_time = 0.0
+        self.statements: Dict[str, List[float]] = {}  # fingerprint -> [count, total_time]
+
+    def record(self, statement: str, duration: float) -> str:
+        key = fingerprint(statement)
+        stats = self.statements.get(key)
+        if stats is None:
+            self.statements[key] = [1, duration]
+        else:
+            stats[0] += 1
+            stats[1] += duration
+        self.count += 1
+        self.total_time += duration
+        return key
+
+    def n_plus_one(self, threshold: int) -> List[str]:
+        return [
+            key for key, (count, _) in self.statements.items()
+            if count >= threshold and key.upper().startswith("SELECT")
+        ]
+
+    def header_value(self, threshold: int) -> str:
+        return (
+            f"count={self.count};time_ms={self.total_time * 1000:.2f};"
+            f"distinct={len(self.statements)};n_plus_one={len(self.n_plus_one(threshold))}"
+        )
+
+
+class SlowQueryLog:
+    """Rolling window of slow statement executions, reported per fingerprint."""
+
+    def __init__(self, max_entries: int = 1000, window_seconds: float = 3600.0):
+        self.window_seconds = window_seconds
+        self._entries = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def add(self, key: str, duration: float, method: str, path: str) -> None:
+        with self._lock:
+            self._entries.append((time.time(), key, duration, method, path))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def report(self, limit: int = 20) -> List[dict]:
+        cutoff = time.time() - self.window_seconds
+        with self._lock:
+            entries = [entry for entry in self._entries if entry[0] >= cutoff]
+        grouped: Dict[str, dict] = {}
+        for timestamp, key, duration, method, path in entries:
+            item = grouped.setdefault(key, {
+                "fingerprint": key,
+                "count": 0,
+                "total_ms": 0.0,
+                "max_ms": 0.0,
+                "last_seen": 0.0,
+                "endpoints": set(),
+            })
+            item["count"] += 1
+            item["total_ms"] += duration * 1000
+            item["max_ms"] = max(item["max_ms"], duration * 1000)
+            item["last_seen"] = max(item["last_seen"], timestamp)
+            item["endpoints"].add(f"{method} {path}")
+        ranked = sorted(grouped.values(), key=lambda item: item["total_ms"], reverse=True)[:limit]
+        for item in ranked:
+            item["avg_ms"] = item["total_ms"] / item["count"]
+            item["endpoints"] = sorted(item["endpoints"])
+        return ranked
+
+
+_current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("sql_profile", default=None)
+
+
+class SQLProfiler:
+    """Collects per-request statement profiles through engine cursor events."""
+
+    def __init__(self, slow_query_ms: float = 100.0, n_plus_one_threshold: int = 5,
+                 slow_log: Optional[SlowQueryLog] = None):
+        self.slow_query_seconds = slow_query_ms / 1000
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self.slow_log = slow_log or SlowQueryLog()
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if _current_profile.get() is not None:
+            conn.info.setdefault("profiler_query_start", []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        profile = _current_profile.get()
+        starts = conn.info.get("profiler_query_start")
+        if profile is None or not starts:
+            return
+        duration = time.perf_counter() - starts.pop()
+        key = profile.record(statement, duration)
+        if duration >= self.slow_query_seconds:
+            self.slow_log.add(key, duration, profile.method, profile.path)
+
+    def _handle_error(self, exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("profiler_query_start"):
+            conn.info["profiler_query_start"].pop()
+
+    def attach(self, engine=Engine) -> None:
+        """Listen on ``engine``; by default every engine in the process."""
+        if event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            return
+        event.listen(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(engine, "handle_error", self._handle_error)
+
+    def detach(self, engine=Engine) -> None:
+        if not event.contains(engine, "before_cursor_execute", self._before_cursor_execute):
+            return
+        event.remove(engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(engine, "handle_error", self._handle_error)
+
+    def log_n_plus_one(self, profile: RequestProfile) -> None:
+        for key in profile.n_plus_one(self.n_plus_one_threshold):
+            count, total_time = profile.statements[key]
+            logger.warning(
+                f"Possible N+1 on {profile.method} {profile.path}: "
+                f"{count} executions, {total_time * 1000:.2f}ms - {key}"
+            )
+
+
+class SQLProfilerMiddleware:
+    """ASGI middleware that opens a profile per request and reports it in headers."""
+
+    def __init__(self, app, profiler: SQLProfiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(scope["method"], scope["path"])
+        threshold = self.profiler.n_plus_one_threshold
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-sql-profile", profile.header_value(threshold).encode()))
+                headers.append((
+                    b"server-timing",
+                    f'db;dur={profile.total_time * 1000:.2f};desc="{profile.count} queries"'.encode(),
+                ))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        token = _current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current_profile.reset(token)
+            self.profiler.log_n_plus_one(profile)
+
+
+def setup_sql_profiling(app: FastAPI, slow_query_ms: float = 100.0, n_plus_one_threshold: int = 5,
+                        report_path: str = "/debug/sql/slow-queries", dependencies: Sequence = ()) -> SQLProfiler:
+    """
+    Attach the profiler, its middleware and the slow query report endpoint.
+    The report shows SQL text, so pass `dependencies` that restrict who reads it.
+    """
+    profiler = SQLProfiler(slow_query_ms=slow_query_ms, n_plus_one_threshold=n_plus_one_threshold)
+    profiler.attach()
+    app.add_middleware(SQLProfilerMiddleware, profiler=profiler)
+
+    @app.get(report_path, include_in_schema=False, dependencies=list(dependencies))
+    def slow_queries(limit: int = 20):
+        return {
+            "slow_query_ms": slow_query_ms,
+            "window_seconds": profiler.slow_log.window_seconds,
+            "queries": profiler.slow_log.report(limit),
+        }
+
+    return profiler
@@ -0,0 +1,557 @@
+"""
+Live roster updates over WebSocket.
+
+Events are published to a broker (Redis pub/sub when configured, otherwise
+in-process) so every gunicorn worker receives them, then fanned out to the
+worker's own connections that subscribed to a matching location, staff member
+or date range. Each connection has a bounded send queue drained by its own
+task: a slow client never blocks the others, pending events for the same
+entity are coalesced, and a client whose queue is still full is disconnected.
+
+Change-feed events (see change_feed.py) are numbered by the broker and kept
+in a bounded log so a reconnecting client can resume from its last seq.
+"""
+import asyncio
+import itertools
+import json
+import logging
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import Any, Callable, Dict, FrozenSet, Iterable, List, Optional, Set
+
+from fastapi import WebSocket
+
+from .metrics import Counter, Gauge, registry
+
+logger = logging.getLogger("api")
+
+# Close code sent to clients that cannot keep up (RFC 6455 "try again later")
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+WS_CONNECTIONS = registry.register(Gauge(
+    "ws_connections",
+    "Open live-update WebSocket connections in this worker.",
+))
+WS_EVENTS = registry.register(Counter(
+    "ws_events_total",
+    "Live-update events per connection by outcome (queued, coalesced, dropped).",
+    ("outcome",),
+))
+
+
+def as_date(value) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if hasattr(value, "value"):
+        return value.value
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+@dataclass
+class Event:
+    """A roster change, addressed by the location/staff/dates it touches."""
+
+    type: str
+    data: Dict[str, Any]
+    key: Optional[str] = None  # events with the same key may be coalesced
+    location_id: Optional[int] = None
+    staff_id: Optional[int] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    _encoded: Optional[str] = field(default=None, repr=False, compare=False)
+
+    def encode(self) -> str:
+        # Serialized once and shared by every connection it is sent to
+        if self._encoded is None:
+            self._encoded = json.dumps({"type": self.type, "data": self.data}, default=_json_default)
+        return self._encoded
+
+    def to_wire(self) -> str:
+        return json.dumps({
+            "type": self.type,
+            "data": self.data,
+            "key": self.key,
+            "location_id": self.location_id,
+            "staff_id": self.staff_id,
+            "start_date": self.start_date,
+            "end_date": self.end_date,
+        }, default=_json_default)
+
+    @classmethod
+    def from_wire(cls, raw) -> "Event":
+        message = json.loads(raw)
+        return cls(
+            type=message["type"],
+            data=message["data"],
+            key=message.get("key"),
+            location_id=message.get("location_id"),
+            staff_id=message.get("staff_id"),
+            start_date=as_date(message.get("start_date")),
+            end_date=as_date(message.get("end_date")),
+        )
+
+
+@dataclass(frozen=True)
+class Subscription:
+    """Topics a connection listens to; with `everything` it gets every event in range."""
+
+    location_ids: FrozenSet[int] = frozenset()
+    staff_ids: FrozenSet[int] = frozenset()
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    everything: bool = False
+
+    @classmethod
+    def from_message(cls, message: dict) -> "Subscription":
+        return cls(
+            location_ids=frozenset(int(i) for i in message.get("location_ids") or ()),
+            staff_ids=frozenset(int(i) for i in message.get("staff_ids") or ()),
+            start_date=as_date(message.get("start_date")),
+            end_date=as_date(message.get("end_date")),
+            everything=message.get("all") is True,
+        )
+
+    def topics(self) -> Set[str]:
+        return {f"location:{i}" for i in self.location_ids} | {f"staff:{i}" for i in self.staff_ids}
+
+    def matches(self, event: Event) -> bool:
+        if not self.everything:
+            if event.location_id not in self.location_ids and event.staff_id not in self.staff_ids:
+                return False
+        return self.in_range(event)
+
+    def in_range(self, event: Event) -> bool:
+        if event.start_date is None:
+            return True
+        end = event.end_date or event.start_date
+        if self.start_date and end < self.start_date:
+            return False
+        if self.end_date and event.start_date > self.end_date:
+            return False
+        return True
+
+
+def merge_deltas(pending: dict, new: dict) -> dict:
+    """Fold two change-feed deltas for the same row into one carrying the newer seq."""
+    if new["op"] == "delete":
+        return new
+    merged = dict(new)
+    merged["op"] = "insert" if pending["op"] == "insert" else new["op"]
+    merged["changes"] = {**pending.get("changes", {}), **new.get("changes", {})}
+    return merged
+
+
+def coalesce_events(pending: Event, new: Event) -> Event:
+    """Deltas for the same row are merged; any other event is superseded by the newer one."""
+    if pending.type == new.type == "change":
+        return Event(new.type, merge_deltas(pending.data, new.data), new.key, new.location_id,
+                     new.staff_id, new.start_date, new.end_date)
+    return new
+
+
+class Connection:
+    """A WebSocket with a bounded send queue drained by a dedicated task."""
+
+    _ids = itertools.count()
+
+    def __init__(self, websocket: WebSocket, max_queue: int, send_timeout: float,
+                 coalesce: Callable[[Event, Event], Event] = coalesce_events):
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.coalesce = coalesce
+        self.subscription: Optional[Subscription] = None
+        self.closed = False
+        self._pending: "OrderedDict[Any, Event]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._on_failure: Optional[Callable[["Connection"], None]] = None
+        self._held: Optional[List[Event]] = None
+
+    def start(self, on_failure: Callable[["Connection"], None]) -> None:
+        self._on_failure = on_failure
+        self._task = asyncio.create_task(self._sender())
+
+    def offer(self, event: Event) -> bool:
+        """Queue an event without blocking. Returns False when the client is too slow."""
+        if self.closed:
+            return True
+        if self._held is not None:
+            self._held.append(event)
+            return len(self._held) <= self.max_queue
+        return self.enqueue(event)
+
+    def enqueue(self, event: Event, bounded: bool = True) -> bool:
+        """Queue an event even while live events are held (used for replays)."""
+        if event.key is not None and event.key in self._pending:
+            self._pending[event.key] = self.coalesce(self._pending[event.key], event)
+            # Keep the queue in seq order so a resume never skips an older event
+            self._pending.move_to_end(event.key)
+            WS_EVENTS.inc(outcome="coalesced")
+            return True
+        if bounded and len(self._pending) >= self.max_queue:
+            WS_EVENTS.inc(outcome="dropped")
+            return False
+        self._pending[event.key if event.key is not None else next(self._ids)] = event
+        self._ready.set()
+        WS_EVENTS.inc(outcome="queued")
+        return True
+
+    def hold(self) -> None:
+        """Buffer live events while a replay is fetched."""
+        self._held = []
+
+    def release(self, after_seq: int) -> bool:
+        """Queue the buffered live events, skipping changes the replay already covered."""
+        held, self._held = self._held or [], None
+        for event in held:
+            if event.type == "change" and event.data.get("seq", 0) <= after_seq:
+                continue
+            if not self.offer(event):
+                return False
+        return True
+
+    async def send(self, message: str) -> None:
+        await asyncio.wait_for(self.websocket.send_text(message), self.send_timeout)
+
+    async def _sender(self) -> None:
+        try:
+            while True:
+                await self._ready.wait()
+                while self._pending:
+                    _, event = self._pending.popitem(last=False)
+                    await self.send(event.encode())
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.info(f"Dropping live-update connection: {e!r}")
+            if self._on_failure:
+                self._on_failure(self)
+
+    async def close(self, code: int = 1000, reason: str = "") -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self._pending.clear()
+        if self._task and self._task is not asyncio.current_task():
+            self._task.cancel()
+        try:
+            await self.websocket.close(code=code, reason=reason)
+        except Exception:
+            pass
+
+
+class InMemoryBroker:
+    """
+    Delivers published events to this process only, numbering changes with a
+    per-process counter. Only for a single worker: with more, clients miss
+    other workers' changes and their seqs mean nothing elsewhere, so resume
+    breaks; gunicorn_conf.py refuses to start that way. Use RedisBroker.
+    """
+
+    def __init__(self, retain: int = 10000):
+        self._seq = 0
+        self._log: deque = deque(maxlen=retain)
+
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        self._on_message = on_message
+
+    async def publish(self, raw: str) -> None:
+        self._on_message(raw)
+
+    async def publish_sequenced(self, event: Event) -> int:
+        self._seq += 1
+        event.data["seq"] = self._seq
+        raw = event.to_wire()
+        self._log.append((self._seq, raw))
+        self._on_message(raw)
+        return self._seq
+
+    async def latest_seq(self) -> int:
+        return self._seq
+
+    async def replay(self, after_seq: int) -> Optional[List[str]]:
+        """Events after after_seq, or None when some of them are no longer retained."""
+        if after_seq >= self._seq:
+            return []
+        oldest = self._log[0][0] if self._log else self._seq + 1
+        if after_seq + 1 < oldest:
+            return None
+        return [raw for seq, raw in self._log if seq > after_seq]
+
+    async def stop(self) -> None:
+        pass
+
+
+# Assigns the next sequence number, appends the event to the retained log and
+# publishes it in one atomic step, so every worker sees changes in seq order
+_PUBLISH_SEQUENCED = """
+local seq = redis.call('INCR', KEYS[1])
+local event = cjson.decode(ARGV[1])
+event['data']['seq'] = seq
+local raw = cjson.encode(event)
+redis.call('ZADD', KEYS[2], seq, raw)
+redis.call('ZREMRANGEBYRANK', KEYS[2], 0, -(tonumber(ARGV[2]) + 1))
+redis.call('PUBLISH', ARGV[3], raw)
+return seq
+"""
+
+
+class RedisBroker:
+    """Redis pub/sub channel shared by all workers, with the change log in a sorted set."""
+
+    def __init__(self, url: str, channel: str, retain: int = 10000):
+        self.url = url
+        self.channel = channel
+        self.retain = retain
+        self.seq_key = f"{channel}:seq"
+        self.log_key = f"{channel}:log"
+        self._redis = None
+        self._reader: Optional[asyncio.Task] = None
+
+    async def start(self, on_message: Callable[[str], None]) -> None:
+        import redis.asyncio as aioredis
+
+        self._redis = aioredis.from_url(self.url, decode_responses=True)
+        pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel)
+        self._reader = asyncio.create_task(self._read(pubsub, on_message))
+
+    async def _read(self, pubsub, on_message) -> None:
+        while True:
+            try:
+                async for message in pubsub.listen():
+                    on_message(message["data"])
+            except asyncio.CancelledError:
+                await pubsub.aclose()
+                raise
+            except Exception as e:
+                logger.warning(f"Redis pub/sub reader failed, resubscribing: {e!r}")
+                await asyncio.sleep(1)
+                try:
+                    await pubsub.subscribe(self.channel)
+                except Exception:
+                    pass
+
+    async def publish(self, raw: str) -> None:
+        await self._redis.publish(self.channel, raw)
+
+    async def publish_sequenced(self, event: Event) -> int:
+        return await self._redis.eval(_PUBLISH_SEQUENCED, 2, self.seq_key, self.log_key,
+                                      event.to_wire(), self.retain, self.channel)
+
+    async def latest_seq(self) -> int:
+        return int(await self._redis.get(self.seq_key) or 0)
+
+    async def replay(self, after_seq: int) -> Optional[List[str]]:
+        latest = await self.latest_seq()
+        if after_seq >= latest:
+            return []
+        oldest = await self._redis.zrange(self.log_key, 0, 0, withscores=True)
+        if not oldest or after_seq + 1 < int(oldest[0][1]):
+            return None
+        return await self._redis.zrangebyscore(self.log_key, f"({after_seq}", "+inf")
+
+    async def stop(self) -> None:
+        if self._reader:
+            self._reader.cancel()
+        if self._redis:
+            await self._redis.aclose()
+
+
+class FanoutHub:
+    """Tracks this worker's connections and routes broker events to them."""
+
+    def __init__(self, broker, max_queue: int = 256, send_timeout: float = 5.0,
+                 coalesce: Callable[[Event, Event], Event] = coalesce_events):
+        self.broker = broker
+        self.max_queue = max_queue
+        self.send_timeout = send_timeout
+        self.coalesce = coalesce
+        self._open: Set[Connection] = set()
+        self._everything: Set[Connection] = set()
+        self._by_topic: Dict[str, Set[Connection]] = {}
+        self._handlers: Dict[str, List[Callable[[Event], None]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._started = False
+
+    async def start(self) -> None:
+        if self._started:
+            return
+        self._loop = asyncio.get_running_loop()
+        await self.broker.start(self._on_broker_message)
+        self._started = True
+
+    async def stop(self) -> None:
+        for connection in list(self.connections()):
+            await connection.close(code=1001, reason="Server shutting down")
+        await self.broker.stop()
+        self._started = False
+
+    def on(self, event_type: str, handler: Callable[[Event], None]) -> None:
+        """Handle broker events of `event_type` in this worker instead of sending them to clients."""
+        self._handlers.setdefault(event_type, []).append(handler)
+
+    def connections(self) -> Iterable[Connection]:
+        return set(self._open)
+
+    async def connect(self, websocket: WebSocket) -> Connection:
+        await self.start()
+        await websocket.accept()
+        connection = Connection(websocket, self.max_queue, self.send_timeout, self.coalesce)
+        connection.start(on_failure=self._drop_soon)
+        self._open.add(connection)
+        WS_CONNECTIONS.inc()
+        return connection
+
+    async def disconnect(self, connection: Connection) -> None:
+        if self._detach(connection):
+            await connection.close()
+
+    def _detach(self, connection: Connection) -> bool:
+        if connection not in self._open:
+            return False
+        self._open.discard(connection)
+        self._unindex(connection)
+        WS_CONNECTIONS.dec()
+        return True
+
+    def subscribe(self, connection: Connection, subscription: Subscription) -> None:
+        self._unindex(connection)
+        connection.subscription = subscription
+        if subscription.everything:
+            self._everything.add(connection)
+        for topic in subscription.topics():
+            self._by_topic.setdefault(topic, set()).add(connection)
+
+    async def resume(self, connection: Connection, subscription: Subscription, since_seq: int) -> bool:
+        """Subscribe and first replay the retained changes after since_seq.
+
+        Returns False when the client is too far behind and must reload instead.
+        """
+        connection.hold()
+        self.subscribe(connection, subscription)
+        try:
+            replay = await self.broker.replay(since_seq)
+        except Exception:
+            connection.release(since_seq)
+            raise
+        if replay is None:
+            connection.release(since_seq)
+            return False
+        # The replay is bounded by the broker's retention rather than the send queue
+        last_seq = since_seq
+        for raw in replay:
+            event = Event.from_wire(raw)
+            last_seq = event.data.get("seq", last_seq)
+            if subscription.matches(event):
+                connection.enqueue(event, bounded=False)
+        if not connection.release(last_seq):
+            self.drop_slow_consumer(connection)
+        return True
+
+    async def latest_seq(self) -> int:
+        return await self.broker.latest_seq()
+
+    def unsubscribe(self, connection: Connection) -> None:
+        self._unindex(connection)
+        connection.subscription = None
+
+    def _unindex(self, connection: Connection) -> None:
+        self._everything.discard(connection)
+        if connection.subscription is None:
+            return
+        for topic in connection.subscription.topics():
+            subscribers = self._by_topic.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self._by_topic[topic]
+
+    # Publishing
+
+    async def publish(self, event: Event) -> None:
+        await self.start()
+        await self.broker.publish(event.to_wire())
+
+    async def publish_change(self, event: Event) -> int:
+        """Publish a change-feed delta; the broker assigns its sequence number."""
+        await self.start()
+        return await self.broker.publish_sequenced(event)
+
+    async def _publish_in_order(self, events: List[Event]) -> None:
+        for event in events:
+            if event.type == "change":
+                await self.publish_change(event)
+            else:
+                await self.publish(event)
+
+    def publish_threadsafe(self, *events: Event) -> None:
+        """Publish from synchronous code such as endpoints running in the threadpool."""
+        if self._loop is None or self._loop.is_closed():
+            logger.debug(f"Live updates not started, dropping {len(events)} event(s)")
+            return
+        self._loop.call_soon_threadsafe(self._loop.create_task, self._publish_in_order(list(events)))
+
+    # Delivery
+
+    def _on_broker_message(self, raw: str) -> None:
+        try:
+            event = Event.from_wire(raw)
+        except (ValueError, KeyError) as e:
+            logger.warning(f"Ignoring malformed live-update event: {e!r}")
+            return
+        handlers = self._handlers.get(event.type)
+        if handlers is not None:
+            for handler in handlers:
+                handler(event)
+            return
+        self.dispatch(event)
+
+    def dispatch(self, event: Event) -> None:
+        """Queue an event on every matching local connection; never blocks."""
+        candidates = set(self._everything)
+        if event.location_id is not None:
+            candidates |= self._by_topic.get(f"location:{event.location_id}", set())
+        if event.staff_id is not None:
+            candidates |= self._by_topic.get(f"staff:{event.staff_id}", set())
+        for connection in candidates:
+            if connection.subscription is None or not connection.subscription.in_range(event):
+                continue
+            if not connection.offer(event):
+                self.drop_slow_consumer(connection)
+
+    def drop_slow_consumer(self, connection: Connection) -> None:
+        """Disconnect a client whose send queue is full."""
+        self._drop_soon(connection, SLOW_CONSUMER_CLOSE_CODE, "Slow consumer")
+
+    def _drop_soon(self, connection: Connection, code: int = 1011, reason: str = "Send failed") -> None:
+        if self._detach(connection):
+            asyncio.get_running_loop().create_task(connection.close(code=code, reason=reason))
+
+
+def _create_hub() -> FanoutHub:
+    from .config.config import settings
+
+    if settings.realtime_backend == "redis":
+        broker = RedisBroker(f"redis://{settings.redis_host}:{settings.redis_port}", settings.realtime_channel,
+                             retain=settings.change_feed_retain)
+    else:
+        broker = InMemoryBroker(retain=settings.change_feed_retain)
+    return FanoutHub(broker, max_queue=settings.ws_send_queue_size, send_timeout=settings.ws_send_timeout_seconds)
+
+
+hub = _create_hub()
+
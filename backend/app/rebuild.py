@@ -0,0 +1,43 @@
+"""
+Recount the tables the app keeps current by deltas from the rows they are
+derived from, for when those rows changed by other means (bulk SQL, a
+restore, a fix to the counting):
+
+    python -m app.rebuild availability_bitmap      # the bitmaps, then the daily counts
+    python -m app.rebuild slot_coverage leave_balances
+
+Each rebuild replaces its table in one transaction.
+"""
+import argparse
+
+from . import availability_aggregates, availability_bitmap, leave_balances, slot_coverage
+
+# name: (rebuild(db) -> rows written, what the rows are)
+REBUILDS = {
+    "availability_bitmap": (availability_bitmap.rebuild, "staff-month bitmaps"),
+    "availability_aggregates": (availability_aggregates.rebuild, "daily availability counts"),
+    "slot_coverage": (slot_coverage.rebuild, "slot coverage counts"),
+    "leave_balances": (leave_balances.rebuild, "leave balance totals"),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recount the derived availability, coverage and leave tables")
+    parser.add_argument("tables", nargs="+", choices=list(REBUILDS), metavar="table",
+                        help=", ".join(REBUILDS))
+    args = parser.parse_args(argv)
+
+    from .config.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        for name in args.tables:
+            rebuild, rows = REBUILDS[name]
+            print(f"wrote {rebuild(db)} {rows}")
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+"""
+Read-mostly reference data: role and staff group lookup tables, locations and
+their weekly time-slot calendar.
+
+The data is loaded once per process into immutable structures. Under gunicorn
+with preload_app the master builds it before forking, so every worker shares
+the same pages copy-on-write instead of querying and building its own copy
+(see prefork.py and gunicorn_conf.py). Workers rebuild their copy when it is
+older than the configured TTL or after a write invalidates it: the writing
+worker drops its copy and broadcasts the invalidation through the live-update
+broker (Redis when configured), so the other workers drop theirs too.
+"""
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+from types import MappingProxyType
+from typing import Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from . import realtime
+from . import roster_models as models
+
+logger = logging.getLogger("database")
+
+INVALIDATED_EVENT = "reference_data_invalidated"
+
+
+@dataclass(frozen=True)
+class TimeSlot:
+    id: int
+    location_id: int
+    start_time: str
+    end_time: str
+    days: FrozenSet[int]  # ISO weekdays, 1 = Monday
+
+
+@dataclass(frozen=True)
+class LocationInfo:
+    id: int
+    name: str
+    location_type: str
+    priority: int
+    priority_group: Optional[str]
+    min_staff_required: int
+    fte_points: float
+    allows_double_station: bool
+    time_slots: Tuple[TimeSlot, ...]
+
+
+@dataclass(frozen=True)
+class ReferenceData:
+    roles: Mapping[int, str]
+    role_ids: Mapping[str, int]
+    staff_groups: Mapping[int, str]
+    staff_group_ids: Mapping[str, int]
+    locations: Mapping[int, LocationInfo]
+    calendar: Mapping[int, Tuple[TimeSlot, ...]]  # ISO weekday -> slots
+    loaded_at: float
+
+    def slots_on(self, day: date) -> Tuple[TimeSlot, ...]:
+        return self.calendar.get(day.isoweekday(), ())
+
+    def calendar_between(self, start: date, end: date) -> Dict[date, Tuple[TimeSlot, ...]]:
+        days = {}
+        current = start
+        while current <= end:
+            days[current] = self.slots_on(current)
+            current += timedelta(days=1)
+        return days
+
+
+def _parse_days(days_of_week: str) -> FrozenSet[int]:
+    days = set()
+    for part in (days_of_week or "").split(","):
+        part = part.strip()
+        if part.isdigit() and 1 <= int(part) <= 7:
+            days.add(int(part))
+    return frozenset(days)
+
+
+def load_reference_data(db: Session) -> ReferenceData:
+    """Build a ReferenceData snapshot with one query per table."""
+    roles = {
+        role.id: role.name
+        for role in db.query(models.Role.id, models.Role.name).filter(models.Role.active == True)
+    }
+    groups = {
+        group.id: group.name
+        for group in db.query(models.StaffGroup.id, models.StaffGroup.name).filter(
+            models.StaffGroup.active == True
+        )
+    }
+
+    slots_by_location: Dict[int, List[TimeSlot]] = {}
+    calendar: Dict[int, List[TimeSlot]] = {day: [] for day in range(1, 8)}
+    time_slots = db.query(
+        models.LocationTimeSlot.id,
+        models.LocationTimeSlot.location_id,
+        models.LocationTimeSlot.start_time,
+        models.LocationTimeSlot.end_time,
+        models.LocationTimeSlot.days_of_week,
+    ).filter(models.LocationTimeSlot.active == True).order_by(models.LocationTimeSlot.start_time)
+    for row in time_slots:
+        slot = TimeSlot(row.id, row.location_id, row.start_time, row.end_time, _parse_days(row.days_of_week))
+        slots_by_location.setdefault(slot.location_id, []).append(slot)
+
+    locations = {}
+    for location in db.query(models.Location).filter(models.Location.active == True):
+        slots = tuple(slots_by_location.get(location.id, ()))
+        locations[location.id] = LocationInfo(
+            id=location.id,
+            name=location.name,
+            location_type=getattr(location.location_type, "value", location.location_type),
+            priority=location.priority or 0,
+            priority_group=location.priority_group,
+            min_staff_required=location.min_staff_required or 0,
+            fte_points=location.fte_points or 0.0,
+            allows_double_station=bool(location.allows_double_station),
+            time_slots=slots,
+        )
+        for slot in slots:
+            for day in slot.days:
+                calendar[day].append(slot)
+
+    return ReferenceData(
+        roles=MappingProxyType(roles),
+        role_ids=MappingProxyType({name: id for id, name in roles.items()}),
+        staff_groups=MappingProxyType(groups),
+        staff_group_ids=MappingProxyType({name: id for id, name in groups.items()}),
+        locations=MappingProxyType(locations),
+        calendar=MappingProxyType({day: tuple(slots) for day, slots in calendar.items()}),
+        loaded_at=time.monotonic(),
+    )
+
+
+_lock = threading.Lock()
+_current: Optional[ReferenceData] = None
+
+
+def _ttl() -> float:
+    from .config.config import settings
+
+    return settings.reference_data_ttl_seconds
+
+
+def get_reference_data(db: Session) -> ReferenceData:
+    """Return this process's snapshot, rebuilding it when missing or older than the TTL."""
+    global _current
+    data = _current
+    ttl = _ttl()
+    if data is not None and (ttl <= 0 or time.monotonic() - data.loaded_at < ttl):
+        return data
+    with _lock:
+        data = _current
+        if data is None or (ttl > 0 and time.monotonic() - data.loaded_at >= ttl):
+            data = _current = load_reference_data(db)
+            logger.info(
+                f"Loaded reference data: {len(data.roles)} roles, {len(data.staff_groups)} groups, "
+                f"{len(data.locations)} locations"
+            )
+    return data
+
+
+def preload_reference_data(db: Session) -> ReferenceData:
+    """Build the snapshot eagerly, e.g. in the gunicorn master before fork."""
+    invalidate_reference_data(broadcast=False)
+    return get_reference_data(db)
+
+
+def invalidate_reference_data(broadcast: bool = True) -> None:
+    """Drop this process's snapshot, and with `broadcast` every worker's; the next read rebuilds it."""
+    global _current
+    _current = None
+    if broadcast:
+        realtime.hub.publish_threadsafe(realtime.Event(type=INVALIDATED_EVENT, data={}))
+
+
+def install_reference_data_invalidation(hub: realtime.FanoutHub) -> None:
+    """Drop this worker's snapshot whenever any worker broadcasts an invalidation."""
+    hub.on(INVALIDATED_EVENT, lambda event: invalidate_reference_data(broadcast=False))
@@ -0,0 +1,224 @@
+"""
+Report drafts kept as an append-only revision log.
+
+Autosaves send edits against the version they were made on, and each save
+appends one small row to report_revisions:
+
+    patch     [[at, delete, insert], ...] applied in order, each position
+              counted in the text as left by the edits before it
+    snapshot  the full text
+
+The first revision of a report, every SNAPSHOT_INTERVAL-th after it, and any
+edit that replaces more than half the text are stored as snapshots, so
+reading a version replays at most SNAPSHOT_INTERVAL patches onto the nearest
+snapshot before it. Recent versions are also kept in memory, so an autosave
+on top of the last one usually costs one INSERT. The report row itself is
+only written when the draft is finalised.
+
+Two saves on the same version race for the same (report_id, version) row;
+the unique key lets one win and the other gets DraftConflict.
+"""
+import json
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .cache import LRUCache
+from .config.config import settings
+
+SNAPSHOT_INTERVAL = 50
+MAX_EDITS = 1000
+
+draft_texts = LRUCache(
+    "report_drafts", settings.report_draft_cache_mb * 1024 * 1024,
+    sizeof=lambda value: len(value[0]) + 64,
+)
+
+
+class DraftConflict(Exception):
+    """The save was based on a version that is no longer the latest."""
+
+    def __init__(self, version: int):
+        super().__init__(f"Draft is at version {version}")
+        self.version = version
+
+
+Edit = Tuple[int, int, str]  # at, delete, insert
+
+
+@dataclass
+class DraftVersion:
+    version: int
+    text: str
+    snapshot_version: int  # latest snapshot at or before this version
+
+
+def apply_edits(text: str, edits: Sequence[Edit]) -> str:
+    if len(edits) > MAX_EDITS:
+        raise ValueError(f"At most {MAX_EDITS} edits per save")
+    for at, delete, inserted in edits:
+        if at < 0 or delete < 0 or at + delete > len(text):
+            raise ValueError(f"Edit at {at} deleting {delete} is outside the text ({len(text)} characters)")
+        text = text[:at] + inserted + text[at + delete:]
+    return text
+
+
+def diff(old: str, new: str) -> List[Edit]:
+    """
+    One edit replacing the span between the common prefix and suffix. An
+    autosave usually changes one region, and this is linear in the length.
+    """
+    if old == new:
+        return []
+    limit = min(len(old), len(new))
+    start = 0
+    while start < limit and old[start] == new[start]:
+        start += 1
+    end = 0
+    while end < limit - start and old[-1 - end] == new[-1 - end]:
+        end += 1
+    return [(start, len(old) - start - end, new[start:len(new) - end])]
+
+
+def _edits_size(edits: Sequence[Edit]) -> int:
+    return sum(delete + len(inserted) for _, delete, inserted in edits)
+
+
+def _cache(report_id: int, draft: DraftVersion) -> None:
+    draft_texts.put((report_id, draft.version), (draft.text, draft.snapshot_version))
+
+
+def _initial_text(db: Session, report_id: int) -> str:
+    Report = models.Report
+    return db.scalar(select(Report.report_data).where(Report.id == report_id)) or ""
+
+
+def latest_version(db: Session, report_id: int) -> int:
+    Revision = models.ReportRevision
+    version = db.scalar(select(Revision.version).where(Revision.report_id == report_id)
+                        .order_by(Revision.version.desc()).limit(1))
+    return version or 0
+
+
+def load_version(db: Session, report_id: int, version: Optional[int] = None) -> Optional[DraftVersion]:
+    """
+    The draft text at `version` (default: the latest), or None if there is
+    no such version. Version 0 is the report's saved text before any draft.
+    """
+    Revision = models.ReportRevision
+    if version is None:
+        version = latest_version(db, report_id)
+    cached = draft_texts.get((report_id, version))
+    if cached is not None:
+        return DraftVersion(version, *cached)
+    if version == 0:
+        # Not cached: the report's text may still change until the first revision
+        return DraftVersion(0, _initial_text(db, report_id), 0)
+
+    snapshot = db.execute(
+        select(Revision.version, Revision.data)
+        .where(Revision.report_id == report_id, Revision.kind == "snapshot", Revision.version <= version)
+        .order_by(Revision.version.desc()).limit(1)
+    ).first()
+    if snapshot is None:
+        return None
+    patches = db.execute(
+        select(Revision.version, Revision.data)
+        .where(Revision.report_id == report_id, Revision.version > snapshot.version, Revision.version <= version)
+        .order_by(Revision.version)
+    ).all()
+    if len(patches) != version - snapshot.version:
+        return None
+    text = snapshot.data
+    for patch in patches:
+        text = apply_edits(text, json.loads(patch.data))
+    draft = DraftVersion(version, text, snapshot.version)
+    _cache(report_id, draft)
+    return draft
+
+
+def save(db: Session, report_id: int, base_version: int, author_id: int,
+         edits: Optional[Sequence[Edit]] = None, text: Optional[str] = None) -> DraftVersion:
+    """
+    Append a revision made on `base_version`, from edits or from the new full
+    text, and commit. Saving no change returns the base version unchanged.
+    Raises DraftConflict if `base_version` is not the latest and ValueError
+    for edits that do not fit the text.
+    """
+    base = load_version(db, report_id, base_version)
+    if base is None:
+        raise DraftConflict(latest_version(db, report_id))
+    if text is None:
+        edits = [tuple(edit) for edit in edits or ()]
+        text = apply_edits(base.text, edits)
+        # Keep whichever of the client's edits and the single spanning edit is smaller
+        spanning = diff(base.text, text)
+        if _edits_size(spanning) <= _edits_size(edits):
+            edits = spanning
+    else:
+        edits = diff(base.text, text)
+    if text == base.text:
+        # Nothing to write, but a stale base is still a conflict
+        latest = latest_version(db, report_id)
+        if latest != base_version:
+            raise DraftConflict(latest)
+        return base
+
+    version = base_version + 1
+    snapshot = (
+        base_version == 0
+        or version - base.snapshot_version >= SNAPSHOT_INTERVAL
+        or _edits_size(edits) * 2 > len(text)
+    )
+    try:
+        db.execute(insert(models.ReportRevision).values(
+            report_id=report_id,
+            version=version,
+            kind="snapshot" if snapshot else "patch",
+            data=text if snapshot else json.dumps(edits, separators=(",", ":"), ensure_ascii=False),
+            length=len(text),
+            author_id=author_id,
+        ))
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise DraftConflict(latest_version(db, report_id))
+    draft = DraftVersion(version, text, version if snapshot else base.snapshot_version)
+    _cache(report_id, draft)
+    return draft
+
+
+def revisions(db: Session, report_id: int, limit: int = 100, before: Optional[int] = None) -> list:
+    """Revision metadata, newest first, without the stored text."""
+    Revision = models.ReportRevision
+    query = select(
+        Revision.version, Revision.kind, Revision.length, Revision.author_id, Revision.date_created
+    ).where(Revision.report_id == report_id)
+    if before is not None:
+        query = query.where(Revision.version < before)
+    return db.execute(query.order_by(Revision.version.desc()).limit(limit)).mappings().all()
+
+
+def restore(db: Session, report_id: int, version: int, base_version: int, author_id: int) -> Optional[DraftVersion]:
+    """Append a revision that brings back the text of `version`; None if there is no such version."""
+    old = load_version(db, report_id, version)
+    if old is None:
+        return None
+    return save(db, report_id, base_version, author_id, text=old.text)
+
+
+def finalise(db: Session, report, version: int) -> DraftVersion:
+    """
+    Write the text of `version`, which must be the latest, to the report.
+    The caller commits.
+    """
+    current = latest_version(db, report.id)
+    if version != current:
+        raise DraftConflict(current)
+    draft = load_version(db, report.id, version)
+    report.report_data = draft.text
+    return draft
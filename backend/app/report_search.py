@@ -0,0 +1,359 @@
+"""
+Full-text search over a user's reports.
+
+Each report is indexed as one document: its owner, its study (the name of
+the template it was written from), its date and its text with the HTML
+stripped. The report endpoints write a report's document when it is created
+or updated and remove it when the report is deleted, so the index stays
+current without rebuilds; `python -m app.report_search rebuild` recreates it
+from the reports table after a restore or a change to what is indexed.
+
+Two stores answer the same queries:
+
+    mysql   report_search_documents, with FULLTEXT indexes, in the main
+            database; queried with MATCH ... AGAINST in boolean mode
+    sqlite  an FTS5 index in a local file (report_search_path), ranked with
+            BM25; for development and any database other than MySQL
+
+Every word of the query must occur in the study or the text, as a prefix,
+so "nod calc" finds "calcified nodule". Hits are ranked by relevance, with
+the study counting double, or newest first when there are only filters.
+"""
+import argparse
+import html
+import logging
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert, match
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .config.config import settings
+
+logger = logging.getLogger("database")
+
+MAX_QUERY_TERMS = 16
+SNIPPET_WORDS = 16
+REBUILD_BATCH_SIZE = 1000
+
+TAG = re.compile(r"<[^>]*>")
+SPACE = re.compile(r"\s+")
+TERM = re.compile(r"\w+")
+# Highlight markers in snippets; they cannot occur in stripped report text
+MARK_START, MARK_END = "\x02", "\x03"
+
+
+@dataclass(frozen=True)
+class ReportDocument:
+    report_id: int
+    owner_id: int
+    study: str
+    report_date: Optional[date]
+    body: str
+
+
+@dataclass
+class SearchHit:
+    report_id: int
+    score: float
+    study: str
+    report_date: Optional[date]
+    snippet: str  # HTML: escaped text with matches in <mark>
+
+
+def strip_html(value: str) -> str:
+    return SPACE.sub(" ", html.unescape(TAG.sub(" ", value))).strip()
+
+
+def query_terms(query: Optional[str]) -> List[str]:
+    return TERM.findall((query or "").lower())[:MAX_QUERY_TERMS]
+
+
+def report_documents(db: Session, reports: Sequence) -> List[ReportDocument]:
+    """Documents for the given Report rows; study names are read with one query."""
+    template_ids = {report.template_used for report in reports if report.template_used}
+    studies: Dict[int, str] = {}
+    if template_ids:
+        Template = models.Template
+        studies = dict(db.execute(select(Template.id, Template.name).where(Template.id.in_(template_ids))).all())
+    documents = []
+    for report in reports:
+        when = report.date_modified or report.date_created
+        documents.append(ReportDocument(
+            report_id=report.id,
+            owner_id=report.report_by,
+            study=studies.get(report.template_used, ""),
+            report_date=when.date() if isinstance(when, datetime) else when,
+            body=strip_html(report.report_data or ""),
+        ))
+    return documents
+
+
+def _highlight(snippet: str) -> str:
+    return html.escape(snippet).replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def _snippet(body: str, terms: List[str]) -> str:
+    """Up to SNIPPET_WORDS words of `body` around the first matching word, matches marked."""
+    words = body.split(" ")
+    matches = [i for i, word in enumerate(words) if any(w.startswith(t) for w in query_terms(word) for t in terms)]
+    start = max(0, matches[0] - SNIPPET_WORDS // 4) if matches else 0
+    shown = words[start:start + SNIPPET_WORDS]
+    hit = set(matches)
+    text = " ".join(
+        f"{MARK_START}{word}{MARK_END}" if start + i in hit else word for i, word in enumerate(shown)
+    )
+    return ("…" if start else "") + text + ("…" if start + SNIPPET_WORDS < len(words) else "")
+
+
+class SQLiteReportIndex:
+    """FTS5 index in its own file; the document's rowid is the report id."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS report_search USING fts5("
+                "report_date UNINDEXED, owner, study, body, "
+                "prefix='2 3 4', tokenize='porter unicode61 remove_diacritics 2')"
+            )
+            # ORDER BY rank uses these column weights: date, owner, study, body
+            conn.execute("INSERT INTO report_search(report_search, rank) VALUES ('rank', 'bm25(0, 0, 2, 1)')")
+            self._conn = conn
+        return self._conn
+
+    def upsert(self, documents: Sequence[ReportDocument]) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN")
+            try:
+                conn.executemany("DELETE FROM report_search WHERE rowid = ?", [(d.report_id,) for d in documents])
+                conn.executemany(
+                    "INSERT INTO report_search(rowid, report_date, owner, study, body) VALUES (?, ?, ?, ?, ?)",
+                    [(d.report_id, d.report_date and d.report_date.isoformat(), f"u{d.owner_id}", d.study, d.body)
+                     for d in documents],
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def remove(self, report_ids: Sequence[int]) -> None:
+        with self._lock:
+            self._connection().executemany(
+                "DELETE FROM report_search WHERE rowid = ?", [(report_id,) for report_id in report_ids]
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._connection().execute("DELETE FROM report_search")
+
+    def search(self, owner_id: int, terms: List[str], study_terms: List[str],
+               date_from: Optional[date], date_to: Optional[date], limit: int, offset: int) -> List[SearchHit]:
+        # Terms are \w+ only, so quoting them makes any input a valid FTS5 query
+        expression = f'owner : "u{owner_id}"'
+        if terms:
+            expression += " AND {study body} : (" + " AND ".join(f'"{t}"*' for t in terms) + ")"
+        if study_terms:
+            expression += " AND study : (" + " AND ".join(f'"{t}"*' for t in study_terms) + ")"
+        sql = (
+            "SELECT rowid, study, report_date, "
+            f"snippet(report_search, 3, char(2), char(3), '…', {SNIPPET_WORDS}), rank "
+            "FROM report_search WHERE report_search MATCH ?"
+        )
+        params: list = [expression]
+        if date_from:
+            sql += " AND report_date >= ?"
+            params.append(date_from.isoformat())
+        if date_to:
+            sql += " AND report_date <= ?"
+            params.append(date_to.isoformat())
+        sql += " ORDER BY rank" if terms else " ORDER BY report_date DESC, rowid DESC"
+        sql += " LIMIT ? OFFSET ?"
+        params += [limit, offset]
+        with self._lock:
+            rows = self._connection().execute(sql, params).fetchall()
+        return [
+            SearchHit(
+                report_id=report_id,
+                score=-rank if terms else 0.0,
+                study=study,
+                report_date=date.fromisoformat(report_date) if report_date else None,
+                snippet=_highlight(snippet),
+            )
+            for report_id, study, report_date, snippet, rank in rows
+        ]
+
+
+class MySQLReportIndex:
+    """FULLTEXT-indexed documents in the main database, written through the request's session."""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def upsert(self, documents: Sequence[ReportDocument]) -> None:
+        statement = mysql_insert(models.ReportSearchDocument)
+        statement = statement.on_duplicate_key_update(
+            owner_id=statement.inserted.owner_id,
+            study=statement.inserted.study,
+            report_date=statement.inserted.report_date,
+            body=statement.inserted.body,
+        )
+        self.db.execute(statement, [
+            {"report_id": d.report_id, "owner_id": d.owner_id, "study": d.study,
+             "report_date": d.report_date, "body": d.body}
+            for d in documents
+        ])
+        self.db.commit()
+
+    def remove(self, report_ids: Sequence[int]) -> None:
+        Doc = models.ReportSearchDocument
+        self.db.execute(delete(Doc).where(Doc.report_id.in_(report_ids)))
+        self.db.commit()
+
+    def clear(self) -> None:
+        self.db.execute(delete(models.ReportSearchDocument))
+        self.db.commit()
+
+    def search(self, owner_id: int, terms: List[str], study_terms: List[str],
+               date_from: Optional[date], date_to: Optional[date], limit: int, offset: int) -> List[SearchHit]:
+        Doc = models.ReportSearchDocument
+        query = select(Doc.report_id, Doc.study, Doc.report_date, Doc.body).where(Doc.owner_id == owner_id)
+        if terms:
+            # MATCH (study, body) ranks by both; a second MATCH on study alone weights it double
+            against = " ".join(f"+{t}*" for t in terms)
+            text_score = match(Doc.study, Doc.body, against=against).in_boolean_mode()
+            study_score = match(Doc.study, against=" ".join(f"{t}*" for t in terms)).in_boolean_mode()
+            score = (text_score + study_score).label("score")
+            query = query.add_columns(score).where(text_score).order_by(score.desc(), Doc.report_id.desc())
+        else:
+            query = query.order_by(Doc.report_date.desc(), Doc.report_id.desc())
+        if study_terms:
+            query = query.where(match(Doc.study, against=" ".join(f"+{t}*" for t in study_terms)).in_boolean_mode())
+        if date_from:
+            query = query.where(Doc.report_date >= date_from)
+        if date_to:
+            query = query.where(Doc.report_date <= date_to)
+        rows = self.db.execute(query.limit(limit).offset(offset)).all()
+        return [
+            SearchHit(
+                report_id=row.report_id,
+                score=float(row.score) if terms else 0.0,
+                study=row.study,
+                report_date=row.report_date,
+                snippet=_highlight(_snippet(row.body, terms)),
+            )
+            for row in rows
+        ]
+
+
+_sqlite_index: Optional[SQLiteReportIndex] = None
+_sqlite_lock = threading.Lock()
+
+
+def get_index(db: Session):
+    """The configured store; "auto" uses MySQL when the database is MySQL and SQLite otherwise."""
+    global _sqlite_index
+    backend = settings.report_search_backend
+    if backend == "auto":
+        backend = "mysql" if db.get_bind().dialect.name in ("mysql", "mariadb") else "sqlite"
+    if backend == "mysql":
+        return MySQLReportIndex(db)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown report_search_backend {backend!r}")
+    with _sqlite_lock:
+        if _sqlite_index is None:
+            _sqlite_index = SQLiteReportIndex(settings.report_search_path)
+        return _sqlite_index
+
+
+def index_reports(db: Session, reports: Sequence) -> None:
+    """
+    Write the documents of committed reports. A failure is logged rather than
+    raised, since the report itself is saved; a rebuild repairs the index.
+    """
+    try:
+        get_index(db).upsert(report_documents(db, reports))
+    except Exception:
+        logger.exception(f"Could not index reports {[report.id for report in reports]}")
+
+
+def unindex_reports(db: Session, report_ids: Sequence[int]) -> None:
+    try:
+        get_index(db).remove(report_ids)
+    except Exception:
+        logger.exception(f"Could not remove reports {list(report_ids)} from the search index")
+
+
+def search_reports(db: Session, owner_id: int, query: Optional[str] = None, study: Optional[str] = None,
+                   date_from: Optional[date] = None, date_to: Optional[date] = None,
+                   limit: int = 20, offset: int = 0) -> List[SearchHit]:
+    """
+    The owner's reports matching `query` and the filters, best first. Hits
+    are checked against the reports table, so reports deleted or reassigned
+    since they were indexed are never returned.
+    """
+    hits = get_index(db).search(
+        owner_id, query_terms(query), query_terms(study), date_from, date_to, limit, offset
+    )
+    if not hits:
+        return []
+    Report = models.Report
+    live = set(db.scalars(select(Report.id).where(
+        Report.id.in_([hit.report_id for hit in hits]),
+        Report.report_by == owner_id,
+        Report.active == True,
+    )))
+    return [hit for hit in hits if hit.report_id in live]
+
+
+def rebuild(db: Session, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    """Recreate the index from all active reports; returns how many were indexed."""
+    Report = models.Report
+    index = get_index(db)
+    index.clear()
+    count, last_id = 0, 0
+    while True:
+        reports = db.scalars(
+            select(Report).where(Report.active == True, Report.id > last_id).order_by(Report.id).limit(batch_size)
+        ).all()
+        if not reports:
+            return count
+        index.upsert(report_documents(db, reports))
+        count += len(reports)
+        last_id = reports[-1].id
+        db.expunge_all()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Maintain the report search index")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.add_argument("--batch-size", type=int, default=REBUILD_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from .config.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        count = rebuild(db, batch_size=args.batch_size)
+    finally:
+        db.close()
+    print(f"indexed {count} reports")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,233 @@
+"""
+Stamp a template's weeks onto the roster.
+
+A template's active weeks form a rotation: the first week applies to the
+week (Monday to Sunday) containing the start date, the next to the week
+after, and so on, wrapping around. Every staffed template slot becomes one
+RosterAssignment per matching date:
+
+    TemplateWeek (rotation order by id)
+      -> TemplateWeekDay.day_of_week (ISO, 1 = Monday)
+        -> TemplateWeekDaySlot.location_id, time_slot_id
+          -> TemplateWeekDaySlotStaff.staff_id
+
+The template is read with one query. Each slot's dates are generated as an
+arithmetic progression (every 7 * weeks days from its first date) rather
+than by walking the calendar, leave and holidays are removed with set
+differences, and the rows are written with multi-row INSERTs. Dates on which
+the staff member has approved leave, holidays, and assignments that already
+exist are skipped, so applying the same template twice adds nothing.
+"""
+import logging
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .change_feed import rows_changed
+from .reference_data import get_reference_data
+from .slot_coverage import assignments_changed
+
+logger = logging.getLogger("database")
+
+MAX_EXPANSION_DAYS = 731
+INSERT_BATCH_SIZE = 5000
+
+
+@dataclass
+class ExpansionResult:
+    created: int = 0
+    existing: int = 0  # already on the roster, not duplicated
+    replaced: int = 0  # removed first because `replace` was set
+    skipped_leave: int = 0
+    skipped_holiday: int = 0
+    unstaffed: int = 0  # template slot days with no staff member set
+    weeks: int = 0
+    dry_run: bool = False
+
+    def as_dict(self):
+        return asdict(self)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    offset: int  # days from the Monday the rotation starts on
+    location_id: int
+    time_slot_id: int
+    staff_id: Optional[int]
+
+
+def _template_entries(db: Session, template_id: int) -> Tuple[int, List[_Entry]]:
+    """The rotation length in weeks and every slot-staff row of the template, in one query."""
+    Week, Day = models.TemplateWeek, models.TemplateWeekDay
+    Slot, SlotStaff = models.TemplateWeekDaySlot, models.TemplateWeekDaySlotStaff
+    query = (
+        select(Week.id, Day.day_of_week, Slot.location_id, Slot.time_slot_id, SlotStaff.staff_id)
+        .select_from(Week)
+        .outerjoin(Day, (Day.week_id == Week.id) & (Day.active == True))
+        .outerjoin(Slot, (Slot.week_day_id == Day.id) & (Slot.active == True))
+        .outerjoin(SlotStaff, (SlotStaff.day_slot_id == Slot.id) & (SlotStaff.active == True))
+        .where(Week.template_id == template_id, Week.active == True)
+        .order_by(Week.id)
+    )
+    rows = db.execute(query).all()
+    week_index: Dict[int, int] = {}
+    entries = []
+    for week_id, day_of_week, location_id, time_slot_id, staff_id in rows:
+        index = week_index.setdefault(week_id, len(week_index))
+        if day_of_week is None or location_id is None or time_slot_id is None:
+            continue
+        if not 1 <= day_of_week <= 7:
+            raise ValueError(f"Template week {week_id} has a day with day_of_week {day_of_week}")
+        entries.append(_Entry(index * 7 + day_of_week - 1, location_id, time_slot_id, staff_id))
+    return len(week_index), entries
+
+
+def _dates(first: int, start: int, end: int, step: int) -> range:
+    """Ordinals first, first + step, ... that fall within [start, end]."""
+    if first < start:
+        first += -(-(start - first) // step) * step
+    return range(first, end + 1, step)
+
+
+def _leave_days(db: Session, staff_ids: Iterable[int], start: date, end: date) -> Dict[int, Set[int]]:
+    """Ordinals in [start, end] on which each staff member has approved leave."""
+    staff_ids = list(staff_ids)
+    if not staff_ids:
+        return {}
+    Leave = models.LeaveRequest
+    rows = db.query(Leave.staff_id, Leave.start_date, Leave.end_date).filter(
+        Leave.staff_id.in_(staff_ids),
+        Leave.active == True,
+        Leave.status == "approved",
+        Leave.start_date < datetime.combine(end + timedelta(days=1), time.min),
+        Leave.end_date >= datetime.combine(start, time.min),
+    )
+    days: Dict[int, Set[int]] = defaultdict(set)
+    for staff_id, leave_start, leave_end in rows:
+        first = max(leave_start.date(), start).toordinal()
+        last = min(leave_end.date(), end).toordinal()
+        days[staff_id].update(range(first, last + 1))
+    return days
+
+
+def _existing(db: Session, time_slot_ids: Set[int], start: date, end: date) -> Set[Tuple[int, int, int]]:
+    RA = models.RosterAssignment
+    rows = db.query(RA.staff_id, RA.time_slot_id, RA.date).filter(
+        RA.time_slot_id.in_(time_slot_ids),
+        RA.active == True,
+        RA.date >= datetime.combine(start, time.min),
+        RA.date < datetime.combine(end + timedelta(days=1), time.min),
+    )
+    return {(staff_id, slot_id, day.date().toordinal()) for staff_id, slot_id, day in rows}
+
+
+def expand_template(db: Session, template_id: int, start: date, end: date,
+                    holidays: Iterable[date] = (), replace: bool = False,
+                    dry_run: bool = False) -> Optional[ExpansionResult]:
+    """
+    Create the roster assignments `template_id` describes between `start`
+    and `end` (inclusive) and commit, or roll back with `dry_run`.
+
+    With `replace`, active assignments in the range on the template's time
+    slots are soft-deleted first. Returns None when the template has no
+    active weeks; raises ValueError for an invalid range or template.
+    """
+    if end < start:
+        raise ValueError("end_date is before start_date")
+    if (end - start).days >= MAX_EXPANSION_DAYS:
+        raise ValueError(f"Expand at most {MAX_EXPANSION_DAYS} days at a time")
+
+    weeks, entries = _template_entries(db, template_id)
+    if not weeks:
+        return None
+    result = ExpansionResult(weeks=weeks, dry_run=dry_run)
+    locations = get_reference_data(db).locations
+    unknown = sorted({entry.location_id for entry in entries} - set(locations))
+    if unknown:
+        raise ValueError(f"Template uses unknown or inactive locations: {', '.join(map(str, unknown))}")
+
+    first_day, last_day = start.toordinal(), end.toordinal()
+    rotation_start = first_day - start.weekday()
+    step = 7 * weeks
+    holiday_days = {day.toordinal() for day in holidays if start <= day <= end}
+    staffed = [entry for entry in entries if entry.staff_id is not None]
+    leave = _leave_days(db, {entry.staff_id for entry in staffed}, start, end)
+    time_slot_ids = {entry.time_slot_id for entry in staffed}
+
+    RA = models.RosterAssignment
+    replaced = []
+    try:
+        if replace and time_slot_ids:
+            in_range = (
+                RA.time_slot_id.in_(time_slot_ids),
+                RA.active == True,
+                RA.date >= datetime.combine(start, time.min),
+                RA.date < datetime.combine(end + timedelta(days=1), time.min),
+            )
+            replaced = db.execute(select(RA.staff_id, RA.location_id, RA.time_slot_id, RA.date).where(*in_range)).all()
+            result.replaced = db.execute(
+                update(RA)
+                .where(*in_range)
+                .values(active=False)
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            existing: Set[Tuple[int, int, int]] = set()
+        else:
+            existing = _existing(db, time_slot_ids, start, end) if time_slot_ids else set()
+
+        rows = []
+        for entry in entries:
+            days = _dates(rotation_start + entry.offset, first_day, last_day, step)
+            if entry.staff_id is None:
+                result.unstaffed += len(days)
+                continue
+            wanted = set(days)
+            on_holiday = wanted & holiday_days
+            on_leave = (wanted - on_holiday) & leave.get(entry.staff_id, set())
+            result.skipped_holiday += len(on_holiday)
+            result.skipped_leave += len(on_leave)
+            fte = locations[entry.location_id].fte_points
+            for day in sorted(wanted - on_holiday - on_leave):
+                if (entry.staff_id, entry.time_slot_id, day) in existing:
+                    result.existing += 1
+                    continue
+                # Two template rows for the same staff, slot and day make one assignment
+                existing.add((entry.staff_id, entry.time_slot_id, day))
+                rows.append({
+                    "staff_id": entry.staff_id,
+                    "location_id": entry.location_id,
+                    "time_slot_id": entry.time_slot_id,
+                    "date": datetime.combine(date.fromordinal(day), time.min),
+                    "fte_contribution": fte,
+                    "active": True,
+                })
+
+        for batch in range(0, len(rows), INSERT_BATCH_SIZE):
+            db.execute(insert(RA), rows[batch:batch + INSERT_BATCH_SIZE])
+        result.created = len(rows)
+        if dry_run:
+            db.rollback()
+            return result
+        assignments_changed(
+            db,
+            added=[(row["staff_id"], row["location_id"], row["time_slot_id"], row["date"]) for row in rows],
+            removed=replaced,
+        )
+        # Too many rows for per-row deltas: tell each location's and staff
+        # member's subscribers to reload the range instead
+        touched = {(row["location_id"], row["staff_id"]) for row in rows}
+        touched |= {(location_id, staff_id) for staff_id, location_id, _, _ in replaced}
+        for location_id, staff_id in sorted(touched):
+            rows_changed(db, "roster_assignments", start, end, location_id=location_id, staff_id=staff_id)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+
+    logger.info(f"Expanded template {template_id} from {start} to {end}: {result.as_dict()}")
+    return result
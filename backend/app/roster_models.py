@@ -0,0 +1,28 @@
+"""
+The roster schema defined in app/models.py.
+
+The app/models/ package (the /api/v1 user, shift and leave models) shadows
+app/models.py, so ``from . import models`` never reaches the roster classes
+such as Role, StaffGroup, Location and LocationTimeSlot. This module loads
+models.py by path, once per process, and re-exports its names:
+
+    from . import roster_models as models
+"""
+import importlib.util
+import os
+import sys
+
+_MODULE = "app._roster_schema"
+
+if _MODULE not in sys.modules:
+    _spec = importlib.util.spec_from_file_location(_MODULE, os.path.join(os.path.dirname(__file__), "models.py"))
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules[_MODULE] = _module
+    try:
+        _spec.loader.exec_module(_module)
+    except BaseException:
+        del sys.modules[_MODULE]
+        raise
+
+from app._roster_schema import *  # noqa: E402,F401,F403
+from app._roster_schema import Base  # noqa: E402,F401
@@ -0,0 +1,16 @@
+"""
+The request and response schemas of the endpoints that work on the roster
+schema (app.roster_models): authentication, roster, availability, reports
+and templates.
+
+app/schemas/__init__.py exports the /api/v1 schemas, whose User, Token and
+LeaveRequest* clash with these names, and the app/schemas/ package shadows
+app/schemas.py, so these endpoints import this module instead:
+
+    from .. import roster_models as models, roster_schemas as schemas
+"""
+from .schemas.auth import *  # noqa: F401,F403
+from .schemas.roster import *  # noqa: F401,F403
+from .schemas.availability import *  # noqa: F401,F403
+from .schemas.report import *  # noqa: F401,F403
+from .schemas.template import *  # noqa: F401,F403
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, status, HTTPException, Response
 from sqlalchemy.orm import Session
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
-from .. import schemas, models, utils, oauth2
+from .. import roster_models as models, roster_schemas as schemas, oauth2
 from ..config import get_db
 from ..service import user_password_verify
 
@@ -1,15 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Response
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime, timedelta
-from .. import models, schemas, oauth2
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, time, timedelta
+from .. import change_feed, roster_models as models, roster_schemas as schemas, oauth2
+from ..availability_aggregates import heatmap
+from ..availability_bitmap import (
+    MAX_RANGE_DAYS, as_date, availability_bits, available_staff, days_of, month_masks, range_masks, set_days
+)
 from ..config.database import get_db
+from ..upsert import upsert
 
 router = APIRouter(
     prefix="/availability",
     tags=['Availability']
 )
 
+MAX_BATCH_ENTRIES = 1000
+
 @router.get("/", response_model=List[schemas.StaffAvailability])
 async def get_availability(
     start_date: datetime,
@@ -63,18 +71,19 @@ def create_availability(
             detail="Staff record not found"
         )
 
-    # Check if availability record already exists
+    # Check if availability record already exists; a deleted one comes back to life
     existing_availability = db.query(models.StaffAvailability).filter(
         models.StaffAvailability.staff_id == staff.id,
         models.StaffAvailability.date == availability.date,
-        models.StaffAvailability.shift_type == availability.shift_type,
-        models.StaffAvailability.active == True
+        models.StaffAvailability.shift_type == availability.shift_type
     ).first()
 
     if existing_availability:
         # Update existing record
         for key, value in availability.dict().items():
             setattr(existing_availability, key, value)
+        existing_availability.active = True
+        _sync_bitmap(db, existing_availability)
         db.commit()
         db.refresh(existing_availability)
         return existing_availability
@@ -85,10 +94,189 @@ def create_availability(
         **availability.dict()
     )
     db.add(new_availability)
+    _sync_bitmap(db, new_availability)
     db.commit()
     db.refresh(new_availability)
     return new_availability
 
+def _current_staff(db: Session, user) -> models.Staff:
+    staff = db.query(models.Staff).filter(
+        models.Staff.user_id == user.id,
+        models.Staff.active == True
+    ).first()
+    if not staff:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Staff record not found"
+        )
+    return staff
+
+def _sync_bitmap(db: Session, availability):
+    """Mirror one availability record into the staff member's month bitmap."""
+    available = availability.active is not False and availability.is_available is not False
+    set_days(db, availability.staff_id, availability.shift_type, month_masks([availability.date]), available)
+
+def _column_date(day: date):
+    """A day as StaffAvailability.date stores it (a date or midnight)."""
+    if models.StaffAvailability.date.type.python_type is datetime and not isinstance(day, datetime):
+        return datetime.combine(day, time.min)
+    return day
+
+def _range_entries(availability_range: schemas.AvailabilityRange) -> List[Dict[str, Any]]:
+    try:
+        masks = range_masks(
+            availability_range.start_date, availability_range.end_date, set(availability_range.weekdays or ())
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return [
+        {"date": month.replace(day=i + 1), "shift_type": availability_range.shift_type,
+         "is_available": availability_range.available}
+        for month, mask in masks.items()
+        for i in range(31) if mask >> i & 1
+    ]
+
+def _write_entries(db: Session, staff_id: int, entries: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Create or overwrite the staff member's record for each (date, shift_type)
+    with one upsert on the staff_availability unique key, and their bitmaps
+    with one statement per shift type. A later entry for the same day and
+    shift type wins, and deleted records come back to life rather than
+    duplicating. Does not commit.
+    """
+    Availability = models.StaffAvailability
+    rows: Dict[tuple, Dict[str, Any]] = {}
+    for entry in entries:
+        row = {
+            "staff_id": staff_id,
+            "date": _column_date(entry["date"]),
+            "shift_type": entry["shift_type"],
+            "is_available": entry.get("is_available", True),
+            "note": entry.get("note"),
+            "active": True,
+        }
+        rows[(as_date(row["date"]), row["shift_type"])] = row
+    if not rows:
+        return {"received": len(entries), "created": 0, "updated": 0}
+
+    def stored():
+        return db.query(Availability.id, Availability.date, Availability.shift_type, Availability.active).filter(
+            Availability.staff_id == staff_id,
+            Availability.date.in_({row["date"] for row in rows.values()})
+        )
+
+    # For the summary and the change feed; the upsert is what keeps
+    # concurrent batches from duplicating days
+    existing = {(as_date(day), shift_type): active for _, day, shift_type, active in stored()}
+    upsert(db, Availability, list(rows.values()), ["staff_id", "date", "shift_type"],
+           lambda incoming: {"is_available": incoming.is_available, "note": incoming.note, "active": incoming.active})
+    # The upsert skips the flush the change feed listens to; revived rows are
+    # new to clients, which dropped them when they were deleted
+    for row_id, day, shift_type, _ in stored():
+        key = (as_date(day), shift_type)
+        if key in rows:
+            op = "update" if existing.get(key, False) is not False else "insert"
+            change_feed.row_changed(db, "staff_availability", op, {**rows[key], "id": row_id})
+
+    days = defaultdict(list)
+    for (day, shift_type), row in rows.items():
+        days[(shift_type, row.get("is_available") is not False)].append(day)
+    for (shift_type, available), group in days.items():
+        set_days(db, staff_id, shift_type, month_masks(group), available)
+    updated = len(rows.keys() & existing)
+    return {"received": len(entries), "created": len(rows) - updated, "updated": updated}
+
+@router.post("/batch", response_model=schemas.AvailabilityBatchResult)
+def create_availability_batch(
+    batch: schemas.AvailabilityBatch,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user)
+):
+    """
+    Submit many days at once, as a list of entries and/or a date range, in
+    one transaction. Each (date, shift_type) is created or overwritten.
+    """
+    # Listed entries come after the range, so they override it
+    entries = _range_entries(batch.date_range) if batch.date_range is not None else []
+    entries += [entry.dict() for entry in batch.entries or ()]
+    if len(entries) > MAX_BATCH_ENTRIES:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_ENTRIES} entries per batch")
+    staff = _current_staff(db, current_user)
+    try:
+        summary = _write_entries(db, staff.id, entries)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return summary
+
+@router.put("/range", response_model=schemas.AvailabilityRangeResult)
+def set_availability_range(
+    availability_range: schemas.AvailabilityRange,
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user)
+):
+    """Mark every day in a range (optionally only some weekdays) available or unavailable."""
+    staff = _current_staff(db, current_user)
+    entries = _range_entries(availability_range)
+    try:
+        _write_entries(db, staff.id, entries)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return {"days": len(entries)}
+
+@router.get("/calendar", response_model=List[schemas.AvailabilityCalendar])
+def get_availability_calendar(
+    start_date: date,
+    end_date: date,
+    shift_type: List[str] = Query(...),
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user)
+):
+    """The current user's available days per shift type."""
+    staff = _current_staff(db, current_user)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    calendar = []
+    for kind in shift_type:
+        bits = availability_bits(db, start_date, end_date, kind, [staff.id]).get(staff.id, 0)
+        calendar.append({"shift_type": kind, "days": days_of(bits, start_date)})
+    return calendar
+
+@router.get("/available-staff", response_model=List[int])
+def get_available_staff(
+    shift_type: str,
+    dates: List[date] = Query(...),
+    staff_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user)
+):
+    """Ids of staff available for `shift_type` on every one of `dates`, optionally among `staff_ids`."""
+    return available_staff(db, dates, shift_type, staff_ids)
+
+@router.get("/heatmap", response_model=schemas.AvailabilityHeatmap)
+def get_availability_heatmap(
+    start_date: date,
+    end_date: date,
+    by: str = Query("role", pattern="^(role|group)$"),
+    shift_type: Optional[List[str]] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: schemas.User = Depends(oauth2.get_current_user)
+):
+    """
+    Staff available per day, shift type and role (or group), next to the
+    staff the open locations require per day, from the daily counts.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to view team availability")
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date is before start_date")
+    if (end_date - start_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_RANGE_DAYS} days at a time")
+    return heatmap(db, start_date, end_date, by, shift_type)
+
 @router.put("/{availability_id}", response_model=schemas.StaffAvailability)
 def update_availability(
     availability_id: int,
@@ -127,9 +315,25 @@ def update_availability(
             detail="Not authorized to update this availability record"
         )
 
-    # Update the availability record
+    # Update the availability record; a moved record clears its old day
+    old_day, old_shift_type = availability.date, availability.shift_type
     for key, value in availability_update.dict(exclude_unset=True).items():
         setattr(availability, key, value)
+    if (old_day, old_shift_type) != (availability.date, availability.shift_type):
+        taken = db.query(models.StaffAvailability.id).filter(
+            models.StaffAvailability.staff_id == staff.id,
+            models.StaffAvailability.date == availability.date,
+            models.StaffAvailability.shift_type == availability.shift_type,
+            models.StaffAvailability.id != availability.id
+        ).first()
+        if taken:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="There is already an availability record for that day and shift type"
+            )
+        set_days(db, staff.id, old_shift_type, month_masks([old_day]), False)
+    _sync_bitmap(db, availability)
 
     db.commit()
     db.refresh(availability)
@@ -174,6 +378,7 @@ def delete_availability(
 
     # Soft delete the availability record
     availability.active = False
+    _sync_bitmap(db, availability)
     db.commit()
 
     return None 
\ No newline at end of file
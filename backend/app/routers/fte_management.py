@@ -4,7 +4,7 @@ from typing import List
 from datetime import datetime
 
 from ..config.database import get_db
-from .. import models, schemas
+from .. import roster_models as models, roster_schemas as schemas
 from ..oauth2 import get_current_user
 
 router = APIRouter(
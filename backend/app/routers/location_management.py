@@ -1,11 +1,12 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
-from datetime import datetime
+from datetime import datetime, date
 
 from ..config.database import get_db
-from .. import models, schemas
+from .. import roster_models as models, roster_schemas as schemas
 from ..oauth2 import get_current_user
+from ..reference_data import get_reference_data, invalidate_reference_data
 
 router = APIRouter(
     prefix="/locations",
@@ -25,6 +26,7 @@ def create_location(
     db_location = models.Location(**location.dict())
     db.add(db_location)
     db.commit()
+    invalidate_reference_data()
     db.refresh(db_location)
     return db_location
 
@@ -42,6 +44,38 @@ def get_locations(
         
     return query.offset(skip).limit(limit).all()
 
+@router.get("/calendar/")
+def get_location_calendar(
+    start_date: date,
+    end_date: date,
+    location_id: int = None,
+    db: Session = Depends(get_db)
+):
+    """Time slots of the active locations for each day in the range, served from the cached reference data."""
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date")
+    if (end_date - start_date).days > 366:
+        raise HTTPException(status_code=400, detail="Date range cannot exceed one year")
+
+    reference = get_reference_data(db)
+    calendar = []
+    for day, slots in reference.calendar_between(start_date, end_date).items():
+        calendar.append({
+            "date": day,
+            "slots": [
+                {
+                    "location_id": slot.location_id,
+                    "location_name": reference.locations[slot.location_id].name,
+                    "time_slot_id": slot.id,
+                    "start_time": slot.start_time,
+                    "end_time": slot.end_time
+                }
+                for slot in slots
+                if location_id is None or slot.location_id == location_id
+            ]
+        })
+    return calendar
+
 @router.get("/{location_id}", response_model=schemas.LocationResponse)
 def get_location(location_id: int, db: Session = Depends(get_db)):
     location = db.query(models.Location).filter(
@@ -74,6 +108,7 @@ def update_location(
         setattr(db_location, key, value)
     
     db.commit()
+    invalidate_reference_data()
     db.refresh(db_location)
     return db_location
 
@@ -95,6 +130,7 @@ def delete_location(
         
     db_location.active = False
     db.commit()
+    invalidate_reference_data()
     return None
 
 # Location Time Slot endpoints
@@ -119,6 +155,7 @@ def create_location_time_slot(
     db_time_slot = models.LocationTimeSlot(**time_slot.dict())
     db.add(db_time_slot)
     db.commit()
+    invalidate_reference_data()
     db.refresh(db_time_slot)
     return db_time_slot
 
@@ -155,7 +192,7 @@ def create_location_requirement(
         raise HTTPException(status_code=404, detail="Location not found")
         
     # Verify role exists if provided
-    if requirement.role_id:
+    if requirement.role_id and requirement.role_id not in get_reference_data(db).roles:
         role = db.query(models.Role).filter(
             models.Role.id == requirement.role_id,
             models.Role.active == True
@@ -164,7 +201,7 @@ def create_location_requirement(
             raise HTTPException(status_code=404, detail="Role not found")
             
     # Verify group exists if provided
-    if requirement.group_id:
+    if requirement.group_id and requirement.group_id not in get_reference_data(db).staff_groups:
         group = db.query(models.StaffGroup).filter(
             models.StaffGroup.id == requirement.group_id,
             models.StaffGroup.active == True
@@ -209,7 +246,7 @@ def update_location_requirement(
         raise HTTPException(status_code=404, detail="Staff requirement not found")
         
     # Verify role exists if being updated
-    if requirement.role_id:
+    if requirement.role_id and requirement.role_id not in get_reference_data(db).roles:
         role = db.query(models.Role).filter(
             models.Role.id == requirement.role_id,
             models.Role.active == True
@@ -218,7 +255,7 @@ def update_location_requirement(
             raise HTTPException(status_code=404, detail="Role not found")
             
     # Verify group exists if being updated
-    if requirement.group_id:
+    if requirement.group_id and requirement.group_id not in get_reference_data(db).staff_groups:
         group = db.query(models.StaffGroup).filter(
             models.StaffGroup.id == requirement.group_id,
             models.StaffGroup.active == True
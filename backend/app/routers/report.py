@@ -1,17 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import date, datetime
+import asyncio
+import json
 
 from ..config.database import get_db
-from .. import models, schemas
+from .. import roster_models as models, roster_schemas as schemas
 from ..oauth2 import get_current_user
+from ..config.config import settings
+from .. import report_drafts
+from ..report_drafts import DraftConflict
+from ..report_search import index_reports, search_reports, unindex_reports
+from ..infer import DEFAULT_PROMPT, ExtractionRequest, InferenceBusy, close_job_queue, get_job_queue, resolve_model
 
 router = APIRouter(
     prefix="/reports",
     tags=["Reports"]
 )
 
+# Longest a client may block on POST /reports/extract?wait=...
+MAX_EXTRACTION_WAIT_SECONDS = 60
+
+@router.on_event("shutdown")
+async def stop_extraction():
+    await close_job_queue()
+
+@router.post("/extract", status_code=status.HTTP_202_ACCEPTED, response_model=schemas.ExtractionJob)
+async def submit_extraction(
+    image: Optional[UploadFile] = File(None),
+    text: Optional[str] = Form(None),
+    report_type: Optional[str] = Form(None),
+    prompt: Optional[str] = Form(None),
+    wait: float = 0,
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Queue an image and/or report text for measurement extraction; with `wait`
+    block up to that many seconds for the result. The model is chosen by
+    report type (see inference_models_by_report_type).
+    """
+    model, request = await _extraction_request(image, text, report_type, prompt, current_user)
+    jobs = get_job_queue()
+    try:
+        job_id = await jobs.submit(request, model)
+    except InferenceBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+    job = await jobs.wait(job_id, min(wait, MAX_EXTRACTION_WAIT_SECONDS), owner=current_user.id)
+    return {"job_id": job_id, **job}
+
+@router.post("/extract/stream")
+async def stream_extraction(
+    image: Optional[UploadFile] = File(None),
+    text: Optional[str] = Form(None),
+    report_type: Optional[str] = Form(None),
+    prompt: Optional[str] = Form(None),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Run an extraction and stream its output as server-sent events:
+
+        event: job    data: {"job_id": "..."}
+        event: token  data: {"text": "The right lobe"}   (repeated)
+        event: done   data: {"result": "..."}   or   event: error  data: {"error": "..."}
+    """
+    model, request = await _extraction_request(image, text, report_type, prompt, current_user)
+    try:
+        stream = await get_job_queue().submit_stream(request, model)
+    except InferenceBusy as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e))
+
+    async def events():
+        yield _sse("job", {"job_id": stream.job_id})
+        try:
+            async for piece in stream:
+                yield _sse("token", {"text": piece})
+        except (asyncio.CancelledError, GeneratorExit):
+            # The client went away; stop generating for it
+            stream.cancel()
+            raise
+        if stream.error:
+            yield _sse("error", {"error": stream.error})
+        else:
+            yield _sse("done", {"result": stream.result})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no",  # nginx would otherwise hold tokens back
+    })
+
+async def _extraction_request(image, text, report_type, prompt, current_user):
+    try:
+        model = resolve_model(settings, report_type, image is not None, bool(text))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    request = ExtractionRequest(
+        image=await image.read() if image is not None else None,
+        text=text,
+        prompt=prompt or DEFAULT_PROMPT,
+        owner=current_user.id
+    )
+    return model, request
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@router.get("/extract/{job_id}", response_model=schemas.ExtractionJob)
+async def get_extraction(
+    job_id: str,
+    wait: float = 0,
+    current_user: models.User = Depends(get_current_user)
+):
+    """The status and result of an extraction job; jobs of other users are not found."""
+    job = await get_job_queue().wait(job_id, min(wait, MAX_EXTRACTION_WAIT_SECONDS), owner=current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Extraction job not found")
+    return {"job_id": job_id, **job}
+
 @router.post("/", response_model=schemas.ReportNew)
 def create_report(
     report: schemas.ReportBase,
@@ -23,9 +129,10 @@ def create_report(
     db.add(db_report)
     db.commit()
     db.refresh(db_report)
+    index_reports(db, [db_report])
     return db_report
 
-@router.get("/", response_model=List[schemas.ReportBase])
+@router.get("/", response_model=List[schemas.ReportData])
 def get_reports(
     skip: int = 0,
     limit: int = 100,
@@ -38,6 +145,24 @@ def get_reports(
     ).offset(skip).limit(limit).all()
     return reports
 
+@router.get("/search", response_model=List[schemas.ReportSearchHit])
+def search_own_reports(
+    q: Optional[str] = Query(None, max_length=500),
+    study: Optional[str] = Query(None, max_length=255),
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Search the current user's reports by text (every word, as a prefix),
+    study (template name) and date range, best match first; with no `q`,
+    the newest matching reports first.
+    """
+    return search_reports(db, current_user.id, q, study, date_from, date_to, limit, offset)
+
 @router.get("/{report_id}", response_model=schemas.ReportData)
 def get_report(
     report_id: int,
@@ -70,11 +195,12 @@ def update_report(
     if not db_report:
         raise HTTPException(status_code=404, detail="Report not found")
         
-    for key, value in report_update.dict().items():
+    for key, value in report_update.dict(exclude_unset=True).items():
         setattr(db_report, key, value)
     
     db.commit()
     db.refresh(db_report)
+    index_reports(db, [db_report])
     return db_report
 
 @router.delete("/{report_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -94,4 +220,104 @@ def delete_report(
         
     db_report.active = False
     db.commit()
-    return None 
\ No newline at end of file
+    unindex_reports(db, [report_id])
+    return None
+
+def _own_report(db: Session, report_id: int, user: models.User):
+    report = db.query(models.Report).filter(
+        models.Report.id == report_id,
+        models.Report.report_by == user.id,
+        models.Report.active == True
+    ).first()
+    if not report:
+        raise HTTPException(status_code=404, detail="Report not found")
+    return report
+
+def _conflict(e: DraftConflict):
+    return HTTPException(status_code=409, detail={"message": str(e), "version": e.version})
+
+@router.get("/{report_id}/draft", response_model=schemas.ReportDraft)
+def get_draft(
+    report_id: int,
+    version: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """The draft text at `version`, by default the latest."""
+    _own_report(db, report_id, current_user)
+    draft = report_drafts.load_version(db, report_id, version)
+    if draft is None:
+        raise HTTPException(status_code=404, detail="Draft version not found")
+    return draft
+
+@router.patch("/{report_id}/draft", response_model=schemas.ReportDraftSaved)
+def save_draft(
+    report_id: int,
+    draft: schemas.ReportDraftSave,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Autosave: apply `edits` (or replace with `text`) on top of `base_version`
+    and return the new version. 409 with the latest version if `base_version`
+    is out of date; the client reloads the draft and reapplies its edits.
+    """
+    if (draft.edits is None) == (draft.text is None):
+        raise HTTPException(status_code=400, detail="Send either edits or text")
+    _own_report(db, report_id, current_user)
+    edits = [(edit.at, edit.delete, edit.insert) for edit in draft.edits] if draft.edits is not None else None
+    try:
+        saved = report_drafts.save(db, report_id, draft.base_version, current_user.id, edits=edits, text=draft.text)
+    except DraftConflict as e:
+        raise _conflict(e)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"version": saved.version, "length": len(saved.text)}
+
+@router.get("/{report_id}/revisions", response_model=List[schemas.ReportRevisionInfo])
+def get_revisions(
+    report_id: int,
+    limit: int = Query(100, ge=1, le=1000),
+    before: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    _own_report(db, report_id, current_user)
+    return report_drafts.revisions(db, report_id, limit, before)
+
+@router.post("/{report_id}/revisions/{version}/restore", response_model=schemas.ReportDraftSaved)
+def restore_revision(
+    report_id: int,
+    version: int,
+    restore: schemas.ReportDraftRestore,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Make the text of an earlier version the latest draft, as a new revision."""
+    _own_report(db, report_id, current_user)
+    try:
+        saved = report_drafts.restore(db, report_id, version, restore.base_version, current_user.id)
+    except DraftConflict as e:
+        raise _conflict(e)
+    if saved is None:
+        raise HTTPException(status_code=404, detail="Draft version not found")
+    return {"version": saved.version, "length": len(saved.text)}
+
+@router.post("/{report_id}/finalise", response_model=schemas.ReportFinal)
+def finalise_report(
+    report_id: int,
+    finalise: schemas.ReportDraftFinalise,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """Write the latest draft version into the report and mark it completed."""
+    db_report = _own_report(db, report_id, current_user)
+    try:
+        report_drafts.finalise(db, db_report, finalise.version)
+    except DraftConflict as e:
+        raise _conflict(e)
+    db_report.status = "COMPLETED"
+    db.commit()
+    db.refresh(db_report)
+    index_reports(db, [db_report])
+    return db_report 
\ No newline at end of file
@@ -1,11 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 from typing import List
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 
 from ..config.database import get_db
-from .. import models, schemas
+from .. import roster_models as models, roster_schemas as schemas
 from ..oauth2 import get_current_user
+from .. import availability_aggregates, leave_balances, slot_coverage
+from ..leave_overlap import leave_snapshot
+from ..reference_data import invalidate_reference_data
+from ..roster_expansion import expand_template
 
 router = APIRouter(
     prefix="/roster",
@@ -20,6 +24,7 @@ def create_role(role: schemas.RoleCreate, db: Session = Depends(get_db), current
     db_role = models.Role(**role.dict())
     db.add(db_role)
     db.commit()
+    invalidate_reference_data()
     db.refresh(db_role)
     return db_role
 
@@ -36,6 +41,7 @@ def create_staff_group(group: schemas.StaffGroupCreate, db: Session = Depends(ge
     db_group = models.StaffGroup(**group.dict())
     db.add(db_group)
     db.commit()
+    invalidate_reference_data()
     db.refresh(db_group)
     return db_group
 
@@ -77,6 +83,11 @@ def create_leave_request(leave: schemas.LeaveRequestCreate, db: Session = Depend
     
     db_leave = models.LeaveRequest(**leave.dict())
     db.add(db_leave)
+    db.flush()
+    after = leave_snapshot(db_leave)
+    availability_aggregates.leave_changed(db, db_leave.id, None, after)
+    slot_coverage.leave_changed(db, db_leave.id, None, after)
+    leave_balances.leave_changed(db, None, after)
     db.commit()
     db.refresh(db_leave)
     return db_leave
@@ -102,6 +113,27 @@ def get_leave_requests(
         
     return query.offset(skip).limit(limit).all()
 
+@router.get("/leave/balances", response_model=List[schemas.LeaveBalance])
+def get_leave_balances(
+    year: int = None,
+    staff_id: List[int] = Query(None),
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Entitlement, accrual and leave taken for the year (default: this year)
+    per staff member, from the totals kept as leave is approved. Staff who
+    are not admins see their own balance only.
+    """
+    if current_user.role != "admin":
+        own = [staff.id for staff in db.query(models.Staff.id).filter(
+            models.Staff.user_id == current_user.id, models.Staff.active == True
+        )]
+        staff_id = [member_id for member_id in staff_id if member_id in own] if staff_id else own
+    return leave_balances.balances(db, year or date.today().year, staff_id, skip=skip, limit=min(limit, 1000))
+
 @router.put("/leave/{leave_id}", response_model=schemas.LeaveRequestResponse)
 def update_leave_request(
     leave_id: int,
@@ -124,13 +156,58 @@ def update_leave_request(
         if leave.status is not None:
             raise HTTPException(status_code=403, detail="Not authorized to update leave status")
 
+    before = leave_snapshot(db_leave)
     for key, value in leave.dict(exclude_unset=True).items():
         setattr(db_leave, key, value)
+    db.flush()
+    after = leave_snapshot(db_leave)
+    availability_aggregates.leave_changed(db, db_leave.id, before, after)
+    slot_coverage.leave_changed(db, db_leave.id, before, after)
+    leave_balances.leave_changed(db, before, after)
     
     db.commit()
     db.refresh(db_leave)
     return db_leave
 
+def _leave_impact(db: Session, staff_id: int, start_date, end_date, leave_id: int = None, include_pending: bool = False):
+    try:
+        return slot_coverage.leave_impact(db, staff_id, start_date, end_date, leave_id=leave_id, include_pending=include_pending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/leave/impact", response_model=schemas.LeaveImpact)
+def preview_leave_impact(
+    request: schemas.LeaveImpactRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    The roster slots that would drop below their location's minimum staff
+    if the staff member took this leave, from the precomputed slot coverage.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to preview leave impact")
+    return _leave_impact(db, request.staff_id, request.start_date, request.end_date,
+                         request.leave_id, request.include_pending)
+
+@router.get("/leave/{leave_id}/impact", response_model=schemas.LeaveImpact)
+def get_leave_request_impact(
+    leave_id: int,
+    include_pending: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """The roster slots approving this leave request would take below their minimum staff."""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to preview leave impact")
+    db_leave = db.query(models.LeaveRequest).filter(
+        models.LeaveRequest.id == leave_id, models.LeaveRequest.active == True
+    ).first()
+    if not db_leave:
+        raise HTTPException(status_code=404, detail="Leave request not found")
+    return _leave_impact(db, db_leave.staff_id, db_leave.start_date.date(), db_leave.end_date.date(),
+                         leave_id, include_pending)
+
 # Roster Generation endpoint
 @router.post("/generate/", response_model=List[schemas.RosterAssignmentResponse])
 def generate_roster(
@@ -153,6 +230,32 @@ def generate_roster(
     # For now, return an empty list
     return []
 
+@router.post("/templates/{template_id}/expand", response_model=schemas.RosterExpansionResult)
+def expand_roster_template(
+    template_id: int,
+    request: schemas.RosterExpansionRequest,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Create assignments from the template's weeks for every date in the range,
+    rotating through the weeks and skipping approved leave, the given
+    holidays and assignments that already exist.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to generate roster")
+
+    try:
+        result = expand_template(
+            db, template_id, request.start_date, request.end_date,
+            holidays=request.holidays, replace=request.replace, dry_run=request.dry_run,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if result is None:
+        raise HTTPException(status_code=404, detail="Template has no active weeks")
+    return result.as_dict()
+
 # Roster Assignment endpoints
 @router.get("/assignments/", response_model=List[schemas.RosterAssignmentResponse])
 def get_roster_assignments(
@@ -194,8 +297,11 @@ def update_roster_assignment(
     if not db_assignment:
         raise HTTPException(status_code=404, detail="Roster assignment not found")
         
+    before = slot_coverage.assignment_snapshot(db_assignment)
     for key, value in assignment.dict(exclude_unset=True).items():
         setattr(db_assignment, key, value)
+    db.flush()
+    slot_coverage.assignment_changed(db, before, slot_coverage.assignment_snapshot(db_assignment))
     
     db.commit()
     db.refresh(db_assignment)
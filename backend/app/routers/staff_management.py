@@ -2,7 +2,10 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 from typing import List
 from ..config.database import get_db
-from .. import models, schemas, oauth2
+from .. import roster_models as models, roster_schemas as schemas, oauth2
+from .. import availability_aggregates, change_feed, leave_balances, slot_coverage
+from ..leave_overlap import leave_snapshot
+from ..reference_data import invalidate_reference_data
 from datetime import datetime
 
 router = APIRouter(
@@ -19,6 +22,7 @@ def create_role(role: schemas.RoleCreate, db: Session = Depends(get_db), current
     new_role = models.Role(**role.model_dump())
     db.add(new_role)
     db.commit()
+    invalidate_reference_data()
     db.refresh(new_role)
     return new_role
 
@@ -36,6 +40,7 @@ def delete_role(role_id: int, db: Session = Depends(get_db), current_user: model
         raise HTTPException(status_code=404, detail="Role not found")
     db.delete(role)
     db.commit()
+    invalidate_reference_data()
     return
 
 # Staff Group Management
@@ -47,6 +52,7 @@ def create_staff_group(group: schemas.StaffGroupCreate, db: Session = Depends(ge
     new_group = models.StaffGroup(**group.model_dump())
     db.add(new_group)
     db.commit()
+    invalidate_reference_data()
     db.refresh(new_group)
     return new_group
 
@@ -126,6 +132,11 @@ def create_leave_request(leave_request: schemas.LeaveRequestCreate, db: Session
         **leave_request.model_dump()
     )
     db.add(new_leave_request)
+    db.flush()
+    after = leave_snapshot(new_leave_request)
+    availability_aggregates.leave_changed(db, new_leave_request.id, None, after)
+    slot_coverage.leave_changed(db, new_leave_request.id, None, after)
+    leave_balances.leave_changed(db, None, after)
     db.commit()
     db.refresh(new_leave_request)
     return new_leave_request
@@ -160,6 +171,16 @@ def update_leave_request(id: int, leave_update: schemas.LeaveRequestUpdate, db:
         if leave_update.status is not None:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to update leave request status")
     
-    leave_query.update(leave_update.model_dump(exclude_unset=True), synchronize_session=False)
+    changes = leave_update.model_dump(exclude_unset=True)
+    before = leave_snapshot(leave_request)
+    leave_query.update(changes, synchronize_session=False)
+    after = {key: changes.get(key, value) for key, value in before.items()}
+    availability_aggregates.leave_changed(db, id, before, after)
+    slot_coverage.leave_changed(db, id, before, after)
+    leave_balances.leave_changed(db, before, after)
+    # Query.update skips the flush the change feed listens to
+    changed = {key: value for key, value in changes.items() if before.get(key) != value}
+    if changed:
+        change_feed.row_changed(db, "leave_requests", "update", {**after, "id": id}, changed)
     db.commit()
     return leave_query.first() 
\ No newline at end of file
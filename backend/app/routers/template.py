@@ -1,10 +1,12 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 
 from ..config.database import get_db
-from .. import models, schemas
+from .. import roster_models as models, roster_schemas as schemas
 from ..oauth2 import get_current_user
+from ..template_import import import_templates, iter_json_members
+from ..template_render import compile_template, render_template
 
 router = APIRouter(
     prefix="/templates",
@@ -26,6 +28,30 @@ def create_template(
     db.refresh(db_template)
     return db_template
 
+@router.post("/import", response_model=schemas.TemplateImportResult)
+def import_template_file(
+    file: UploadFile = File(...),
+    batch_size: int = 500,
+    dry_run: bool = False,
+    db: Session = Depends(get_db),
+    current_user: models.User = Depends(get_current_user)
+):
+    """
+    Create or update templates by name from a JSON file (template_data.json or
+    a list of templates), in one transaction. Invalid items are skipped and
+    listed in `errors`; with `dry_run` nothing is committed.
+    """
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Not authorized to import templates")
+    if not 1 <= batch_size <= 5000:
+        raise HTTPException(status_code=400, detail="batch_size must be between 1 and 5000")
+
+    try:
+        result = import_templates(db, iter_json_members(file.file), batch_size=batch_size, dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Could not read {file.filename}: {e}")
+    return result.as_dict()
+
 @router.get("/", response_model=List[schemas.TemplateListItems])
 def get_templates(
     skip: int = 0,
@@ -51,6 +77,46 @@ def get_template(
         raise HTTPException(status_code=404, detail="Template not found")
     return template
 
+def _active_template(db: Session, template_id: int):
+    template = db.query(models.Template).filter(
+        models.Template.id == template_id,
+        models.Template.active == True
+    ).first()
+    if not template:
+        raise HTTPException(status_code=404, detail="Template not found")
+    return template
+
+@router.get("/{template_id}/slots", response_model=schemas.TemplateSlots)
+def get_template_slots(
+    template_id: int,
+    db: Session = Depends(get_db)
+):
+    """The fields a report writer fills in, in the order they first appear."""
+    template = _active_template(db, template_id)
+    compiled = compile_template(template.id, template.template_html or "")
+    return {"template_id": template.id, **compiled.as_dict()}
+
+@router.post("/{template_id}/render", response_model=schemas.TemplateRender)
+def render_template_html(
+    template_id: int,
+    request: schemas.TemplateRenderRequest,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+):
+    """
+    Fill a template's slots with `values` (keyed as in /slots). The ETag
+    changes with the template and the values, so a client re-rendering the
+    same report gets 304 Not Modified.
+    """
+    template = _active_template(db, template_id)
+    compiled, digest, html = render_template(template.id, template.template_html or "", request.values)
+    etag = f'"{compiled.version}-{digest[:16]}"'
+    if if_none_match == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return {"template_id": template.id, "version": compiled.version, "html": html}
+
 @router.put("/{template_id}", response_model=schemas.TemplateListItems)
 def update_template(
     template_id: int,
@@ -1,103 +1,65 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict
 
 from ..config.database import get_db
-from .. import models, schemas
+from .. import roster_models as models, roster_schemas as schemas
+from ..crud import crud_router
 from ..oauth2 import get_current_user
+from ..template_tree import TreeConflict, load_tree, save_tree
 
-router = APIRouter(
+router = crud_router(
+    models.TemplateWeek,
     prefix="/template-weeks",
-    tags=["Template Weeks"]
+    tags=["Template Weeks"],
+    create_schema=schemas.TemplateWeekCreate,
+    update_schema=schemas.TemplateWeekUpdate,
+    response_schema=schemas.TemplateWeekResponse,
+    plural="template weeks",
+    not_found="Template week not found",
+    filter_field="template_id",
 )
 
-@router.post("/", response_model=schemas.TemplateWeekResponse)
-def create_template_week(
-    week: schemas.TemplateWeekCreate,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
-):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized to create template weeks")
-        
-    db_week = models.TemplateWeek(**week.dict())
-    db.add(db_week)
-    db.commit()
-    db.refresh(db_week)
-    return db_week
-
-@router.get("/", response_model=List[schemas.TemplateWeekResponse])
-def get_template_weeks(
-    skip: int = 0,
-    limit: int = 100,
-    template_id: int = None,
-    db: Session = Depends(get_db)
-):
-    query = db.query(models.TemplateWeek).filter(
-        models.TemplateWeek.active == True
-    )
-    
-    if template_id:
-        query = query.filter(models.TemplateWeek.template_id == template_id)
-        
-    return query.offset(skip).limit(limit).all()
-
-@router.get("/{week_id}", response_model=schemas.TemplateWeekResponse)
-def get_template_week(
+@router.get("/{week_id}/tree", response_model=Dict[str, Any])
+def get_template_week_tree(
     week_id: int,
     db: Session = Depends(get_db)
 ):
-    week = db.query(models.TemplateWeek).filter(
-        models.TemplateWeek.id == week_id,
-        models.TemplateWeek.active == True
-    ).first()
-    
-    if not week:
+    """
+    The week with its days, slots, staff, requirements, groups and group
+    staff nested under it, in one request.
+    """
+    tree = load_tree(db, week_id)
+    if tree is None:
         raise HTTPException(status_code=404, detail="Template week not found")
-    return week
+    return tree
 
-@router.put("/{week_id}", response_model=schemas.TemplateWeekResponse)
-def update_template_week(
+@router.put("/{week_id}/tree", response_model=schemas.TemplateWeekTreeSaved)
+def save_template_week_tree(
     week_id: int,
-    week_update: schemas.TemplateWeekUpdate,
+    tree: Dict[str, Any],
     db: Session = Depends(get_db),
     current_user: models.User = Depends(get_current_user)
 ):
+    """
+    Save a whole week as returned by GET /tree, edited. Nodes without an id
+    are created, changed nodes are updated and nodes left out are removed,
+    together with everything under them, in one transaction.
+    """
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized to update template weeks")
-        
-    db_week = db.query(models.TemplateWeek).filter(
-        models.TemplateWeek.id == week_id,
-        models.TemplateWeek.active == True
-    ).first()
-    
-    if not db_week:
-        raise HTTPException(status_code=404, detail="Template week not found")
-        
-    for key, value in week_update.dict(exclude_unset=True).items():
-        setattr(db_week, key, value)
-    
-    db.commit()
-    db.refresh(db_week)
-    return db_week
 
-@router.delete("/{week_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_template_week(
-    week_id: int,
-    db: Session = Depends(get_db),
-    current_user: models.User = Depends(get_current_user)
-):
-    if current_user.role != "admin":
-        raise HTTPException(status_code=403, detail="Not authorized to delete template weeks")
-        
-    db_week = db.query(models.TemplateWeek).filter(
-        models.TemplateWeek.id == week_id,
-        models.TemplateWeek.active == True
-    ).first()
-    
-    if not db_week:
+    try:
+        result = save_tree(db, week_id, tree)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except TreeConflict as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if result is None:
         raise HTTPException(status_code=404, detail="Template week not found")
-        
-    db_week.active = False
-    db.commit()
-    return None 
\ No newline at end of file
+    return {
+        "created": result.created,
+        "updated": result.updated,
+        "deleted": result.deleted,
+        "tree": load_tree(db, week_id),
+    }
@@ -1,4 +1,79 @@
 
+import asyncio
+import logging
+import math
+import struct
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, List, Optional
+
+from ..metrics import Histogram, registry
+
+logger = logging.getLogger("api")
+
+AUDIO_CHUNK_LATENCY = registry.register(Histogram(
+    "audio_chunk_latency_seconds",
+    "Time from the last byte of an audio chunk arriving to its result being queued for the client.",
+))
+
+# Longest chunk a client may ask for; each pooled buffer holds one chunk
+MAX_CHUNK_LENGTH_SECONDS = 30
+
+
+class ChunkBufferPool:
+    """
+    Reusable chunk-sized buffers.
+
+    Buffers are allocated on first use and returned after their chunk has
+    been processed, so a steady stream reuses the same few allocations.
+    """
+
+    def __init__(self, size, keep):
+        self.size = size
+        self.keep = keep
+        self._free = []
+
+    def acquire(self):
+        return self._free.pop() if self._free else bytearray(self.size)
+
+    def release(self, buffer):
+        if len(buffer) == self.size and len(self._free) < self.keep:
+            self._free.append(buffer)
+
+
+@dataclass
+class AudioChunk:
+    """
+    A chunk of PCM audio.
+
+    `data` is a memoryview of a pooled buffer, valid until the pipeline
+    reports the chunk done; copy it if it has to outlive that.
+    """
+
+    client: "Client"
+    index: int
+    data: memoryview
+    buffer: bytearray = field(repr=False, default=None)
+    received_at: float = field(default_factory=time.perf_counter)
+
+    def wav_header(self):
+        """RIFF/WAVE header for this chunk, built only when a WAV is actually needed."""
+        sampling_rate = self.client.sampling_rate
+        width = self.client.samples_width
+        size = len(self.data)
+        return struct.pack(
+            "<4sI4s4sIHHIIHH4sI",
+            b"RIFF", 36 + size, b"WAVE",
+            b"fmt ", 16, 1, 1, sampling_rate, sampling_rate * width, width, width * 8,
+            b"data", size,
+        )
+
+    def write_wav(self, file):
+        """Write the chunk as a WAV file without concatenating header and samples."""
+        file.write(self.wav_header())
+        file.write(self.data)
+
+
 class Client:
     """
     Represents a client connected to the VoiceStreamAI server.
@@ -9,20 +84,22 @@ class Client:
 
     Attributes:
         client_id (str): A unique identifier for the client.
-        buffer (bytearray): A buffer to store incoming audio data.
+        buffer (bytearray): Preallocated buffer the current chunk is written
+                            into; handed to the pipeline as-is when full.
+        buffered (int): Bytes of the current chunk received so far.
         config (dict): Configuration settings for the client, like chunk length
                        and offset.
         file_counter (int): Counter for the number of audio files processed.
         total_samples (int): Total number of audio samples received from this
                              client.
         sampling_rate (int): The sampling rate of the audio data in Hz.
-        samples_width (int): The width of each audio sample in bits.
+        samples_width (int): The width of each audio sample in bytes.
+        max_pending_chunks (int): Chunks this client may have queued or in
+                                  processing before its reads are paused.
     """
 
-    def __init__(self, client_id, sampling_rate, samples_width):
+    def __init__(self, client_id, sampling_rate=16000, samples_width=2, max_pending_chunks=2):
         self.client_id = client_id
-        self.buffer = bytearray()
-        self.scratch_buffer = bytearray()
         self.config = {
             "language": None,
             "processing_strategy": "silence_at_end_of_chunk",
@@ -35,16 +112,77 @@ class Client:
         self.total_samples = 0
         self.sampling_rate = sampling_rate
         self.samples_width = samples_width
+        self.max_pending_chunks = max_pending_chunks
+        self.closed = False
+        self.on_result: Optional[Callable[[AudioChunk, str], None]] = None
+        self._pending = asyncio.Semaphore(max_pending_chunks)
+        self._pool = ChunkBufferPool(self.chunk_bytes, max_pending_chunks + 1)
+        self.buffer = self._pool.acquire()
+        self.buffered = 0
+
+    @property
+    def bytes_per_second(self):
+        return self.sampling_rate * self.samples_width
+
+    def _align(self, length):
+        return int(length) // self.samples_width * self.samples_width
+
+    @property
+    def chunk_bytes(self):
+        seconds = self.config["processing_args"]["chunk_length_seconds"]
+        return max(self._align(seconds * self.bytes_per_second), self.samples_width * 2)
+
+    @property
+    def offset_bytes(self):
+        seconds = self.config["processing_args"]["chunk_offset_seconds"]
+        return min(self._align(seconds * self.bytes_per_second), self.chunk_bytes - self.samples_width)
+
+    @staticmethod
+    def _seconds(name, value):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"{name} must be a number of seconds")
+        return value
 
     def update_config(self, config_data):
+        """
+        Apply a config message. Raises ValueError, leaving the config as it
+        was, when `chunk_length_seconds` or `chunk_offset_seconds` is not a
+        number; the length is clamped to MAX_CHUNK_LENGTH_SECONDS and the
+        offset to [0, length).
+        """
+        updates = config_data.get("processing_args", {})
+        if not isinstance(updates, dict):
+            raise ValueError("processing_args must be an object")
+        processing_args = {**self.config["processing_args"], **updates}
+        length = self._seconds("chunk_length_seconds", processing_args["chunk_length_seconds"])
+        offset = self._seconds("chunk_offset_seconds", processing_args["chunk_offset_seconds"])
+        if length <= 0:
+            raise ValueError("chunk_length_seconds must be positive")
+        length = min(length, MAX_CHUNK_LENGTH_SECONDS)
+        processing_args["chunk_length_seconds"] = length
+        # offset_bytes keeps the offset at least one sample short of the chunk
+        processing_args["chunk_offset_seconds"] = min(max(offset, 0), length)
         self.config.update(config_data)
+        self.config["processing_args"] = processing_args
+        if self.chunk_bytes != self._pool.size:
+            # Start a buffer of the new size, carrying over what was received
+            self._pool = ChunkBufferPool(self.chunk_bytes, self.max_pending_chunks + 1)
+            previous = memoryview(self.buffer)[:self.buffered]
+            keep = min(self.buffered, self._pool.size - self.samples_width)
+            self.buffer = self._pool.acquire()
+            self.buffer[:keep] = previous[self.buffered - keep:]
+            self.buffered = keep
 
     def append_audio_data(self, audio_data):
-        self.buffer.extend(audio_data)
-        self.total_samples += len(audio_data) / self.samples_width
+        """Copy as much of `audio_data` as fits into the current chunk; returns the bytes taken."""
+        view = audio_data if isinstance(audio_data, memoryview) else memoryview(audio_data)
+        taken = min(len(view), self._pool.size - self.buffered)
+        self.buffer[self.buffered:self.buffered + taken] = view[:taken]
+        self.buffered += taken
+        return taken
 
     def clear_buffer(self):
-        self.buffer.clear()
+        self.buffered = 0
 
     def increment_file_counter(self):
         self.file_counter += 1
@@ -52,7 +190,112 @@ class Client:
     def get_file_name(self):
         return f"{self.client_id}_{self.file_counter}.wav"
 
-    def process_audio(self, websocket, vad_pipeline, asr_pipeline):
-        self.buffering_strategy.process_audio(
-            websocket, vad_pipeline, asr_pipeline
-        )
\ No newline at end of file
+    def next_chunk(self):
+        """
+        Hand over the current buffer once it holds `chunk_length_seconds` of audio.
+
+        The chunk is a view of the buffer, not a copy. The last
+        `chunk_offset_seconds` are copied into the next buffer so words on a
+        boundary are not split.
+        """
+        if self.buffered < self._pool.size:
+            return None
+        full = self.buffer
+        chunk = AudioChunk(self, self.file_counter, memoryview(full)[:self.buffered], full)
+        self.increment_file_counter()
+        offset = self.offset_bytes
+        self.buffer = self._pool.acquire()
+        self.buffer[:offset] = chunk.data[self.buffered - offset:]
+        self.buffered = offset
+        return chunk
+
+    async def feed(self, audio_data, pipeline):
+        """Buffer incoming audio and submit every complete chunk, waiting when the pipeline is busy."""
+        view = memoryview(audio_data)
+        self.total_samples += len(view) // self.samples_width
+        while len(view) and not self.closed:
+            view = view[self.append_audio_data(view):]
+            if self.buffered < self._pool.size:
+                break
+            # Wait for a free slot before taking another buffer from the pool
+            await self._pending.acquire()
+            if self.closed:
+                self._pending.release()
+                break
+            chunk = self.next_chunk()
+            try:
+                await pipeline.submit(chunk)
+            except BaseException:
+                self._pending.release()
+                raise
+
+    def chunk_done(self, chunk, result):
+        self._pending.release()
+        if not self.closed and result is not None:
+            AUDIO_CHUNK_LATENCY.observe(time.perf_counter() - chunk.received_at)
+            if self.on_result:
+                self.on_result(chunk, result)
+        # The buffer goes back to the pool; the chunk's view is no longer valid
+        chunk.data.release()
+        if chunk.buffer is not None:
+            self._pool.release(chunk.buffer)
+
+    def close(self):
+        """Drop buffered audio; queued chunks of this client are skipped."""
+        self.closed = True
+        self.on_result = None
+        self.buffered = 0
+
+
+async def transcribe_placeholder(chunk):
+    # No speech recognition model is wired in yet
+    return ""
+
+
+class AudioPipeline:
+    """
+    Process audio chunks from all clients with a fixed pool of workers.
+
+    The shared queue is bounded, and each client may only have a few chunks in
+    flight, so a fast or stuck client slows its own reads instead of growing
+    memory or spawning tasks.
+    """
+
+    def __init__(self, transcribe: Callable[[AudioChunk], Awaitable[str]] = transcribe_placeholder,
+                 workers=2, max_queue=32):
+        self.transcribe = transcribe
+        self.workers = workers
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self):
+        if not self._tasks:
+            self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def submit(self, chunk):
+        self.start()
+        await self._queue.put(chunk)
+
+    async def _worker(self):
+        while True:
+            chunk = await self._queue.get()
+            result = None
+            try:
+                if not chunk.client.closed:
+                    result = await self.transcribe(chunk)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Audio chunk {chunk.index} of client {chunk.client.client_id} failed: {e!r}")
+            finally:
+                chunk.client.chunk_done(chunk, result)
+                self._queue.task_done()
+
+    async def join(self):
+        await self._queue.join()
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
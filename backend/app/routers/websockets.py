@@ -1,58 +1,219 @@
 from fastapi import APIRouter, Depends, status, HTTPException, Response
 from sqlalchemy.orm import Session
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
-from .. import schemas, models, utils, oauth2
+from .. import roster_models as models, oauth2
 from ..config import get_db
 from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.responses import HTMLResponse
-import uuid, asyncio, json
+import uuid, asyncio, json, base64, binascii
+from dataclasses import dataclass, replace
+from typing import FrozenSet
+from ..realtime import Event, Subscription, hub
+from ..config.config import settings
+from ..infer import DEFAULT_PROMPT, ExtractionRequest, InferenceBusy, get_job_queue, resolve_model
 
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: list[WebSocket] = []
-
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
-
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
-
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
-
-
-manager = ConnectionManager()
 
 router = APIRouter(
     tags=["WebSocket"]
 )
 
-from .websocket_client import Client
+from .websocket_client import AudioPipeline, Client
+
+# Shared by every connection of this worker; bounded so dictation load
+# pauses socket reads instead of piling up tasks and buffers
+audio_pipeline = AudioPipeline()
+
+@router.on_event("shutdown")
+async def stop_audio_pipeline():
+    await audio_pipeline.stop()
 
 @router.websocket("/ws/{client_id}")
-async def websocket_endpoint(websocket: WebSocket, client_id: str):
-    await manager.connect(websocket)
+async def websocket_endpoint(
+    websocket: WebSocket,
+    client_id: str,
+    current_user: models.User = Depends(oauth2.get_websocket_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Dictation audio, roster change subscriptions and extractions for one
+    signed-in client; pass the access token as ?token=.
+    """
+    viewer = Viewer.of(db, current_user)
+    db.close()
+    connection = await hub.connect(websocket)
+    client = Client(client_id)
+    client.on_result = lambda chunk, text: send_or_drop(
+        connection, Event("transcription", {"chunk": chunk.index, "text": text})
+    )
+    extractions = set()
     try:
         while True:
-            data = await websocket.receive_text()
-            process_audio(
-                websocket, data
-            )
-            #await manager.send_personal_message(f"You wrote: {data}", websocket)
-            # await manager.broadcast(f"Client #{client_id} says: {data}")
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # Binary frames carry raw PCM and go into the chunk buffer without a copy
+            if message.get("bytes") is not None:
+                await client.feed(message["bytes"], audio_pipeline)
+                continue
+            data = message.get("text") or ""
+            if await handle_control_message(connection, client, data, extractions, viewer):
+                continue
+            # Older clients send audio in text frames
+            await client.feed(data.encode(), audio_pipeline)
     except WebSocketDisconnect:
-        manager.disconnect(websocket)
+        pass
+    finally:
+        client.close()
+        for task in extractions:
+            task.cancel()
+        await hub.disconnect(connection)
+
+@dataclass(frozen=True)
+class Viewer:
+    """What a signed-in user may follow over the socket."""
+
+    user_id: int
+    is_admin: bool
+    staff_ids: FrozenSet[int]  # the user's own staff records
+
+    @classmethod
+    def of(cls, db: Session, user) -> "Viewer":
+        staff_ids = db.query(models.Staff.id).filter(
+            models.Staff.user_id == user.id,
+            models.Staff.active == True
+        )
+        return cls(user.id, user.role == "admin", frozenset(staff_id for staff_id, in staff_ids))
+
+    def authorize(self, subscription: Subscription) -> Subscription:
+        """
+        The subscription as this viewer may hold it. An empty one follows
+        the viewer's own staff records. Admins may follow anything, and
+        everything with "all". Anyone may follow a location, whose roster
+        every user can read; leave and availability arrive on staff topics,
+        so others may follow only their own staff records. Raises ValueError
+        for anything else.
+        """
+        if not (subscription.everything or subscription.location_ids or subscription.staff_ids):
+            return replace(subscription, staff_ids=self.staff_ids)
+        if self.is_admin:
+            return subscription
+        if subscription.everything:
+            raise ValueError("only admins may follow all changes")
+        others = subscription.staff_ids - self.staff_ids
+        if others:
+            raise ValueError(f"not authorized for staff {', '.join(map(str, sorted(others)))}")
+        return subscription
 
-def process_audio(websocket, audio):
-    asyncio.create_task(
-                process_audio_async(websocket, audio)
-            )
+def send_or_drop(connection, event):
+    """Queue an event for the client, disconnecting it as the hub does when its queue is full."""
+    if not connection.offer(event):
+        hub.drop_slow_consumer(connection)
 
-async def process_audio_async(websocket, audio):
-    json_transcription = ""
-    await websocket.send_text(json.dumps(json_transcription))
\ No newline at end of file
+async def handle_control_message(connection, client, data, extractions=None, viewer=None):
+    """Handle subscription, audio config and extraction messages; anything else is audio.
+
+    {"action": "subscribe", "location_ids": [1, 2], "staff_ids": [7],
+     "start_date": "2025-01-06", "end_date": "2025-01-12", "since_seq": 41}
+    {"action": "subscribe", "all": true}
+    {"action": "unsubscribe"}
+    {"action": "config", "data": {"processing_args": {"chunk_length_seconds": 3}}}
+    {"action": "extract", "image": "<base64>", "text": "...", "report_type": "thyroid"}
+
+    Subscriptions are limited to what `viewer` may see (see Viewer.authorize).
+    With since_seq the retained changes after it are replayed first. If they
+    are no longer retained the reply is a "resync" event and the client
+    should reload the range over HTTP. Extractions are submitted as the
+    viewer, so only they can look the job up over HTTP.
+    """
+    if not data.startswith("{"):
+        return False
+    try:
+        message = json.loads(data)
+    except ValueError:
+        return False
+    if not isinstance(message, dict) or message.get("action") not in ("subscribe", "unsubscribe", "config", "extract"):
+        return False
+
+    if message["action"] == "extract":
+        task = asyncio.create_task(stream_extraction(connection, message, viewer.user_id if viewer is not None else None))
+        if extractions is not None:
+            extractions.add(task)
+            task.add_done_callback(extractions.discard)
+        return True
+
+    if message["action"] == "config":
+        try:
+            if not isinstance(message.get("data"), dict):
+                raise ValueError("data must be an object")
+            client.update_config(message["data"])
+        except ValueError as e:
+            connection.offer(Event("error", {"detail": f"Invalid config: {e}"}))
+        return True
+
+    if message["action"] == "unsubscribe":
+        hub.unsubscribe(connection)
+        connection.offer(Event("unsubscribed", {}))
+        return True
+    try:
+        subscription = Subscription.from_message(message)
+        if viewer is not None:
+            subscription = viewer.authorize(subscription)
+        since_seq = message.get("since_seq")
+        since_seq = int(since_seq) if since_seq is not None else None
+    except (TypeError, ValueError) as e:
+        connection.offer(Event("error", {"detail": f"Invalid subscription: {e}"}))
+        return True
+    seq = await hub.latest_seq()
+    connection.offer(Event("subscribed", {
+        "location_ids": sorted(subscription.location_ids),
+        "staff_ids": sorted(subscription.staff_ids),
+        "start_date": subscription.start_date,
+        "end_date": subscription.end_date,
+        "all": subscription.everything,
+        "seq": seq
+    }))
+    if since_seq is None:
+        hub.subscribe(connection, subscription)
+    elif not await hub.resume(connection, subscription, since_seq):
+        connection.offer(Event("resync", {"seq": seq}))
+    return True
+
+async def stream_extraction(connection, message, owner=None):
+    """Run an extraction, sending its output as it is decoded.
+
+    Replies with "extraction_started" {job_id}, then "extraction_token"
+    {job_id, text} per piece, then "extraction_done" {job_id, result} or
+    "extraction_error" {job_id, error}. A client whose send queue fills up
+    is disconnected as a slow consumer and the extraction is stopped, rather
+    than tokens being dropped from the middle of the text.
+    """
+    try:
+        image = base64.b64decode(message["image"], validate=True) if message.get("image") else None
+        text = message.get("text") or None
+        model = resolve_model(settings, message.get("report_type"), image is not None, text is not None)
+        request = ExtractionRequest(
+            image=image,
+            text=text,
+            prompt=message.get("prompt") or DEFAULT_PROMPT,
+            owner=owner
+        )
+        stream = await get_job_queue().submit_stream(request, model)
+    except (ValueError, binascii.Error, InferenceBusy) as e:
+        send_or_drop(connection, Event("extraction_error", {"job_id": None, "error": str(e)}))
+        return
+
+    job_id = stream.job_id
+    send_or_drop(connection, Event("extraction_started", {"job_id": job_id}))
+    try:
+        async for piece in stream:
+            if not connection.offer(Event("extraction_token", {"job_id": job_id, "text": piece})):
+                stream.cancel()
+                hub.drop_slow_consumer(connection)
+                return
+    except asyncio.CancelledError:
+        stream.cancel()
+        raise
+    if stream.error:
+        send_or_drop(connection, Event("extraction_error", {"job_id": job_id, "error": stream.error}))
+    else:
+        send_or_drop(connection, Event("extraction_done", {"job_id": job_id, "result": stream.result}))
@@ -1,8 +1,14 @@
 from pydantic import BaseModel
 
+class UserLogin(BaseModel):
+    username: str
+    password: str
+
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: str | None = None
+    role: str | None = None
 
 class TokenData(BaseModel):
     username: str | None = None
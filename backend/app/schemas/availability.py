@@ -0,0 +1,65 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+
+class StaffAvailabilityBase(BaseModel):
+    date: date
+    shift_type: str
+    is_available: bool = True
+    note: Optional[str] = None
+
+class StaffAvailabilityCreate(StaffAvailabilityBase):
+    pass
+
+class StaffAvailabilityUpdate(BaseModel):
+    date: Optional[date] = None
+    shift_type: Optional[str] = None
+    is_available: Optional[bool] = None
+    note: Optional[str] = None
+
+class StaffAvailability(StaffAvailabilityBase):
+    id: int
+    staff_id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class AvailabilityRange(BaseModel):
+    start_date: date
+    end_date: date
+    shift_type: str
+    available: bool = True
+    weekdays: Optional[List[int]] = None  # ISO days of the week (1 = Monday); all if not given
+
+class AvailabilityRangeResult(BaseModel):
+    days: int
+
+class AvailabilityBatch(BaseModel):
+    entries: Optional[List[StaffAvailabilityCreate]] = None
+    date_range: Optional[AvailabilityRange] = None
+
+class AvailabilityBatchResult(BaseModel):
+    received: int
+    created: int
+    updated: int
+
+class AvailabilityHeatmapCell(BaseModel):
+    date: date
+    shift_type: Optional[str] = None  # demand is per day, not per shift type
+    id: Optional[int] = None  # role or group id; None for staff without a group
+    name: Optional[str] = None
+    count: int
+
+class AvailabilityHeatmap(BaseModel):
+    start_date: date
+    end_date: date
+    by: str
+    available: List[AvailabilityHeatmapCell]
+    required: List[AvailabilityHeatmapCell]
+
+class AvailabilityCalendar(BaseModel):
+    shift_type: str
+    days: List[date]
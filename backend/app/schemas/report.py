@@ -0,0 +1,77 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, datetime
+
+class ReportBase(BaseModel):
+    template_used: Optional[int] = None
+    report_data: Optional[str] = None
+    status: str = "DRAFT"  # DRAFT or COMPLETED
+
+class ReportUpdate(BaseModel):
+    template_used: Optional[int] = None
+    report_data: Optional[str] = None
+    status: Optional[str] = None
+
+class ReportNew(BaseModel):
+    id: int
+    unique_identifier: str
+
+    class Config:
+        from_attributes = True
+
+class ReportData(ReportBase):
+    id: int
+    unique_identifier: str
+    report_by: int
+    date_created: datetime
+    date_modified: datetime
+
+    class Config:
+        from_attributes = True
+
+class ReportFinal(ReportData):
+    pass
+
+class ExtractionJob(BaseModel):
+    job_id: str
+    status: str  # queued, running, done or failed
+    result: Optional[str] = None
+    error: Optional[str] = None
+
+class ReportSearchHit(BaseModel):
+    report_id: int
+    score: float
+    study: str
+    report_date: Optional[date] = None
+    snippet: str  # HTML, matches wrapped in <mark>
+
+class ReportDraftEdit(BaseModel):
+    at: int  # character offset in the text as left by the previous edits
+    delete: int = 0
+    insert: str = ""
+
+class ReportDraftSave(BaseModel):
+    base_version: int
+    edits: Optional[List[ReportDraftEdit]] = None
+    text: Optional[str] = None  # the whole new text, instead of edits
+
+class ReportDraftSaved(BaseModel):
+    version: int
+    length: int
+
+class ReportDraft(BaseModel):
+    version: int
+    text: str
+
+class ReportRevisionInfo(BaseModel):
+    version: int
+    kind: str
+    length: int
+    author_id: Optional[int] = None
+    date_created: datetime
+
+class ReportDraftRestore(BaseModel):
+    base_version: int
+
+class ReportDraftFinalise(BaseModel):
+    version: int
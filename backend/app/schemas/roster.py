@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime
+from typing import Dict, Optional, List
+from datetime import date, datetime
 from enum import Enum
 
 class LeaveType(str, Enum):
@@ -233,4 +233,56 @@ class FTEConfigurationResponse(FTEConfigurationBase):
     active: bool
 
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+class RosterExpansionRequest(BaseModel):
+    start_date: date
+    end_date: date
+    holidays: List[date] = []
+    replace: bool = False  # remove assignments already in the range on the template's slots
+    dry_run: bool = False
+
+class RosterExpansionResult(BaseModel):
+    created: int
+    existing: int
+    replaced: int
+    skipped_leave: int
+    skipped_holiday: int
+    unstaffed: int
+    weeks: int
+    dry_run: bool = False
+
+class LeaveBalance(BaseModel):
+    staff_id: int
+    year: int
+    entitlement: float  # days for the year at the staff member's FTE
+    accrued: float  # of the entitlement, by today
+    used: int
+    used_by_type: Dict[str, int]  # by LeaveType value
+    remaining: float
+
+class LeaveImpactRequest(BaseModel):
+    staff_id: int
+    start_date: date
+    end_date: date
+    leave_id: Optional[int] = None  # the request being previewed, if it exists
+    include_pending: bool = False  # treat other staff's pending leave as approved
+
+class LeaveImpactSlot(BaseModel):
+    date: date
+    location_id: int
+    location_name: str
+    time_slot_id: int
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    min_staff_required: int
+    staffed: int  # without this leave
+    staffed_with_leave: int
+
+class LeaveImpact(BaseModel):
+    staff_id: int
+    start_date: date
+    end_date: date
+    include_pending: bool
+    assignments: int  # assignment days the leave takes the staff member off
+    shortfalls: List[LeaveImpactSlot]
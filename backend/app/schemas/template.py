@@ -0,0 +1,287 @@
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional, Union
+from datetime import datetime
+
+class TemplateCreate(BaseModel):
+    name: str
+    description: Optional[str] = None
+    template_text: str
+    template_html: Optional[str] = None
+
+class TemplateListItems(TemplateCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateImportError(BaseModel):
+    item: Union[str, int]  # key or index of the item in the imported file
+    name: Optional[str] = None
+    error: str
+
+class TemplateImportResult(BaseModel):
+    created: int
+    updated: int
+    unchanged: int
+    failed: int
+    errors: List[TemplateImportError] = []
+    dry_run: bool = False
+
+class TemplateSlot(BaseModel):
+    key: str
+    kind: str  # named, choice, text, blank or measurement
+    placeholder: str
+    options: Optional[List[str]] = None
+    unit: Optional[str] = None
+
+class TemplateSlots(BaseModel):
+    template_id: int
+    version: str
+    slots: List[TemplateSlot]
+
+class TemplateRenderRequest(BaseModel):
+    values: Dict[str, Union[str, int, float]] = {}
+
+class TemplateRender(BaseModel):
+    template_id: int
+    version: str
+    html: str
+
+class TemplateWeekTreeSaved(BaseModel):
+    created: int
+    updated: int
+    deleted: int
+    tree: Dict[str, Any]  # the week as stored, with the ids of new rows
+
+# Template week and template part tables, served by app.crud.crud_router
+
+class TemplateWeekCreate(BaseModel):
+    template_id: int
+    name: Optional[str] = None
+
+class TemplateWeekUpdate(BaseModel):
+    template_id: Optional[int] = None
+    name: Optional[str] = None
+
+class TemplateWeekResponse(TemplateWeekCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateWeekDayCreate(BaseModel):
+    week_id: int
+    day_of_week: int  # ISO, 1 = Monday
+
+class TemplateWeekDayUpdate(BaseModel):
+    week_id: Optional[int] = None
+    day_of_week: Optional[int] = None
+
+class TemplateWeekDayResponse(TemplateWeekDayCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateWeekDaySlotCreate(BaseModel):
+    week_day_id: int
+    location_id: int
+    time_slot_id: int
+
+class TemplateWeekDaySlotUpdate(BaseModel):
+    week_day_id: Optional[int] = None
+    location_id: Optional[int] = None
+    time_slot_id: Optional[int] = None
+
+class TemplateWeekDaySlotResponse(TemplateWeekDaySlotCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateWeekDaySlotStaffCreate(BaseModel):
+    day_slot_id: int
+    staff_id: Optional[int] = None  # None while the place is unfilled
+
+class TemplateWeekDaySlotStaffUpdate(BaseModel):
+    day_slot_id: Optional[int] = None
+    staff_id: Optional[int] = None
+
+class TemplateWeekDaySlotStaffResponse(TemplateWeekDaySlotStaffCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateWeekDaySlotStaffRequirementCreate(BaseModel):
+    slot_staff_id: int
+    role_id: Optional[int] = None
+    min_staff: int = 1
+
+class TemplateWeekDaySlotStaffRequirementUpdate(BaseModel):
+    slot_staff_id: Optional[int] = None
+    role_id: Optional[int] = None
+    min_staff: Optional[int] = None
+
+class TemplateWeekDaySlotStaffRequirementResponse(TemplateWeekDaySlotStaffRequirementCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateWeekDaySlotStaffRequirementGroupCreate(BaseModel):
+    requirement_id: int
+    staff_group_id: Optional[int] = None
+    min_staff: int = 1
+
+class TemplateWeekDaySlotStaffRequirementGroupUpdate(BaseModel):
+    requirement_id: Optional[int] = None
+    staff_group_id: Optional[int] = None
+    min_staff: Optional[int] = None
+
+class TemplateWeekDaySlotStaffRequirementGroupResponse(TemplateWeekDaySlotStaffRequirementGroupCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateWeekDaySlotStaffRequirementGroupStaffCreate(BaseModel):
+    group_id: int
+    staff_id: int
+
+class TemplateWeekDaySlotStaffRequirementGroupStaffUpdate(BaseModel):
+    group_id: Optional[int] = None
+    staff_id: Optional[int] = None
+
+class TemplateWeekDaySlotStaffRequirementGroupStaffResponse(TemplateWeekDaySlotStaffRequirementGroupStaffCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateTimeSlotCreate(BaseModel):
+    template_id: int
+    location_id: int
+    start_time: str  # Format: "HH:MM"
+    end_time: str  # Format: "HH:MM"
+    days_of_week: str  # Comma-separated days: "1,2,3,4,5"
+
+class TemplateTimeSlotUpdate(BaseModel):
+    template_id: Optional[int] = None
+    location_id: Optional[int] = None
+    start_time: Optional[str] = None
+    end_time: Optional[str] = None
+    days_of_week: Optional[str] = None
+
+class TemplateTimeSlotResponse(TemplateTimeSlotCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateSlotCreate(BaseModel):
+    template_id: int
+    time_slot_id: int
+    day_of_week: int  # ISO, 1 = Monday
+
+class TemplateSlotUpdate(BaseModel):
+    template_id: Optional[int] = None
+    time_slot_id: Optional[int] = None
+    day_of_week: Optional[int] = None
+
+class TemplateSlotResponse(TemplateSlotCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateRequirementCreate(BaseModel):
+    template_id: int
+    slot_id: int
+    role_id: Optional[int] = None
+    min_staff: int = 1
+    max_staff: Optional[int] = None  # None for no limit
+
+class TemplateRequirementUpdate(BaseModel):
+    template_id: Optional[int] = None
+    slot_id: Optional[int] = None
+    role_id: Optional[int] = None
+    min_staff: Optional[int] = None
+    max_staff: Optional[int] = None
+
+class TemplateRequirementResponse(TemplateRequirementCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateStaffCreate(BaseModel):
+    template_id: int
+    slot_id: int
+    staff_id: int
+
+class TemplateStaffUpdate(BaseModel):
+    template_id: Optional[int] = None
+    slot_id: Optional[int] = None
+    staff_id: Optional[int] = None
+
+class TemplateStaffResponse(TemplateStaffCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
+
+class TemplateHelperCreate(BaseModel):
+    template_id: int
+    staff_id: int
+    location_id: Optional[int] = None  # None for any location
+
+class TemplateHelperUpdate(BaseModel):
+    template_id: Optional[int] = None
+    staff_id: Optional[int] = None
+    location_id: Optional[int] = None
+
+class TemplateHelperResponse(TemplateHelperCreate):
+    id: int
+    date_created: datetime
+    date_modified: datetime
+    active: bool
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from .. import models, utils
+from .. import roster_models as models, utils
 
 def user_password_verify(username: str, password: str, db: Session):
     """
@@ -0,0 +1,221 @@
+"""
+Staffed roster slots per day, and what approving leave would do to them.
+
+slot_coverage_counts holds, for every date and location time slot, how many
+active roster assignments it has whose staff member is not on approved leave
+that day. Like the availability counts (app.availability_aggregates) it is
+kept current by deltas rather than recounted:
+
+    assignments  roster expansion and assignment edits add (or remove) the
+                 assignments they write (or deactivate)
+    leave        leave approved (or no longer approved) takes out (or gives
+                 back) the staff member's assignments on the days it adds
+                 (or frees); days of their other approved leave count once
+
+so leave_impact() can tell which slots a proposed leave takes below their
+location's min_staff_required from the staff member's own assignments and
+one read of the counts, without validating the roster. Assignments written
+by other means are corrected by `python -m app.rebuild slot_coverage`.
+"""
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+from .leave_overlap import as_day, changed_leave_days, leave_days, overlapping_leave
+from .reference_data import get_reference_data
+from .upsert import add_deltas, replace_rows
+
+MAX_PREVIEW_DAYS = 366
+
+CoverageKey = Tuple[date, int, int]  # date, location_id, time_slot_id
+Assignment = Tuple[int, int, int, date]  # staff_id, location_id, time_slot_id, date
+
+
+def apply_deltas(db: Session, deltas: Dict[CoverageKey, int]) -> None:
+    """Add the deltas to their counts with one upsert. Does not commit."""
+    add_deltas(db, models.SlotCoverageCount, ["date", "location_id", "time_slot_id"], "staffed", deltas,
+               keys=["date", "time_slot_id"])
+
+
+def assignments_changed(db: Session, added: Iterable[Assignment] = (), removed: Iterable[Assignment] = ()) -> None:
+    """
+    Count assignments that became active (`added`) or stopped being active
+    (`removed`), as (staff_id, location_id, time_slot_id, date). Those on a
+    day of approved leave were not counted and are skipped. Does not commit.
+    """
+    changes = [(assignment, +1) for assignment in added] + [(assignment, -1) for assignment in removed]
+    if not changes:
+        return
+    days = [as_day(day) for (_, _, _, day), _ in changes]
+    start, end = min(days), max(days)
+    intervals = overlapping_leave(db, start, end, ("approved",), {staff_id for (staff_id, _, _, _), _ in changes})
+    on_leave = leave_days(intervals, start, end)
+    deltas: Dict[CoverageKey, int] = defaultdict(int)
+    for (staff_id, location_id, time_slot_id, day), sign in changes:
+        day = as_day(day)
+        if day not in on_leave.get(staff_id, ()):
+            deltas[(day, location_id, time_slot_id)] += sign
+    apply_deltas(db, deltas)
+
+
+def assignment_snapshot(assignment) -> dict:
+    """The fields of a RosterAssignment that decide what it covers, to compare before and after a change."""
+    return {key: getattr(assignment, key) for key in ("staff_id", "location_id", "time_slot_id", "date", "active")}
+
+
+def assignment_changed(db: Session, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Move the counts for an assignment that changed from `before` to `after`
+    (assignment_snapshot()s; None when it did not exist). Does not commit.
+    """
+    def counted(snapshot):
+        if snapshot is None or snapshot.get("active") is False:
+            return []
+        return [(snapshot["staff_id"], snapshot["location_id"], snapshot["time_slot_id"], snapshot["date"])]
+
+    old, new = counted(before), counted(after)
+    if old != new:
+        assignments_changed(db, added=new, removed=old)
+
+
+def _assignments(db: Session, staff_ids: Iterable[int], start: date, end: date,
+                 time_slot_ids: Optional[Iterable[int]] = None) -> List[Assignment]:
+    """Active assignments of the staff from `start` to `end` inclusive."""
+    RA = models.RosterAssignment
+    query = select(RA.staff_id, RA.location_id, RA.time_slot_id, RA.date).where(
+        RA.staff_id.in_(list(staff_ids)),
+        RA.active == True,
+        RA.date >= datetime.combine(start, time.min),
+        RA.date < datetime.combine(end + timedelta(days=1), time.min),
+    )
+    if time_slot_ids is not None:
+        query = query.where(RA.time_slot_id.in_(list(time_slot_ids)))
+    return [(staff_id, location_id, time_slot_id, as_day(day))
+            for staff_id, location_id, time_slot_id, day in db.execute(query)]
+
+
+def leave_changed(db: Session, leave_id: int, before: Optional[dict], after: Optional[dict]) -> None:
+    """
+    Move the counts for a leave request that changed from `before` to
+    `after` (app.leave_overlap.leave_snapshot()s; None when it did not
+    exist). Does not commit.
+    """
+    # Give back the assignments the leave covered, then take out those it covers now
+    deltas: Dict[CoverageKey, int] = defaultdict(int)
+    for staff_id, start, end, days, sign in changed_leave_days(db, leave_id, before, after):
+        for _, location_id, time_slot_id, day in _assignments(db, [staff_id], start, end):
+            if day in days:
+                deltas[(day, location_id, time_slot_id)] += sign
+    apply_deltas(db, deltas)
+
+
+def leave_impact(db: Session, staff_id: int, start: date, end: date,
+                 leave_id: Optional[int] = None, include_pending: bool = False) -> dict:
+    """
+    The roster slots that would fall below their location's
+    min_staff_required if `staff_id` were on leave from `start` to `end`.
+
+    `leave_id` is the request being previewed, if it exists: whether it is
+    approved now makes no difference. With `include_pending`, other staff's
+    pending leave in the period counts as approved too.
+    """
+    if end < start:
+        raise ValueError("end_date is before start_date")
+    if (end - start).days >= MAX_PREVIEW_DAYS:
+        raise ValueError(f"Preview at most {MAX_PREVIEW_DAYS} days at a time")
+    approved = overlapping_leave(db, start, end, ("approved",), [staff_id])
+    this_leave = leave_days([leave for leave in approved if leave.id == leave_id], start, end).get(staff_id, set())
+    other_leave = leave_days([leave for leave in approved if leave.id != leave_id], start, end).get(staff_id, set())
+
+    # The staff member's assignments on days they are not already off
+    affected: Dict[CoverageKey, int] = defaultdict(int)
+    for _, location_id, time_slot_id, day in _assignments(db, [staff_id], start, end):
+        if day not in other_leave:
+            affected[(day, location_id, time_slot_id)] += 1
+    time_slot_ids = {time_slot_id for _, _, time_slot_id in affected}
+    Count = models.SlotCoverageCount
+    staffed: Dict[CoverageKey, int] = defaultdict(int)
+    if affected:
+        for day, location_id, time_slot_id, count in db.execute(
+            select(Count.date, Count.location_id, Count.time_slot_id, Count.staffed).where(
+                Count.date >= start, Count.date <= end, Count.time_slot_id.in_(list(time_slot_ids))
+            )
+        ):
+            staffed[(day, location_id, time_slot_id)] = count
+
+    pending: Dict[CoverageKey, int] = defaultdict(int)
+    if include_pending and affected:
+        requests = [leave for leave in overlapping_leave(db, start, end, ("pending",), exclude_leave_id=leave_id)
+                    if leave.staff_id != staff_id]
+        off = leave_days(requests, start, end)
+        if off:
+            # Days already under approved leave are not in the counts to begin with
+            already = leave_days(overlapping_leave(db, start, end, ("approved",), list(off)), start, end)
+            for other_id, location_id, time_slot_id, day in _assignments(db, list(off), start, end, time_slot_ids):
+                key = (day, location_id, time_slot_id)
+                if key in affected and day in off[other_id] and day not in already.get(other_id, ()):
+                    pending[key] += 1
+
+    reference = get_reference_data(db)
+    slots = {slot.id: slot for location in reference.locations.values() for slot in location.time_slots}
+    shortfalls = []
+    for key in sorted(affected):
+        day, location_id, time_slot_id = key
+        location = reference.locations.get(location_id)
+        if location is None:
+            continue
+        # The counts leave this staff member out where this leave is approved already
+        without_leave = staffed[key] + (affected[key] if day in this_leave else 0)
+        with_leave = without_leave - affected[key] - pending[key]
+        if with_leave >= location.min_staff_required:
+            continue
+        slot = slots.get(time_slot_id)
+        shortfalls.append({
+            "date": day,
+            "location_id": location_id,
+            "location_name": location.name,
+            "time_slot_id": time_slot_id,
+            "start_time": slot.start_time if slot else None,
+            "end_time": slot.end_time if slot else None,
+            "min_staff_required": location.min_staff_required,
+            "staffed": without_leave,
+            "staffed_with_leave": with_leave,
+        })
+    return {
+        "staff_id": staff_id,
+        "start_date": start,
+        "end_date": end,
+        "include_pending": include_pending,
+        "assignments": sum(affected.values()),
+        "shortfalls": shortfalls,
+    }
+
+
+def rebuild(db: Session) -> int:
+    """Recount everything from the active assignments and approved leave and commit; returns the counts written."""
+    RA, Leave = models.RosterAssignment, models.LeaveRequest
+    leave: Dict[int, Set[date]] = defaultdict(set)
+    for staff_id, leave_start, leave_end in db.execute(
+        select(Leave.staff_id, Leave.start_date, Leave.end_date)
+        .where(Leave.active == True, Leave.status == "approved")
+    ):
+        day, last = as_day(leave_start), as_day(leave_end)
+        while day <= last:
+            leave[staff_id].add(day)
+            day += timedelta(days=1)
+    counts: Dict[CoverageKey, int] = defaultdict(int)
+    for staff_id, location_id, time_slot_id, day in db.execute(
+        select(RA.staff_id, RA.location_id, RA.time_slot_id, RA.date).where(RA.active == True)
+    ).yield_per(10000):
+        day = as_day(day)
+        if day not in leave[staff_id]:
+            counts[(day, location_id, time_slot_id)] += 1
+    rows = [
+        {"date": day, "location_id": location_id, "time_slot_id": time_slot_id, "staffed": count}
+        for (day, location_id, time_slot_id), count in counts.items()
+    ]
+    return replace_rows(db, models.SlotCoverageCount, rows)
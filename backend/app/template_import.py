@@ -0,0 +1,300 @@
+"""
+Bulk import of report templates.
+
+Reads a JSON file incrementally, one top-level member at a time, and upserts
+templates by name in batches inside a single transaction. Two layouts are
+accepted:
+
+    {"1": {"study_name": "CT Abdomen", "templates": [{"template_data": "...", "is_default": true}]}}
+    [{"name": "CT Abdomen", "description": "...", "template_text": "...", "template_html": "..."}]
+
+The first is template_data.json; its plain-text template is kept as
+template_text and becomes escaped HTML with <br> line breaks. Invalid items are reported
+and skipped without failing the import:
+
+    python -m app.template_import template_data.json --batch-size 500 [--dry-run]
+"""
+import argparse
+import codecs
+import html
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import insert, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+
+logger = logging.getLogger("database")
+
+TEMPLATE_FIELDS = ("description", "template_text", "template_html")
+MAX_NAME_LENGTH = 255
+
+_WHITESPACE = " \t\n\r"
+
+
+def iter_json_members(stream, chunk_size: int = 1 << 16) -> Iterator[Tuple[Any, Any]]:
+    """
+    Yield (key, value) for each member of a top-level JSON object, or
+    (index, value) for each element of a top-level array.
+
+    `stream` may be text or binary (UTF-8); it is read in chunks and only
+    the member being decoded is held in memory. Raises ValueError on
+    malformed JSON.
+    """
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    pos = 0
+    eof = False
+
+    def read() -> bool:
+        nonlocal buffer, pos, eof
+        if eof:
+            return False
+        while True:
+            raw = stream.read(chunk_size)
+            chunk = utf8.decode(raw, final=not raw) if isinstance(raw, bytes) else raw
+            if chunk or not raw:
+                break  # else only part of a multi-byte character was read
+        if not chunk:
+            eof = True
+            return False
+        # Drop what has been consumed so the buffer stays around one member long
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        return True
+
+    def peek() -> str:
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buffer):
+                return buffer[pos]
+            if not read():
+                raise ValueError("Unexpected end of JSON")
+
+    def value():
+        nonlocal pos
+        peek()
+        while True:
+            try:
+                result, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if read():
+                    continue
+                raise ValueError(f"Invalid JSON: {e}") from None
+            # A number cut off by the chunk boundary decodes as a shorter one ("2." of
+            # "2.5"), so only accept a value once the delimiter after it has been read
+            rest = end
+            while rest < len(buffer) and buffer[rest] in _WHITESPACE:
+                rest += 1
+            if (rest == len(buffer) or buffer[rest] not in ",:]}") and read():
+                continue
+            pos = end
+            return result
+
+    def expect(char: str) -> None:
+        nonlocal pos
+        if peek() != char:
+            raise ValueError(f"Invalid JSON: expected {char!r} at {buffer[pos:pos + 20]!r}")
+        pos += 1
+
+    opening = peek()
+    if opening not in "{[":
+        raise ValueError("Expected a JSON object or array")
+    closing = "}" if opening == "{" else "]"
+    pos += 1
+    index = 0
+    while True:
+        if peek() == closing:
+            return
+        if index:
+            expect(",")
+        if opening == "{":
+            key = value()
+            if not isinstance(key, str):
+                raise ValueError("Invalid JSON: object keys must be strings")
+            expect(":")
+        else:
+            key = index
+        yield key, value()
+        index += 1
+
+
+def _text_to_html(text: str) -> str:
+    return html.escape(text, quote=False).replace("\n", "<br>")
+
+
+def template_from_item(item: Any) -> Dict[str, Optional[str]]:
+    """Template columns for one imported item; raises ValueError when it is unusable."""
+    if not isinstance(item, dict):
+        raise ValueError("Expected an object")
+
+    if "templates" in item:
+        variants = item["templates"]
+        if not isinstance(variants, list) or not variants:
+            raise ValueError("No templates")
+        chosen = next((v for v in variants if isinstance(v, dict) and v.get("is_default")), variants[0])
+        if not isinstance(chosen, dict) or not isinstance(chosen.get("template_data"), str):
+            raise ValueError("Template has no template_data")
+        name = item.get("study_name") or chosen.get("study_name") or chosen.get("name")
+        text = chosen["template_data"]
+        row = {"name": name, "description": name, "template_text": text, "template_html": _text_to_html(text)}
+    else:
+        name = item.get("name")
+        text = item.get("template_text")
+        row = {
+            "name": name,
+            "description": item.get("description", name),
+            "template_text": text,
+            "template_html": item.get("template_html", text),
+        }
+
+    if not isinstance(row["name"], str) or not row["name"].strip():
+        raise ValueError("Missing name")
+    row["name"] = row["name"].strip()
+    if len(row["name"]) > MAX_NAME_LENGTH:
+        raise ValueError(f"Name longer than {MAX_NAME_LENGTH} characters")
+    if not isinstance(row["template_text"], str) or not row["template_text"]:
+        raise ValueError("Missing template_text")
+    for key in ("description", "template_html"):
+        if row[key] is not None and not isinstance(row[key], str):
+            raise ValueError(f"{key} must be a string")
+    return row
+
+
+@dataclass
+class ImportResult:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    dry_run: bool = False
+
+    def error(self, item, name, message) -> None:
+        self.errors.append({"item": item, "name": name, "error": message})
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "failed": len(self.errors),
+            "errors": self.errors,
+            "dry_run": self.dry_run,
+        }
+
+
+def _write(db: Session, rows: List[Tuple[Any, Dict[str, Any]]], result: ImportResult) -> None:
+    """Upsert one batch of (item key, row) with at most one SELECT, one INSERT and one UPDATE."""
+    Template = models.Template
+    names = [row["name"] for _, row in rows]
+    existing = {
+        found.name: found
+        for found in db.query(Template.id, Template.name, *(getattr(Template, f) for f in TEMPLATE_FIELDS))
+        .filter(Template.name.in_(names), Template.active == True)
+    }
+
+    inserts, updates, unchanged = [], [], 0
+    for _, row in rows:
+        current = existing.get(row["name"])
+        if current is None:
+            inserts.append({**row, "active": True})
+        elif any(getattr(current, f) != row[f] for f in TEMPLATE_FIELDS):
+            updates.append({"id": current.id, **{f: row[f] for f in TEMPLATE_FIELDS}})
+        else:
+            unchanged += 1
+    if inserts:
+        db.execute(insert(Template), inserts)
+    if updates:
+        db.execute(update(Template), updates)
+    result.created += len(inserts)
+    result.updated += len(updates)
+    result.unchanged += unchanged
+
+
+def _flush_batch(db: Session, batch: Dict[str, Tuple[Any, Dict[str, Any]]], result: ImportResult) -> None:
+    rows = list(batch.values())
+    try:
+        with db.begin_nested():
+            _write(db, rows, result)
+        return
+    except SQLAlchemyError:
+        logger.warning("Template import batch failed; retrying its items one by one", exc_info=True)
+    # Find the offending rows without losing the rest of the batch
+    for key, row in rows:
+        try:
+            with db.begin_nested():
+                _write(db, [(key, row)], result)
+        except SQLAlchemyError as e:
+            result.error(key, row["name"], str(getattr(e, "orig", None) or e).splitlines()[0])
+
+
+def import_templates(db: Session, items: Iterable[Tuple[Any, Any]], batch_size: int = 500,
+                     dry_run: bool = False) -> ImportResult:
+    """
+    Upsert templates from (key, item) pairs by name, in one transaction.
+
+    Items that fail validation, or that the database rejects, are listed in
+    the result's errors; the rest are committed together (or rolled back
+    with `dry_run`). A name repeated in the input keeps its last occurrence.
+    """
+    result = ImportResult(dry_run=dry_run)
+    batch: Dict[str, Tuple[Any, Dict[str, Any]]] = {}
+    try:
+        for key, item in items:
+            try:
+                row = template_from_item(item)
+            except ValueError as e:
+                name = item.get("name") or item.get("study_name") if isinstance(item, dict) else None
+                result.error(key, name, str(e))
+                continue
+            if row["name"] in batch:
+                result.error(batch[row["name"]][0], row["name"], f"Duplicate name, replaced by item {key}")
+            batch[row["name"]] = (key, row)
+            if len(batch) >= batch_size:
+                _flush_batch(db, batch, result)
+                batch = {}
+        if batch:
+            _flush_batch(db, batch, result)
+    except BaseException:
+        db.rollback()
+        raise
+    if dry_run:
+        db.rollback()
+    else:
+        db.commit()
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk import report templates from a JSON file")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="validate and count without committing")
+    args = parser.parse_args(argv)
+
+    from .config.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as f:
+            result = import_templates(db, iter_json_members(f), batch_size=args.batch_size, dry_run=args.dry_run)
+    finally:
+        db.close()
+
+    summary = result.as_dict()
+    print(f"created {summary['created']}, updated {summary['updated']}, unchanged {summary['unchanged']}, "
+          f"failed {summary['failed']}" + (" (dry run, nothing committed)" if args.dry_run else ""))
+    for error in result.errors:
+        print(f"  item {error['item']} ({error['name']}): {error['error']}")
+    return 1 if result.errors else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,178 @@
+"""
+Precompiled report templates.
+
+A template's HTML is parsed once into literal text and slots, the places a
+report writer fills in:
+
+    [_laterality_]       named slot; every [_laterality_] shares one value
+    [with or without]    choice between the options separated by " or "
+    [generic]            free text, shown as-is until filled
+    [] or [_ _]          unnamed blank, one slot each
+    _ cm                 measurement blank, named after the words before it
+                         ("the right lobe measures _ cm" is right_lobe)
+
+Rendering joins the literals with the escaped values, so it never re-parses
+the template. Compiled templates are cached by (template id, version) and
+rendered HTML by (template id, version, hash of the values). The version is a
+hash of the HTML, so an edited template never serves stale output.
+"""
+import hashlib
+import html
+import json
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from .cache import LRUCache
+from .config.config import settings
+
+PLACEHOLDER = re.compile(r"\[([^\[\]<>]{0,80})\]|(?<![\w\]])_(?![\w\[])")
+# "_ x _ x _ cm": every blank of the dimensions takes the unit at the end
+UNIT = re.compile(r"(?:\s*x\s*_)*\s*(cm3|mm3|cm|mm|ml|cc|%)(?!\w)", re.IGNORECASE)
+WORD = re.compile(r"[a-z0-9]+")
+# Words that say nothing about what a measurement blank is for
+FILLER = {
+    "a", "an", "and", "approximately", "are", "at", "by", "is", "it", "measure", "measures",
+    "measuring", "measured", "of", "the", "to", "up", "was", "were", "x",
+}
+MAX_LABEL_WORDS = 3
+
+
+@dataclass
+class Slot:
+    key: str
+    kind: str  # named, choice, text, blank or measurement
+    placeholder: str
+    options: Optional[List[str]] = None
+    unit: Optional[str] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "key": self.key,
+            "kind": self.kind,
+            "placeholder": self.placeholder,
+            "options": self.options,
+            "unit": self.unit,
+        }
+
+
+def _slug(text: str) -> str:
+    return "_".join(WORD.findall(text.lower()))
+
+
+def _label_before(source: str, start: int) -> str:
+    """Name a measurement blank from the words leading up to it in its sentence."""
+    text = re.sub(r"<[^>]*>", " ", source[max(0, start - 200):start])
+    clause = re.split(r"[;:.,!?()\[\]]", text)[-1]
+    words = [w for w in WORD.findall(clause.lower()) if w not in FILLER]
+    return "_".join(words[-MAX_LABEL_WORDS:]) or "measurement"
+
+
+class CompiledTemplate:
+    """
+    A template split into literals and slots.
+
+    `literals` has one more entry than `occurrences`; occurrence i (an index
+    into `slots`) goes between literals i and i + 1.
+    """
+
+    def __init__(self, source: str, version: Optional[str] = None):
+        self.version = version or template_version(source)
+        self.slots: List[Slot] = []
+        self.literals: List[str] = []
+        self.occurrences: List[int] = []
+        self.placeholders: List[str] = []  # text of each occurrence, kept while unfilled
+        self._by_key: Dict[str, int] = {}
+        self._compile(source)
+
+    def _slot(self, key: str, kind: str, placeholder: str, shared: bool, **extra) -> int:
+        if shared and key in self._by_key:
+            return self._by_key[key]
+        base, n = key, 1
+        while key in self._by_key:
+            n += 1
+            key = f"{base}_{n}"
+        self._by_key[key] = len(self.slots)
+        self.slots.append(Slot(key, kind, placeholder, **extra))
+        return self._by_key[key]
+
+    def _compile(self, source: str) -> None:
+        position = 0
+        for match in PLACEHOLDER.finditer(source):
+            inner = match.group(1)
+            if inner is None:
+                unit = UNIT.match(source, match.end())
+                index = self._slot(_label_before(source, match.start()), "measurement", "_", shared=False,
+                                   unit=unit.group(1).lower() if unit else None)
+            else:
+                name = inner.strip(" _")
+                options = [o.strip(" ;") for o in re.split(r"\s+or\s+", name)] if " or " in name else None
+                if not name:
+                    index = self._slot("blank", "blank", match.group(0), shared=False)
+                elif options:
+                    index = self._slot(_slug(name), "choice", match.group(0), shared=True, options=options)
+                elif inner.startswith("_"):
+                    index = self._slot(_slug(name) or "blank", "named", match.group(0), shared=True)
+                else:
+                    index = self._slot(_slug(name) or "blank", "text", match.group(0), shared=True)
+            self.literals.append(source[position:match.start()])
+            self.occurrences.append(index)
+            self.placeholders.append(match.group(0))
+            position = match.end()
+        self.literals.append(source[position:])
+
+    def render(self, values: Dict[str, Any]) -> str:
+        """
+        Fill the slots from `values` by key. A choice may be given as an option
+        index; unknown keys are ignored and unfilled slots keep their placeholder.
+        """
+        filled = []
+        for slot in self.slots:
+            value = values.get(slot.key)
+            if slot.options and isinstance(value, int) and not isinstance(value, bool):
+                value = slot.options[value] if 0 <= value < len(slot.options) else None
+            filled.append(None if value is None or value == "" else html.escape(str(value)))
+        out = [self.literals[0]]
+        for index, placeholder, literal in zip(self.occurrences, self.placeholders, self.literals[1:]):
+            out.append(placeholder if filled[index] is None else filled[index])
+            out.append(literal)
+        return "".join(out)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, "slots": [slot.as_dict() for slot in self.slots]}
+
+
+def template_version(source: str) -> str:
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def values_hash(values: Dict[str, Any]) -> str:
+    canonical = json.dumps(values, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32]
+
+
+compiled_templates = LRUCache("compiled_templates", settings.template_compiled_cache_size)
+rendered_templates = LRUCache("rendered_templates", settings.template_render_cache_mb * 1024 * 1024,
+                              lambda rendered: len(rendered) * 2)
+
+
+def compile_template(template_id: int, source: str) -> CompiledTemplate:
+    """The compiled form of a template's HTML, parsing it only when this version is new."""
+    version = template_version(source)
+    compiled = compiled_templates.get((template_id, version))
+    if compiled is None:
+        compiled = CompiledTemplate(source, version)
+        compiled_templates.put((template_id, version), compiled)
+    return compiled
+
+
+def render_template(template_id: int, source: str, values: Dict[str, Any]) -> Tuple[CompiledTemplate, str, str]:
+    """Render a template with `values`; returns (compiled template, values hash, HTML)."""
+    compiled = compile_template(template_id, source)
+    digest = values_hash(values)
+    key = (template_id, compiled.version, digest)
+    rendered = rendered_templates.get(key)
+    if rendered is None:
+        rendered = compiled.render(values)
+        rendered_templates.put(key, rendered)
+    return compiled, digest, rendered
@@ -0,0 +1,243 @@
+"""
+A template week with everything under it, read and written as one tree:
+
+    week -> days -> slots -> staff -> requirements -> groups -> staff
+
+Each node carries its own columns plus a list of children under the key
+named in LEVELS. Reading takes one query per level whatever the size of the
+week. Saving diffs the submitted tree against the stored one and, per level,
+updates changed rows in one executemany, inserts new rows (nodes without an
+id) in another and soft-deletes rows missing from the submission, all in one
+transaction, so a save takes at most five statements per level.
+"""
+from dataclasses import dataclass
+from datetime import date, datetime, time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.orm import Session
+
+from . import roster_models as models
+
+# Columns clients cannot set through the tree
+READ_ONLY = {"id", "active", "date_created", "date_modified", "created_at", "updated_at"}
+
+
+class TreeConflict(Exception):
+    """The week changed while it was being saved; nothing was saved and the client should reload it."""
+
+
+@dataclass(frozen=True)
+class TreeLevel:
+    model: str
+    parent_column: Optional[str]  # foreign key to the level above
+    children: Optional[str]  # key of the child list in a node
+
+    @property
+    def table(self):
+        return getattr(models, self.model)
+
+
+LEVELS = (
+    TreeLevel("TemplateWeek", None, "days"),
+    TreeLevel("TemplateWeekDay", "week_id", "slots"),
+    TreeLevel("TemplateWeekDaySlot", "week_day_id", "staff"),
+    TreeLevel("TemplateWeekDaySlotStaff", "day_slot_id", "requirements"),
+    TreeLevel("TemplateWeekDaySlotStaffRequirement", "slot_staff_id", "groups"),
+    TreeLevel("TemplateWeekDaySlotStaffRequirementGroup", "requirement_id", "staff"),
+    TreeLevel("TemplateWeekDaySlotStaffRequirementGroupStaff", "group_id", None),
+)
+
+
+def _load_levels(db: Session, week_id: int, lock: bool = False) -> List[Dict[int, Dict[str, Any]]]:
+    """Active rows of each level under the week, by id; one query per level."""
+    levels: List[Dict[int, Dict[str, Any]]] = []
+    parent_ids = [week_id]
+    for depth, level in enumerate(LEVELS):
+        Model = level.table
+        key = Model.id if level.parent_column is None else getattr(Model, level.parent_column)
+        query = select(Model.__table__).where(key.in_(parent_ids), Model.active == True).order_by(Model.id)
+        if lock and depth == 0:
+            query = query.with_for_update()
+        rows = {row["id"]: dict(row) for row in db.execute(query).mappings()} if parent_ids else {}
+        levels.append(rows)
+        parent_ids = list(rows)
+    return levels
+
+
+def _assemble(levels: List[Dict[int, Dict[str, Any]]]) -> Dict[str, Any]:
+    for depth in range(len(LEVELS) - 1, -1, -1):
+        level = LEVELS[depth]
+        for row in levels[depth].values():
+            if level.children:
+                row.setdefault(level.children, [])
+            if level.parent_column:
+                parent = levels[depth - 1][row[level.parent_column]]
+                parent.setdefault(LEVELS[depth - 1].children, []).append(row)
+    return next(iter(levels[0].values()))
+
+
+def load_tree(db: Session, week_id: int) -> Optional[Dict[str, Any]]:
+    """The week and all its active descendants as nested dicts, or None if there is no such week."""
+    levels = _load_levels(db, week_id)
+    return _assemble(levels) if levels[0] else None
+
+
+def _writable_columns(level: TreeLevel) -> Dict[str, Any]:
+    return {
+        column.key: column for column in level.table.__table__.columns
+        if column.key not in READ_ONLY and column.key != level.parent_column
+    }
+
+
+def _coerce(column, value):
+    """JSON gives dates and times as ISO strings; compare and store them as the column's type."""
+    if not isinstance(value, str):
+        return value
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return value
+    try:
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type is time:
+            return time.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{column.key} is not a valid {python_type.__name__}: {value!r}") from None
+    return value
+
+
+@dataclass
+class TreeWriteResult:
+    created: int = 0
+    updated: int = 0
+    deleted: int = 0
+
+
+def _diff_level(level: TreeLevel, stored: Dict[int, Dict[str, Any]], nodes: List[Tuple[Any, Optional[int]]]):
+    """
+    Compare one level of the submitted tree with the stored rows.
+
+    Returns the {"id", changed columns} updates, the new rows' values, the
+    ids to soft-delete, and each node with where to find its id once the
+    level is written: ("id", id) for existing rows, ("new", position in the
+    new rows) otherwise.
+    """
+    columns = _writable_columns(level)
+    updates, inserts, placed = [], [], []
+    seen = set()
+    for node, parent_id in nodes:
+        if not isinstance(node, dict):
+            raise ValueError(f"{level.model} entries must be objects")
+        unknown = set(node) - set(columns) - {"id", level.children, level.parent_column} - READ_ONLY
+        if unknown:
+            raise ValueError(f"Unknown fields for {level.model}: {', '.join(sorted(unknown))}")
+        values = {key: _coerce(columns[key], node[key]) for key in columns if key in node}
+        if level.parent_column:
+            values[level.parent_column] = parent_id
+
+        node_id = node.get("id")
+        if node_id is None:
+            placed.append((node, ("new", len(inserts))))
+            inserts.append(values)
+            continue
+        current = stored.get(node_id)
+        if current is None:
+            raise ValueError(f"{level.model} {node_id} is not part of this week")
+        if node_id in seen:
+            raise ValueError(f"{level.model} {node_id} appears more than once")
+        seen.add(node_id)
+        # A changed parent id moves the row within the week
+        changed = {key: value for key, value in values.items() if current.get(key) != value}
+        if changed:
+            updates.append({"id": node_id, **changed})
+        placed.append((node, ("id", node_id)))
+    deleted = [row_id for row_id in stored if row_id not in seen]
+    return updates, inserts, deleted, placed
+
+
+def _insert_level(db: Session, level: TreeLevel, inserts: List[Dict[str, Any]],
+                  stored: Dict[int, Dict[str, Any]]) -> List[int]:
+    """
+    Insert a level's new rows in one executemany and return their ids in order.
+
+    MySQL has no INSERT ... RETURNING, so the ids are read back with one
+    SELECT of the active rows under the same parents that were not there
+    before. Ids of a multi-row insert ascend in row order, so they are
+    matched to the rows per parent by position. The week row is locked, so
+    no other tree save adds rows under these parents meanwhile.
+    """
+    Model = level.table
+    parent_column = getattr(Model, level.parent_column)
+    db.execute(insert(Model), [{**values, "active": True} for values in inserts])
+
+    parent_ids = {values[level.parent_column] for values in inserts}
+    found: Dict[int, List[int]] = {}
+    query = select(Model.id, parent_column).where(
+        parent_column.in_(parent_ids), Model.active == True
+    ).order_by(Model.id)
+    for row_id, parent_id in db.execute(query):
+        if row_id not in stored:
+            found.setdefault(parent_id, []).append(row_id)
+
+    ids = []
+    for values in inserts:
+        siblings = found.get(values[level.parent_column])
+        if not siblings:
+            raise TreeConflict(f"Could not read back the ids of new {level.model} rows; save the week again")
+        ids.append(siblings.pop(0))
+    if any(found.values()):
+        raise TreeConflict(f"{level.model} rows were added concurrently; save the week again")
+    return ids
+
+
+def save_tree(db: Session, week_id: int, tree: Dict[str, Any]) -> Optional[TreeWriteResult]:
+    """
+    Make the stored week match `tree` and commit.
+
+    Nodes with an id update that row (which may move it under another parent
+    in the same week); nodes without one are created; stored rows left out
+    are soft-deleted with their descendants. Returns None if the week does
+    not exist. An invalid tree raises ValueError, and rows added to the week
+    by someone else during the save raise TreeConflict; either way nothing
+    is saved.
+    """
+    if tree.get("id") not in (None, week_id):
+        raise ValueError("Tree id does not match the week")
+
+    try:
+        stored = _load_levels(db, week_id, lock=True)
+        if not stored[0]:
+            db.rollback()
+            return None
+
+        result = TreeWriteResult()
+        nodes: List[Tuple[Any, Optional[int]]] = [({**tree, "id": week_id}, None)]
+        for level, rows in zip(LEVELS, stored):
+            Model = level.table
+            updates, inserts, deleted, placed = _diff_level(level, rows, nodes)
+            if updates:
+                db.execute(update(Model), updates)
+            created = _insert_level(db, level, inserts, rows) if inserts else []
+            if deleted:
+                db.execute(update(Model).where(Model.id.in_(deleted)).values(active=False))
+            result.created += len(created)
+            result.updated += len(updates)
+            result.deleted += len(deleted)
+
+            nodes = []
+            if level.children:
+                for node, (kind, ref) in placed:
+                    children = node.get(level.children) or []
+                    if not isinstance(children, list):
+                        raise ValueError(f"{level.children} of {level.model} must be a list")
+                    node_id = created[ref] if kind == "new" else ref
+                    nodes.extend((child, node_id) for child in children)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return result
@@ -0,0 +1,89 @@
+"""
+INSERT ... ON DUPLICATE KEY UPDATE / ON CONFLICT DO UPDATE for any of the
+databases the app runs on, so a batch of rows is written with one statement
+whether or not they already exist; inserting only the rows that are missing;
+adding deltas to counters with upserts; and replacing a table's rows when a
+derived table is rebuilt.
+"""
+from typing import Any, Callable, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import delete, insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import Session
+
+
+def upsert(db: Session, model, rows: List[Dict[str, Any]], keys: Sequence[str],
+           update: Callable[[Any], Dict[str, Any]]) -> None:
+    """
+    Insert `rows` into `model`'s table; a row whose `keys` (a unique key)
+    already exist updates that row instead. `update(incoming)` returns the
+    {column: value} to set, where `incoming` holds the columns of the row
+    being inserted, e.g.
+
+        upsert(db, Model, rows, ["staff_id", "date"], lambda incoming: {"note": incoming.note})
+
+    Does not commit.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        statement = mysql.insert(model)
+        statement = statement.on_duplicate_key_update(update(statement.inserted))
+    elif dialect in ("postgresql", "sqlite"):
+        statement = (postgresql if dialect == "postgresql" else sqlite).insert(model)
+        statement = statement.on_conflict_do_update(index_elements=list(keys), set_=update(statement.excluded))
+    else:
+        raise NotImplementedError(f"No upsert for the {dialect} dialect")
+    db.execute(statement, rows)
+
+
+def insert_missing(db: Session, model, rows: List[Dict[str, Any]], keys: Sequence[str]) -> None:
+    """
+    Insert the `rows` whose `keys` (a unique key) are not in `model`'s table
+    yet and leave existing rows as they are, with one statement. Does not commit.
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect.name
+    if dialect in ("mysql", "mariadb"):
+        # A no-op assignment rather than INSERT IGNORE, which would also hide other errors
+        statement = mysql.insert(model)
+        key = getattr(model, keys[0])
+        statement = statement.on_duplicate_key_update({key.key: key})
+    elif dialect in ("postgresql", "sqlite"):
+        statement = (postgresql if dialect == "postgresql" else sqlite).insert(model)
+        statement = statement.on_conflict_do_nothing(index_elements=list(keys))
+    else:
+        raise NotImplementedError(f"No insert-or-ignore for the {dialect} dialect")
+    db.execute(statement, rows)
+
+
+def add_deltas(db: Session, model, columns: Sequence[str], column: str, deltas: Dict[Tuple[Hashable, ...], int],
+               keys: Optional[Sequence[str]] = None) -> None:
+    """
+    Add each delta to `column` of the row whose `columns` hold its key, with
+    one upsert; a missing row is inserted with the delta. `keys` is the
+    unique key the upsert matches on, when it is not all of `columns`. Zero
+    deltas are skipped. Does not commit.
+    """
+    rows = [{**dict(zip(columns, key)), column: delta} for key, delta in deltas.items() if delta]
+    counter = getattr(model, column)
+    upsert(db, model, rows, keys or columns,
+           lambda incoming: {column: counter + getattr(incoming, column)})
+
+
+def replace_rows(db: Session, model, rows: List[Dict[str, Any]], batch_size: int = 5000) -> int:
+    """
+    Replace every row of `model`'s table with `rows`, inserted `batch_size`
+    at a time, and commit; on failure nothing changes. Returns the rows written.
+    """
+    try:
+        db.execute(delete(model))
+        for batch in range(0, len(rows), batch_size):
+            db.execute(insert(model), rows[batch:batch + batch_size])
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return len(rows)
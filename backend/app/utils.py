@@ -1,5 +1,5 @@
 from passlib.context import CryptContext
-from . import models
+from . import roster_models as models
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
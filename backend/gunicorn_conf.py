@@ -10,6 +10,7 @@ host = os.getenv("HOST", "0.0.0.0")
 port = os.getenv("PORT", "8000")
 bind_env = os.getenv("BIND", None)
 use_loglevel = os.getenv("LOG_LEVEL", "info")
+preload_app_str = os.getenv("PRELOAD_APP", "true")
 if bind_env:
     use_bind = bind_env
 else:
@@ -30,11 +31,53 @@ workers = web_concurrency
 bind = use_bind
 keepalive = 120
 errorlog = "-"
+# Import the app (and build its reference data) once in the master so workers
+# share it copy-on-write instead of each loading it after fork
+preload_app = preload_app_str.lower() == "true"
+
+
+# Multiprocess metrics: each worker flushes its values to PROMETHEUS_MULTIPROC_DIR
+def on_starting(server):
+    from app.config.config import settings
+    from app.metrics import clear_multiprocess_dir
+
+    # The in-memory live-update broker numbers changes per worker, so clients
+    # would miss other workers' changes and resume from the wrong seq
+    if server.cfg.workers > 1 and settings.realtime_backend == "memory":
+        raise RuntimeError(
+            f"REALTIME_BACKEND=memory supports a single worker, not {server.cfg.workers}; "
+            "set REALTIME_BACKEND=redis or WEB_CONCURRENCY=1"
+        )
+    clear_multiprocess_dir()
+
+
+def child_exit(server, worker):
+    from app.metrics import mark_process_dead
+
+    mark_process_dead(worker.pid)
+
+
+# Preload: warm shared state before workers are forked
+def when_ready(server):
+    if not server.cfg.preload_app:
+        return
+    from app.main import app
+    from app.prefork import warm_up
+
+    warm_up(app)
+
+
+def post_fork(server, worker):
+    from app.prefork import after_fork
+
+    after_fork()
+
 
 # For debugging and testing
 log_data = {
     "loglevel": loglevel,
     "workers": workers,
+    "preload_app": preload_app,
     "bind": bind,
     # Additional, non-gunicorn variables
     "workers_per_core": workers_per_core,
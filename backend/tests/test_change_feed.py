@@ -0,0 +1,142 @@
+"""
+Tests for app.change_feed: deltas from flushes and from bulk statements.
+
+Run from backend/ with `python -m unittest discover tests`.
+"""
+import os
+import unittest
+from datetime import date, datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import Session
+
+from app import change_feed, roster_models
+from app.reference_data import invalidate_reference_data
+from app.roster_expansion import expand_template
+
+
+class RecordingHub:
+    """Stands in for the live-update hub; keeps what would be published."""
+
+    def __init__(self):
+        self.events = []
+
+    def publish_threadsafe(self, *events):
+        self.events.extend(events)
+
+
+hub = RecordingHub()
+change_feed.install_change_feed(hub)
+
+
+class ChangeFeedTest(unittest.TestCase):
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+
+        @event.listens_for(self.engine, "connect")
+        def add_now(connection, _):
+            # The models' server defaults call MySQL's now()
+            connection.create_function("now", 0, lambda: datetime.now().isoformat(" "))
+
+        roster_models.Base.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        self.addCleanup(self.db.close)
+        invalidate_reference_data(broadcast=False)
+        self.addCleanup(invalidate_reference_data, broadcast=False)
+
+        role = roster_models.Role(name="Radiologist")
+        self.location = roster_models.Location(name="CT")
+        user = roster_models.User(email="a@example.com", password="-", institution_id="-")
+        self.db.add_all([role, self.location, user])
+        self.db.flush()
+        self.slot = roster_models.LocationTimeSlot(
+            location_id=self.location.id, start_time="08:00", end_time="16:00", days_of_week="1,2,3,4,5"
+        )
+        self.staff = roster_models.Staff(user_id=user.id, role_id=role.id)
+        self.db.add_all([self.slot, self.staff])
+        self.db.commit()
+        hub.events.clear()
+
+    def deltas(self):
+        return [event.data for event in hub.events]
+
+    def test_flushed_insert_is_published_on_commit(self):
+        leave = roster_models.LeaveRequest(
+            staff_id=self.staff.id, leave_type=roster_models.LeaveType.FORECAST,
+            start_date=datetime(2026, 11, 2), end_date=datetime(2026, 11, 6)
+        )
+        self.db.add(leave)
+        self.db.flush()
+        self.assertEqual(hub.events, [])
+        self.db.commit()
+
+        [delta] = self.deltas()
+        self.assertEqual((delta["entity"], delta["op"], delta["id"]), ("leave_request", "insert", leave.id))
+        self.assertEqual(hub.events[0].staff_id, self.staff.id)
+
+    def test_bulk_update_is_published_when_queued(self):
+        leave = roster_models.LeaveRequest(
+            staff_id=self.staff.id, leave_type=roster_models.LeaveType.FORECAST,
+            start_date=datetime(2026, 11, 2), end_date=datetime(2026, 11, 6)
+        )
+        self.db.add(leave)
+        self.db.commit()
+        hub.events.clear()
+
+        Leave = roster_models.LeaveRequest
+        self.db.execute(update(Leave).where(Leave.id == leave.id).values(status="approved"))
+        change_feed.row_changed(self.db, "leave_requests", "update",
+                                {"id": leave.id, "staff_id": self.staff.id,
+                                 "start_date": leave.start_date, "end_date": leave.end_date},
+                                {"status": "approved"})
+        self.db.commit()
+
+        self.assertEqual(self.deltas(), [
+            {"entity": "leave_request", "op": "update", "id": leave.id, "changes": {"status": "approved"}}
+        ])
+        self.assertEqual(hub.events[0].start_date, date(2026, 11, 2))
+
+    def test_soft_delete_is_sent_as_delete(self):
+        change_feed.row_changed(self.db, "staff_availability", "update",
+                                {"id": 3, "staff_id": self.staff.id, "date": date(2026, 11, 2)}, {"active": False})
+        self.db.commit()
+
+        self.assertEqual(self.deltas(), [{"entity": "staff_availability", "op": "delete", "id": 3}])
+
+    def test_queued_changes_are_dropped_on_rollback(self):
+        change_feed.rows_changed(self.db, "roster_assignments", date(2026, 11, 2), date(2026, 11, 8),
+                                 location_id=self.location.id)
+        self.db.rollback()
+        self.db.commit()
+
+        self.assertEqual(hub.events, [])
+
+    def test_expansion_asks_the_location_and_staff_member_to_reload(self):
+        template = roster_models.Template(name="CT rota", template_text="-")
+        self.db.add(template)
+        self.db.flush()
+        week = roster_models.TemplateWeek(template_id=template.id)
+        self.db.add(week)
+        self.db.flush()
+        day = roster_models.TemplateWeekDay(week_id=week.id, day_of_week=1)
+        self.db.add(day)
+        self.db.flush()
+        day_slot = roster_models.TemplateWeekDaySlot(
+            week_day_id=day.id, location_id=self.location.id, time_slot_id=self.slot.id
+        )
+        self.db.add(day_slot)
+        self.db.flush()
+        self.db.add(roster_models.TemplateWeekDaySlotStaff(day_slot_id=day_slot.id, staff_id=self.staff.id))
+        self.db.commit()
+        hub.events.clear()
+
+        expand_template(self.db, template.id, date(2026, 11, 2), date(2026, 11, 29))
+
+        [reload] = hub.events
+        self.assertEqual(reload.data["op"], "bulk")
+        self.assertEqual((reload.location_id, reload.staff_id), (self.location.id, self.staff.id))
+        self.assertEqual((reload.start_date, reload.end_date), (date(2026, 11, 2), date(2026, 11, 29)))
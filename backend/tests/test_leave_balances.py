@@ -0,0 +1,88 @@
+"""
+Tests for app.leave_balances against the roster tables.
+
+Run from backend/ with `python -m unittest discover tests`.
+"""
+import os
+import unittest
+from datetime import date, datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app import leave_balances, roster_models
+from app.config.config import settings
+from app.leave_overlap import leave_snapshot
+
+
+class LeaveBalancesTest(unittest.TestCase):
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+
+        @event.listens_for(self.engine, "connect")
+        def add_now(connection, _):
+            # The models' server defaults call MySQL's now()
+            connection.create_function("now", 0, lambda: datetime.now().isoformat(" "))
+
+        roster_models.Base.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        self.addCleanup(self.db.close)
+
+        role = roster_models.Role(name="Radiologist")
+        user = roster_models.User(email="a@example.com", password="-", institution_id="-")
+        self.db.add_all([role, user])
+        self.db.flush()
+        self.staff = roster_models.Staff(user_id=user.id, role_id=role.id, fte_clinical=0.8, fte_research=0.2)
+        self.db.add(self.staff)
+        self.db.commit()
+
+    def leave(self, start, end, leave_type=roster_models.LeaveType.FORECAST, status="approved"):
+        leave = roster_models.LeaveRequest(
+            staff_id=self.staff.id, leave_type=leave_type, status=status,
+            start_date=datetime.combine(start, datetime.min.time()),
+            end_date=datetime.combine(end, datetime.min.time()),
+        )
+        self.db.add(leave)
+        self.db.flush()
+        leave_balances.leave_changed(self.db, None, leave_snapshot(leave))
+        self.db.commit()
+        return leave
+
+    def totals(self):
+        Balance = roster_models.LeaveBalance
+        return sorted(self.db.execute(select(Balance.year, Balance.leave_type, Balance.days_used)
+                                      .where(Balance.days_used != 0)).all())
+
+    def test_remaining_is_what_has_accrued_less_what_was_taken(self):
+        self.leave(date(2026, 3, 2), date(2026, 3, 6))
+        self.leave(date(2026, 4, 1), date(2026, 4, 1), status="pending")
+        [balance] = leave_balances.balances(self.db, 2026, as_of=date(2026, 7, 1))
+        yearly = settings.leave_entitlement_days
+        earned = yearly * 182 / 365
+        self.assertEqual(balance["entitlement"], round(yearly, 2))
+        self.assertEqual(balance["accrued"], round(earned, 2))
+        self.assertEqual(balance["used"], 5)
+        self.assertEqual(balance["remaining"], round(earned - 5, 2))
+
+    def test_leave_across_new_year_counts_towards_both_years(self):
+        self.leave(date(2025, 12, 30), date(2026, 1, 2), leave_type=roster_models.LeaveType.URGENT)
+        self.assertEqual(self.totals(), [(2025, "urgent", 2), (2026, "urgent", 2)])
+
+    def test_changes_move_the_totals_the_way_a_rebuild_counts_them(self):
+        leave = self.leave(date(2026, 3, 2), date(2026, 3, 6))
+        self.leave(date(2026, 5, 4), date(2026, 5, 5), leave_type=roster_models.LeaveType.NON_URGENT)
+        before = leave_snapshot(leave)
+        leave.end_date = datetime(2026, 3, 3)
+        leave_balances.leave_changed(self.db, before, leave_snapshot(leave))
+        self.db.commit()
+        counted = self.totals()
+        self.assertEqual(counted, [(2026, "forecast", 2), (2026, "non_urgent", 2)])
+        leave_balances.rebuild(self.db)
+        self.assertEqual(self.totals(), counted)
+
+
+if __name__ == "__main__":
+    unittest.main()
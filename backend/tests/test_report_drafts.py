@@ -0,0 +1,193 @@
+"""
+Tests for app.report_drafts: edits, diffs and replaying revisions.
+
+Run from backend/ with `python -m unittest discover tests`.
+"""
+import json
+import os
+import unittest
+from datetime import datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app import report_drafts, roster_models
+from app.report_drafts import DraftConflict, SNAPSHOT_INTERVAL, apply_edits, diff
+
+
+class ApplyEditsTest(unittest.TestCase):
+    def test_positions_count_in_the_text_left_by_earlier_edits(self):
+        self.assertEqual(apply_edits("abcdef", [(0, 1, "XY"), (3, 2, "")]), "XYbef")
+
+    def test_insert_delete_and_replace(self):
+        self.assertEqual(apply_edits("nodule", [(0, 0, "calcified ")]), "calcified nodule")
+        self.assertEqual(apply_edits("right lobe", [(0, 6, "")]), "lobe")
+        self.assertEqual(apply_edits("3 mm", [(0, 1, "4")]), "4 mm")
+
+    def test_edit_outside_the_text_is_rejected(self):
+        for edit in [(-1, 0, "x"), (0, -1, ""), (3, 2, ""), (5, 0, "x")]:
+            with self.subTest(edit=edit), self.assertRaises(ValueError):
+                apply_edits("abcd", [edit])
+
+    def test_too_many_edits_are_rejected(self):
+        with self.assertRaises(ValueError):
+            apply_edits("", [(0, 0, "a")] * (report_drafts.MAX_EDITS + 1))
+
+
+class DiffTest(unittest.TestCase):
+    def test_same_text_has_no_edits(self):
+        self.assertEqual(diff("same", "same"), [])
+
+    def test_one_edit_between_common_prefix_and_suffix(self):
+        self.assertEqual(diff("the left lobe", "the right lobe"), [(4, 3, "righ")])
+
+    def test_prefix_and_suffix_do_not_overlap(self):
+        # "aa" -> "aaa": the prefix takes both characters, so the suffix must not count them again
+        self.assertEqual(diff("aa", "aaa"), [(2, 0, "a")])
+        self.assertEqual(diff("aaa", "aa"), [(2, 1, "")])
+
+    def test_applying_the_diff_gives_the_new_text(self):
+        pairs = [("", "new"), ("old", ""), ("abc", "xyz"), ("nodule 3 mm", "nodule 4 mm"), ("abab", "ab")]
+        for old, new in pairs:
+            with self.subTest(old=old, new=new):
+                self.assertEqual(apply_edits(old, diff(old, new)), new)
+
+
+class RevisionLogTest(unittest.TestCase):
+    """save() and load_version() against the report tables in an in-memory database."""
+
+    REPORT = 1
+    AUTHOR = 5
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+
+        @event.listens_for(self.engine, "connect")
+        def add_now(connection, _):
+            # The models' server defaults call MySQL's now()
+            connection.create_function("now", 0, lambda: datetime.now().isoformat(" "))
+
+        tables = roster_models.Base.metadata.tables
+        roster_models.Base.metadata.create_all(self.engine, tables=[
+            tables["users"], tables["templates"], tables["reports"], tables["report_revisions"],
+        ])
+        self.db = Session(self.engine)
+        self.addCleanup(self.db.close)
+        self.db.add(roster_models.User(id=self.AUTHOR, email="author@example.com", password="-", institution_id="-"))
+        # The report's saved text is version 0
+        self.db.add(roster_models.Report(id=self.REPORT, report_by=self.AUTHOR, report_data=""))
+        self.db.commit()
+        report_drafts.draft_texts.clear()
+        self.addCleanup(report_drafts.draft_texts.clear)
+
+    def set_report_text(self, text):
+        self.db.get(roster_models.Report, self.REPORT).report_data = text
+        self.db.commit()
+
+    def save(self, base_version, **kwargs):
+        return report_drafts.save(self.db, self.REPORT, base_version, self.AUTHOR, **kwargs)
+
+    def stored(self, version):
+        Revision = roster_models.ReportRevision
+        return self.db.execute(
+            select(Revision.kind, Revision.data).where(Revision.report_id == self.REPORT, Revision.version == version)
+        ).one()
+
+    def load(self, version=None):
+        """Read a version from the table rather than the in-memory cache."""
+        report_drafts.draft_texts.clear()
+        return report_drafts.load_version(self.db, self.REPORT, version)
+
+    def test_first_revision_is_a_snapshot_and_small_edits_are_patches(self):
+        self.save(0, text="Thyroid: right lobe 40 mm, left lobe 38 mm.")
+        self.save(1, edits=[[21, 1, "2"]])
+        self.assertEqual(self.stored(1).kind, "snapshot")
+        self.assertEqual(self.stored(2), ("patch", '[[21,1,"2"]]'))
+        self.assertEqual(self.load().text, "Thyroid: right lobe 42 mm, left lobe 38 mm.")
+
+    def test_edit_replacing_most_of_the_text_is_a_snapshot(self):
+        self.save(0, text="Thyroid: right lobe 40 mm.")
+        draft = self.save(1, text="Normal study.")
+        self.assertEqual(self.stored(2).kind, "snapshot")
+        self.assertEqual(draft.snapshot_version, 2)
+
+    def test_spanning_edit_replaces_larger_client_edits(self):
+        self.save(0, text="Thyroid: right lobe 40 mm, left lobe 38 mm.")
+        # Deleting and retyping a word costs more than the single edit that changes one digit
+        self.save(1, edits=[[20, 5, ""], [20, 0, "41 mm"]])
+        self.assertEqual(json.loads(self.stored(2).data), [[21, 1, "1"]])
+        self.assertEqual(self.load().text, "Thyroid: right lobe 41 mm, left lobe 38 mm.")
+
+    def test_client_edits_kept_when_smaller_than_the_spanning_edit(self):
+        base = "a" + "x" * 40 + "b"
+        self.save(0, text=base)
+        # Two one-character changes far apart; the spanning edit would rewrite everything between them
+        edits = [[0, 1, "A"], [41, 1, "B"]]
+        self.save(1, edits=edits)
+        self.assertEqual(json.loads(self.stored(2).data), edits)
+        self.assertEqual(self.load().text, "A" + "x" * 40 + "B")
+
+    def test_every_snapshot_interval_versions_is_a_snapshot(self):
+        text = "Findings: " + "normal. " * 20
+        self.save(0, text=text)
+        expected = {1: text}
+        for version in range(2, 2 * SNAPSHOT_INTERVAL + 3):
+            text = text + str(version % 10)
+            self.save(version - 1, text=text)
+            expected[version] = text
+
+        snapshots = [version for version in expected if self.stored(version).kind == "snapshot"]
+        self.assertEqual(snapshots, [1, 1 + SNAPSHOT_INTERVAL, 1 + 2 * SNAPSHOT_INTERVAL])
+        # Versions either side of each snapshot replay to the text that was saved
+        for version in [SNAPSHOT_INTERVAL, SNAPSHOT_INTERVAL + 1, SNAPSHOT_INTERVAL + 2,
+                        2 * SNAPSHOT_INTERVAL, 2 * SNAPSHOT_INTERVAL + 1, 2 * SNAPSHOT_INTERVAL + 2]:
+            with self.subTest(version=version):
+                draft = self.load(version)
+                self.assertEqual(draft.text, expected[version])
+                self.assertEqual(draft.snapshot_version, 1 + (version - 1) // SNAPSHOT_INTERVAL * SNAPSHOT_INTERVAL)
+
+    def test_first_save_applies_edits_to_the_saved_report_text(self):
+        self.set_report_text("Normal study.")
+        self.assertEqual(self.load(0).text, "Normal study.")
+        self.save(0, edits=[[13, 0, " No nodules."]])
+        self.assertEqual(self.load().text, "Normal study. No nodules.")
+
+    def test_finalise_writes_the_draft_into_the_report(self):
+        self.save(0, text="Normal study.")
+        self.save(1, text="Normal study. No nodules.")
+        report = self.db.get(roster_models.Report, self.REPORT)
+        report_drafts.finalise(self.db, report, 2)
+        self.db.commit()
+        self.db.expire_all()
+        self.assertEqual(self.db.get(roster_models.Report, self.REPORT).report_data, "Normal study. No nodules.")
+
+    def test_missing_version_is_none(self):
+        self.save(0, text="Normal study.")
+        self.assertIsNone(self.load(5))
+
+    def test_save_on_a_stale_version_conflicts(self):
+        self.save(0, text="Normal study.")
+        self.save(1, text="Normal study. No nodules.")
+        with self.assertRaises(DraftConflict) as raised:
+            self.save(1, text="Normal study. Small nodule.")
+        self.assertEqual(raised.exception.version, 2)
+
+    def test_unchanged_save_on_a_stale_version_conflicts(self):
+        self.save(0, text="Normal study.")
+        self.save(1, text="Normal study. No nodules.")
+        with self.assertRaises(DraftConflict) as raised:
+            self.save(1, text="Normal study.")
+        self.assertEqual(raised.exception.version, 2)
+
+    def test_unchanged_save_on_the_latest_version_returns_it(self):
+        self.save(0, text="Normal study.")
+        draft = self.save(1, edits=[])
+        self.assertEqual((draft.version, draft.text), (1, "Normal study."))
+        self.assertEqual(report_drafts.latest_version(self.db, self.REPORT), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
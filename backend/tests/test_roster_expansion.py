@@ -0,0 +1,99 @@
+"""
+Tests for app.roster_expansion against the roster and template week tables.
+
+Run from backend/ with `python -m unittest discover tests`.
+"""
+import os
+import unittest
+from datetime import date, datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app import roster_models, slot_coverage
+from app.reference_data import invalidate_reference_data
+from app.roster_expansion import expand_template
+
+NOV = lambda day: date(2026, 11, day)
+
+
+class ExpandTemplateTest(unittest.TestCase):
+    """A two-week rotation with one staffed Monday slot in the first week."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+
+        @event.listens_for(self.engine, "connect")
+        def add_now(connection, _):
+            # The models' server defaults call MySQL's now()
+            connection.create_function("now", 0, lambda: datetime.now().isoformat(" "))
+
+        roster_models.Base.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        self.addCleanup(self.db.close)
+        invalidate_reference_data(broadcast=False)
+        self.addCleanup(invalidate_reference_data, broadcast=False)
+
+        role = roster_models.Role(name="Radiologist")
+        location = roster_models.Location(name="CT")
+        user = roster_models.User(email="a@example.com", password="-", institution_id="-")
+        self.template = roster_models.Template(name="CT rota", template_text="-")
+        self.db.add_all([role, location, user, self.template])
+        self.db.flush()
+        slot = roster_models.LocationTimeSlot(
+            location_id=location.id, start_time="08:00", end_time="16:00", days_of_week="1,2,3,4,5"
+        )
+        self.staff = roster_models.Staff(user_id=user.id, role_id=role.id)
+        first = roster_models.TemplateWeek(template_id=self.template.id, name="Week 1")
+        second = roster_models.TemplateWeek(template_id=self.template.id, name="Week 2")
+        self.db.add_all([slot, self.staff, first, second])
+        self.db.flush()
+        monday = roster_models.TemplateWeekDay(week_id=first.id, day_of_week=1)
+        self.db.add(monday)
+        self.db.flush()
+        day_slot = roster_models.TemplateWeekDaySlot(
+            week_day_id=monday.id, location_id=location.id, time_slot_id=slot.id
+        )
+        self.db.add(day_slot)
+        self.db.flush()
+        self.db.add(roster_models.TemplateWeekDaySlotStaff(day_slot_id=day_slot.id, staff_id=self.staff.id))
+        self.db.commit()
+
+    def assigned_days(self):
+        RA = roster_models.RosterAssignment
+        rows = self.db.scalars(select(RA.date).where(RA.active == True).order_by(RA.date))
+        return [day.date() for day in rows]
+
+    def test_rotation_skips_every_other_week_and_holidays(self):
+        result = expand_template(self.db, self.template.id, NOV(2), NOV(30), holidays=[NOV(16)])
+
+        self.assertEqual(result.weeks, 2)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.skipped_holiday, 1)
+        self.assertEqual(self.assigned_days(), [NOV(2), NOV(30)])
+
+    def test_expanding_twice_adds_nothing(self):
+        expand_template(self.db, self.template.id, NOV(2), NOV(30))
+        again = expand_template(self.db, self.template.id, NOV(2), NOV(30))
+
+        self.assertEqual((again.created, again.existing), (0, 3))
+        self.assertEqual(len(self.assigned_days()), 3)
+
+    def test_dry_run_writes_nothing(self):
+        result = expand_template(self.db, self.template.id, NOV(2), NOV(30), dry_run=True)
+
+        self.assertEqual(result.created, 3)
+        self.assertEqual(self.assigned_days(), [])
+
+    def test_expansion_counts_towards_slot_coverage(self):
+        expand_template(self.db, self.template.id, NOV(2), NOV(30))
+        counted = self.db.scalars(select(roster_models.SlotCoverageCount.staffed)).all()
+
+        self.assertEqual(sorted(counted), [1, 1, 1])
+        self.assertEqual(slot_coverage.rebuild(self.db), 3)
+
+    def test_template_without_weeks(self):
+        self.assertIsNone(expand_template(self.db, self.template.id + 1, NOV(2), NOV(30)))
@@ -0,0 +1,151 @@
+"""
+Tests for app.slot_coverage and app.leave_overlap against the roster tables.
+
+Run from backend/ with `python -m unittest discover tests`.
+"""
+import os
+import unittest
+from datetime import date, datetime
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+
+from sqlalchemy import create_engine, event, select
+from sqlalchemy.orm import Session
+
+from app import roster_models, slot_coverage
+from app.leave_overlap import leave_snapshot, overlapping_leave
+from app.reference_data import invalidate_reference_data
+
+NOV = lambda day: date(2026, 11, day)
+
+
+class SlotCoverageTest(unittest.TestCase):
+    """Coverage counts kept by deltas, checked against a rebuild from the same rows."""
+
+    def setUp(self):
+        self.engine = create_engine("sqlite://")
+
+        @event.listens_for(self.engine, "connect")
+        def add_now(connection, _):
+            # The models' server defaults call MySQL's now()
+            connection.create_function("now", 0, lambda: datetime.now().isoformat(" "))
+
+        roster_models.Base.metadata.create_all(self.engine)
+        self.db = Session(self.engine)
+        self.addCleanup(self.db.close)
+        invalidate_reference_data(broadcast=False)
+        self.addCleanup(invalidate_reference_data, broadcast=False)
+
+        role = roster_models.Role(name="Radiologist")
+        self.location = roster_models.Location(name="CT", min_staff_required=2)
+        self.db.add_all([role, self.location])
+        self.db.flush()
+        self.slot = roster_models.LocationTimeSlot(
+            location_id=self.location.id, start_time="08:00", end_time="16:00", days_of_week="1,2,3,4,5"
+        )
+        self.db.add(self.slot)
+        self.staff = []
+        for name in ("a", "b"):
+            user = roster_models.User(email=f"{name}@example.com", password="-", institution_id="-")
+            self.db.add(user)
+            self.db.flush()
+            staff = roster_models.Staff(user_id=user.id, role_id=role.id)
+            self.db.add(staff)
+            self.staff.append(staff)
+        self.db.commit()
+
+    def assign(self, staff, day):
+        """An active assignment, counted the way the roster endpoints count it."""
+        assignment = roster_models.RosterAssignment(
+            staff_id=staff.id, location_id=self.location.id, time_slot_id=self.slot.id,
+            date=datetime.combine(day, datetime.min.time()), fte_contribution=0.1
+        )
+        self.db.add(assignment)
+        self.db.flush()
+        slot_coverage.assignment_changed(self.db, None, slot_coverage.assignment_snapshot(assignment))
+        self.db.commit()
+        return assignment
+
+    def leave(self, staff, start, end, status="approved"):
+        leave = roster_models.LeaveRequest(
+            staff_id=staff.id, leave_type=roster_models.LeaveType.FORECAST,
+            start_date=datetime.combine(start, datetime.min.time()),
+            end_date=datetime.combine(end, datetime.min.time()), status=status
+        )
+        self.db.add(leave)
+        self.db.flush()
+        slot_coverage.leave_changed(self.db, leave.id, None, leave_snapshot(leave))
+        self.db.commit()
+        return leave
+
+    def counts(self):
+        Count = roster_models.SlotCoverageCount
+        return {day: staffed for day, staffed in self.db.execute(select(Count.date, Count.staffed)) if staffed}
+
+    def assert_matches_rebuild(self):
+        counted = self.counts()
+        slot_coverage.rebuild(self.db)
+        self.assertEqual(counted, self.counts())
+
+    def test_assignments_are_counted_except_on_approved_leave(self):
+        a, b = self.staff
+        self.leave(a, NOV(3), NOV(3))
+        for day in (NOV(2), NOV(3), NOV(4)):
+            self.assign(a, day)
+        self.assign(b, NOV(3))
+        self.assertEqual(self.counts(), {NOV(2): 1, NOV(3): 1, NOV(4): 1})
+        self.assert_matches_rebuild()
+
+    def test_approving_and_moving_leave_moves_the_counts(self):
+        a, b = self.staff
+        for day in (NOV(2), NOV(3), NOV(4)):
+            self.assign(a, day)
+            self.assign(b, day)
+        leave = self.leave(a, NOV(2), NOV(2), status="pending")
+        self.assertEqual(self.counts(), {NOV(2): 2, NOV(3): 2, NOV(4): 2})
+
+        before = leave_snapshot(leave)
+        leave.status, leave.end_date = "approved", datetime(2026, 11, 3)
+        slot_coverage.leave_changed(self.db, leave.id, before, leave_snapshot(leave))
+        self.db.commit()
+        self.assertEqual(self.counts(), {NOV(2): 1, NOV(3): 1, NOV(4): 2})
+        self.assert_matches_rebuild()
+
+        before = leave_snapshot(leave)
+        leave.active = False
+        slot_coverage.leave_changed(self.db, leave.id, before, leave_snapshot(leave))
+        self.db.commit()
+        self.assertEqual(self.counts(), {NOV(2): 2, NOV(3): 2, NOV(4): 2})
+        self.assert_matches_rebuild()
+
+    def test_overlapping_leave_reads_open_active_requests(self):
+        a, b = self.staff
+        approved = self.leave(a, NOV(1), NOV(5))
+        pending = self.leave(b, NOV(5), NOV(9), status="pending")
+        self.leave(b, NOV(2), NOV(3), status="rejected")
+        self.leave(a, NOV(20), NOV(21))
+        found = overlapping_leave(self.db, NOV(4), NOV(6))
+        self.assertEqual(sorted(leave.id for leave in found), [approved.id, pending.id])
+        self.assertEqual(found[0].start_date, NOV(1))
+        self.assertEqual([leave.id for leave in overlapping_leave(self.db, NOV(4), NOV(6), ("approved",))],
+                         [approved.id])
+
+    def test_leave_impact_reports_slots_falling_below_the_minimum(self):
+        a, b = self.staff
+        self.assign(a, NOV(2))
+        self.assign(b, NOV(2))
+        self.assign(a, NOV(3))
+        impact = slot_coverage.leave_impact(self.db, a.id, NOV(2), NOV(4))
+        self.assertEqual(impact["assignments"], 2)
+        shortfalls = [(s["date"], s["staffed"], s["staffed_with_leave"]) for s in impact["shortfalls"]]
+        self.assertEqual(shortfalls, [(NOV(2), 2, 1), (NOV(3), 1, 0)])
+
+        # Pending leave of other staff counts only when asked
+        self.leave(b, NOV(2), NOV(2), status="pending")
+        impact = slot_coverage.leave_impact(self.db, a.id, NOV(2), NOV(2), include_pending=True)
+        self.assertEqual(impact["shortfalls"][0]["staffed_with_leave"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+"""Leave and shift overlap indexes
+
+Revision ID: c1a290e901e3
+Revises: 
+Create Date: 2026-10-19 11:08:26.553901
+
+The first revision here: the tables come from Base.metadata.create_all
+(DB_CREATE_ALL), so this only adds the indexes that a database created
+before they were declared on the models does not have yet.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c1a290e901e3'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    ('ix_leaves_overlap', 'leaves', ['approvedStatus', 'endTime', 'startTime', 'radiologistID']),
+    ('ix_leaves_radiologist_dates', 'leaves', ['radiologistID', 'endTime', 'startTime']),
+    ('ix_shifts_location_dates', 'shifts', ['location', 'endTime', 'startTime']),
+]
+
+
+def _existing(table: str) -> set:
+    """Names of the indexes already on `table`; none when only writing SQL (--sql)."""
+    if op.get_context().as_sql:
+        return set()
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade() -> None:
+    for name, table, columns in INDEXES:
+        if name not in _existing(table):
+            op.create_index(name, table, columns, unique=False)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
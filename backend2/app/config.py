@@ -13,6 +13,8 @@ class Settings(BaseSettings):
     DB_PORT: str = os.getenv("DB_PORT", "3306")
     DB_NAME: str = os.getenv("DB_NAME", "roster_monster_db")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./roster_monster.db")
+    # Set to false when the schema is managed by Alembic
+    DB_CREATE_ALL: bool = os.getenv("DB_CREATE_ALL", "true").lower() == "true"
     
     # JWT settings
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
@@ -1,4 +1,4 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
@@ -12,16 +12,22 @@ logger = logging.getLogger(__name__)
 
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL
 
-try:
-    engine = create_engine(SQLALCHEMY_DATABASE_URL)
-    # Test the connection
-    with engine.connect() as connection:
-        logger.info("✅ Database connection established successfully!")
-        logger.info(f"📊 Connected to database: {os.getenv('DB_NAME')}")
-        logger.info(f"🔌 Using host: {os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}")
-except Exception as e:
-    logger.error(f"❌ Failed to connect to database: {str(e)}")
-    raise
+# The engine connects lazily; the first checkout is logged instead of opening
+# a test connection at import time in every worker.
+engine = create_engine(SQLALCHEMY_DATABASE_URL)
+
+
+@event.listens_for(engine, "first_connect")
+def _log_first_connect(dbapi_connection, connection_record):
+    logger.info("✅ Database connection established successfully!")
+    logger.info(f"📊 Connected to database: {os.getenv('DB_NAME')}")
+    logger.info(f"🔌 Using host: {os.getenv('DB_HOST')}:{os.getenv('DB_PORT')}")
+
+
+@event.listens_for(engine, "handle_error")
+def _log_connect_error(context):
+    if context.connection is None:
+        logger.error(f"❌ Failed to connect to database: {context.original_exception}")
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -27,7 +27,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-models.Base.metadata.create_all(bind=engine)
+if settings.DB_CREATE_ALL:
+    models.Base.metadata.create_all(bind=engine)
 
 app = FastAPI(title="Radiology Shift Scheduler")
 
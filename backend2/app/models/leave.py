@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, DateTime, ForeignKey, Text, Boolean, Index
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -13,4 +13,10 @@ class Leave(Base):
     remarks = Column(Text, nullable=True)
     approvedStatus = Column(Boolean, default=False)
     approvedBy = Column(Integer, ForeignKey("users.id"), nullable=True)
-    createDate = Column(DateTime(timezone=True), server_default=func.now()) 
\ No newline at end of file
+    createDate = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (
+        # Overlap lookups read only these entries (see app.services.leave_impact)
+        Index("ix_leaves_overlap", "approvedStatus", "endTime", "startTime", "radiologistID"),
+        Index("ix_leaves_radiologist_dates", "radiologistID", "endTime", "startTime"),
+    ) 
\ No newline at end of file
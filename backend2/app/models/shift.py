@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey, Index
 from sqlalchemy.sql import func
 from .base import Base
 
@@ -11,4 +11,8 @@ class Shift(Base):
     location = Column(Integer, ForeignKey("locations.id"), nullable=False)
     specializationRequired = Column(String(255), nullable=False)
     createDate = Column(DateTime(timezone=True), server_default=func.now())
-    updateDate = Column(DateTime(timezone=True), onupdate=func.now()) 
\ No newline at end of file
+    updateDate = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_shifts_location_dates", "location", "endTime", "startTime"),
+    ) 
\ No newline at end of file
@@ -0,0 +1,89 @@
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, create_model
+from sqlalchemy.orm import Session
+from typing import List, Type
+from app.database import get_db
+from app.services.crud import CRUDBase, MissingRows
+
+MAX_BATCH_SIZE = 1000
+
+
+def crud_router(
+    crud: CRUDBase,
+    *,
+    prefix: str,
+    tags: List[str],
+    schema: Type[BaseModel],
+    create_schema: Type[BaseModel],
+    update_schema: Type[BaseModel],
+    name: str,
+    create_status_code: int = 200,
+) -> APIRouter:
+    """
+    Routes for one resource: the usual per-item endpoints plus /batch
+    create, update and delete, each taking a list and running as one
+    transaction. `name` is used in messages ("Leave not found").
+    """
+    router = APIRouter(prefix=prefix, tags=tags)
+    batch_update_schema = create_model(f"{update_schema.__name__}Batch", __base__=update_schema, id=(int, ...))
+
+    def check_batch(items: list):
+        if len(items) > MAX_BATCH_SIZE:
+            raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} items per batch")
+
+    def not_found(e: MissingRows):
+        return HTTPException(status_code=404, detail=f"{name} not found: {', '.join(map(str, e.ids))}")
+
+    # Registered before /{id} so "batch" is not read as an id
+    @router.post("/batch", response_model=List[schema], status_code=create_status_code)
+    def create_items(items: List[create_schema], db: Session = Depends(get_db)):
+        check_batch(items)
+        return crud.create_many(db, items)
+
+    @router.put("/batch", response_model=List[schema])
+    def update_items(items: List[batch_update_schema], db: Session = Depends(get_db)):
+        check_batch(items)
+        try:
+            return crud.update_many(db, items)
+        except MissingRows as e:
+            raise not_found(e)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    @router.delete("/batch", response_model=List[int])
+    def delete_items(ids: List[int], db: Session = Depends(get_db)):
+        check_batch(ids)
+        try:
+            return crud.delete_many(db, ids)
+        except MissingRows as e:
+            raise not_found(e)
+
+    @router.get("/", response_model=List[schema])
+    def read_items(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+        return crud.get_multi(db, skip=skip, limit=limit)
+
+    @router.get("/{item_id}", response_model=schema)
+    def read_item(item_id: int, db: Session = Depends(get_db)):
+        db_item = crud.get(db, item_id)
+        if db_item is None:
+            raise HTTPException(status_code=404, detail=f"{name} not found")
+        return db_item
+
+    @router.post("/", response_model=schema, status_code=create_status_code)
+    def create_item(item: create_schema, db: Session = Depends(get_db)):
+        return crud.create(db, item)
+
+    @router.put("/{item_id}", response_model=schema)
+    def update_item(item_id: int, item: update_schema, db: Session = Depends(get_db)):
+        db_item = crud.update(db, item_id, item)
+        if db_item is None:
+            raise HTTPException(status_code=404, detail=f"{name} not found")
+        return db_item
+
+    @router.delete("/{item_id}")
+    def delete_item(item_id: int, db: Session = Depends(get_db)):
+        if not crud.delete(db, item_id):
+            raise HTTPException(status_code=404, detail=f"{name} not found")
+        return {"message": f"{name} deleted successfully"}
+
+    return router
@@ -1,47 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import List
 from app.database import get_db
-from app.schemas.leave import Leave, LeaveCreate, LeaveUpdate
-from app.services.leave_crud import (
-    get_leave,
-    get_leaves,
-    create_leave,
-    update_leave,
-    delete_leave
-)
+from app.routers.crud import crud_router
+from app.schemas.leave import Leave, LeaveCreate, LeaveUpdate, LeaveImpact, LeaveImpactRequest
+from app.services.leave_crud import leaves, get_leave
+from app.services.leave_impact import leave_impact
 
-router = APIRouter(
+router = crud_router(
+    leaves,
     prefix="/api/leaves",
-    tags=["leaves"]
+    tags=["leaves"],
+    schema=Leave,
+    create_schema=LeaveCreate,
+    update_schema=LeaveUpdate,
+    name="Leave",
 )
 
-@router.get("/", response_model=List[Leave])
-def read_leaves(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    leaves = get_leaves(db, skip=skip, limit=limit)
-    return leaves
 
-@router.get("/{leave_id}", response_model=Leave)
-def read_leave(leave_id: int, db: Session = Depends(get_db)):
-    db_leave = get_leave(db, leave_id=leave_id)
-    if db_leave is None:
-        raise HTTPException(status_code=404, detail="Leave not found")
-    return db_leave
+def _impact(db: Session, user_id: int, start, end, leave_id=None, include_pending: bool = False):
+    try:
+        return leave_impact(db, user_id, start, end, leave_id=leave_id, include_pending=include_pending)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-@router.post("/", response_model=Leave)
-def create_leave_route(leave: LeaveCreate, db: Session = Depends(get_db)):
-    return create_leave(db=db, leave=leave)
 
-@router.put("/{leave_id}", response_model=Leave)
-def update_leave_route(leave_id: int, leave: LeaveUpdate, db: Session = Depends(get_db)):
-    db_leave = update_leave(db=db, leave_id=leave_id, leave=leave)
-    if db_leave is None:
-        raise HTTPException(status_code=404, detail="Leave not found")
-    return db_leave
+@router.post("/impact", response_model=LeaveImpact)
+def preview_leave_impact(request: LeaveImpactRequest, db: Session = Depends(get_db)):
+    """The shifts that would drop below their location's minimum staff if this leave were approved."""
+    return _impact(db, request.radiologistID, request.startTime, request.endTime,
+                   request.leaveId, request.includePending)
+
 
-@router.delete("/{leave_id}")
-def delete_leave_route(leave_id: int, db: Session = Depends(get_db)):
-    success = delete_leave(db=db, leave_id=leave_id)
-    if not success:
+@router.get("/{leave_id}/impact", response_model=LeaveImpact)
+def get_leave_impact(leave_id: int, include_pending: bool = False, db: Session = Depends(get_db)):
+    """The shifts approving this leave would take below their location's minimum staff."""
+    db_leave = get_leave(db, leave_id)
+    if db_leave is None:
         raise HTTPException(status_code=404, detail="Leave not found")
-    return {"message": "Leave deleted successfully"} 
\ No newline at end of file
+    return _impact(db, db_leave.radiologistID, db_leave.startTime, db_leave.endTime, leave_id, include_pending)
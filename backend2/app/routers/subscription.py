@@ -1,7 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
 from typing import Optional
-import razorpay
 from datetime import datetime
 from ..database import get_db
 from sqlalchemy.orm import Session
@@ -10,11 +9,19 @@ from .auth import get_current_user
 from ..config import settings
 
 router = APIRouter(prefix="/api/subscriptions", tags=["subscriptions"])
-print(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-# Initialize Razorpay client
-client = razorpay.Client(
-    auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
-)
+
+# The Razorpay SDK is imported and the client created on first use so it
+# does not slow down application startup.
+_razorpay_client = None
+
+def get_razorpay_client():
+    global _razorpay_client
+    if _razorpay_client is None:
+        import razorpay
+        _razorpay_client = razorpay.Client(
+            auth=(settings.RAZORPAY_KEY_ID, settings.RAZORPAY_KEY_SECRET)
+        )
+    return _razorpay_client
 
 class CreateOrderRequest(BaseModel):
     planId: str
@@ -46,7 +53,7 @@ async def create_order(
             }
         }
         
-        order = client.order.create(data=order_data)
+        order = get_razorpay_client().order.create(data=order_data)
         
         # Create subscription record in database
         subscription = Subscription(
@@ -77,6 +84,8 @@ async def verify_payment(
     current_user: User = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
+    import razorpay
+
     try:
         # Verify payment signature
         params_dict = {
@@ -85,7 +94,7 @@ async def verify_payment(
             "razorpay_signature": request.signature
         }
         
-        client.utility.verify_payment_signature(params_dict)
+        get_razorpay_client().utility.verify_payment_signature(params_dict)
         
         # Update subscription status
         subscription = db.query(Subscription).filter(
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 from .base import BaseSchema
 
 class LeaveBase(BaseSchema):
@@ -23,4 +23,30 @@ class LeaveUpdate(LeaveBase):
 
 class Leave(LeaveBase):
     id: int
-    updateDate: Optional[datetime] = None 
\ No newline at end of file
+    updateDate: Optional[datetime] = None
+
+class LeaveImpactRequest(BaseSchema):
+    radiologistID: int
+    startTime: datetime
+    endTime: datetime
+    leaveId: Optional[int] = None  # the leave being previewed, if it exists
+    includePending: bool = False  # treat other unapproved leave as approved
+
+class LeaveImpactShift(BaseSchema):
+    shiftId: int
+    location: int
+    locationName: str
+    startTime: datetime
+    endTime: datetime
+    specializationRequired: str
+    minStaffCount: int
+    available: int  # without this leave
+    availableWithLeave: int
+
+class LeaveImpact(BaseSchema):
+    radiologistID: int
+    startTime: datetime
+    endTime: datetime
+    includePending: bool
+    shifts: int  # shifts the radiologist could cover in the period
+    shortfalls: List[LeaveImpactShift] 
\ No newline at end of file
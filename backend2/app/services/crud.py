@@ -0,0 +1,122 @@
+from typing import Any, Dict, Generic, List, Optional, Sequence, Type, TypeVar
+
+from pydantic import BaseModel
+from sqlalchemy import delete, insert, update
+from sqlalchemy.orm import Session
+
+ModelType = TypeVar("ModelType")
+
+
+class MissingRows(LookupError):
+    def __init__(self, ids: Sequence[int]):
+        super().__init__(f"Not found: {', '.join(map(str, ids))}")
+        self.ids = list(ids)
+
+
+class CRUDBase(Generic[ModelType]):
+    """
+    Create/read/update/delete for a model with an integer `id`.
+
+    The *_many methods handle a whole list in one transaction, with one
+    statement per operation where the database allows: INSERT ... RETURNING
+    when the dialect returns ids in input order (PostgreSQL, MariaDB; row by
+    row elsewhere), an executemany UPDATE by primary key, and
+    DELETE ... WHERE id IN. They raise MissingRows, changing nothing, if
+    any id does not exist.
+    """
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    def get(self, db: Session, id: int) -> Optional[ModelType]:
+        return db.query(self.model).filter(self.model.id == id).first()
+
+    def get_multi(self, db: Session, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        return db.query(self.model).offset(skip).limit(limit).all()
+
+    def create(self, db: Session, obj_in: BaseModel) -> ModelType:
+        db_obj = self.model(**obj_in.dict())
+        db.add(db_obj)
+        db.commit()
+        db.refresh(db_obj)
+        return db_obj
+
+    def update(self, db: Session, id: int, obj_in: BaseModel) -> Optional[ModelType]:
+        db_obj = self.get(db, id)
+        if db_obj:
+            for key, value in obj_in.dict(exclude_unset=True).items():
+                setattr(db_obj, key, value)
+            db.commit()
+            db.refresh(db_obj)
+        return db_obj
+
+    def delete(self, db: Session, id: int) -> bool:
+        db_obj = self.get(db, id)
+        if db_obj:
+            db.delete(db_obj)
+            db.commit()
+            return True
+        return False
+
+    def _load(self, db: Session, ids: Sequence[int]) -> List[ModelType]:
+        found = {obj.id: obj for obj in db.query(self.model).filter(self.model.id.in_(ids))}
+        return [found[id] for id in ids if id in found]
+
+    def _check_exist(self, db: Session, ids: Sequence[int]) -> None:
+        found = {id for (id,) in db.query(self.model.id).filter(self.model.id.in_(ids))}
+        missing = [id for id in ids if id not in found]
+        if missing:
+            raise MissingRows(missing)
+
+    def create_many(self, db: Session, objs_in: List[BaseModel]) -> List[ModelType]:
+        rows = [obj_in.dict() for obj_in in objs_in]
+        if not rows:
+            return []
+        try:
+            if db.get_bind().dialect.insert_executemany_returning:
+                ids = list(db.scalars(insert(self.model).returning(self.model.id, sort_by_parameter_order=True), rows))
+            else:
+                db_objs = [self.model(**row) for row in rows]
+                db.add_all(db_objs)
+                db.flush()
+                ids = [db_obj.id for db_obj in db_objs]
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return self._load(db, ids)
+
+    def update_many(self, db: Session, objs_in: List[BaseModel]) -> List[ModelType]:
+        """Each item carries its `id` and the fields to change."""
+        rows: List[Dict[str, Any]] = [obj_in.dict(exclude_unset=True) for obj_in in objs_in]
+        ids = [row["id"] for row in rows]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Each id may appear only once in a batch")
+        if not rows:
+            return []
+        try:
+            self._check_exist(db, ids)
+            changed = [row for row in rows if len(row) > 1]
+            if changed:
+                db.execute(update(self.model), changed)
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return self._load(db, ids)
+
+    def delete_many(self, db: Session, ids: List[int]) -> List[int]:
+        ids = list(dict.fromkeys(ids))
+        if not ids:
+            return []
+        try:
+            self._check_exist(db, ids)
+            db.execute(
+                delete(self.model).where(self.model.id.in_(ids))
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+        except BaseException:
+            db.rollback()
+            raise
+        return ids
@@ -0,0 +1,122 @@
+"""
+Overlap lookups over leave, and the shifts a leave would leave short.
+
+A leave overlaps a period when startTime < period end and endTime > period
+start, and an index can range-scan only one of the two bounds.
+ix_leaves_overlap is (approvedStatus, endTime, startTime, radiologistID): the
+end bound is the range scan, and the start test and the radiologist are read
+from the same index entries, so only leave still running at the period start
+is scanned rather than the whole history, and the table is not read. Leave
+that is not approved counts as pending.
+
+A shift can be covered by the radiologists attached to its location
+(UserAttributes.locationId) with its required specialization. The preview
+counts those not on approved leave during the shift, with and without the
+proposed leave, against the location's minStaffCount.
+"""
+import re
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Set
+
+from sqlalchemy.orm import Session
+
+from app.models.leave import Leave
+from app.models.location import Location
+from app.models.shift import Shift
+from app.models.user import UserAttributes
+
+
+def overlapping_leaves(db: Session, start: datetime, end: datetime, approved: Optional[bool] = None,
+                       user_ids: Optional[Iterable[int]] = None, exclude_id: Optional[int] = None) -> list:
+    """(id, radiologistID, startTime, endTime, approvedStatus) of the leave overlapping `start` to `end`."""
+    query = db.query(Leave.id, Leave.radiologistID, Leave.startTime, Leave.endTime, Leave.approvedStatus).filter(
+        Leave.endTime > start,
+        Leave.startTime < end,
+    )
+    if approved is not None:
+        query = query.filter(Leave.approvedStatus == approved)
+    if user_ids is not None:
+        query = query.filter(Leave.radiologistID.in_(list(user_ids)))
+    if exclude_id is not None:
+        query = query.filter(Leave.id != exclude_id)
+    return query.all()
+
+
+def _specializations(text: Optional[str]) -> Set[str]:
+    return {part.strip().lower() for part in re.split(r"[,;]", text or "") if part.strip()}
+
+
+def _off(leaves: list, start: datetime, end: datetime) -> bool:
+    return any(leave.startTime < end and leave.endTime > start for leave in leaves)
+
+
+def leave_impact(db: Session, user_id: int, start: datetime, end: datetime,
+                 leave_id: Optional[int] = None, include_pending: bool = False) -> dict:
+    """
+    The shifts that would fall below their location's minStaffCount if
+    `user_id` were on leave from `start` to `end`. `leave_id` is the leave
+    being previewed, if it exists, and is left out of the current leave;
+    with `include_pending`, other leave not yet approved counts as approved.
+    """
+    if end <= start:
+        raise ValueError("endTime must be after startTime")
+    result = {
+        "radiologistID": user_id, "startTime": start, "endTime": end,
+        "includePending": include_pending, "shifts": 0, "shortfalls": [],
+    }
+    own = defaultdict(set)  # location -> the radiologist's specializations there
+    for location_id, specializations in db.query(UserAttributes.locationId, UserAttributes.specializations).filter(
+        UserAttributes.userId == user_id, UserAttributes.locationId.isnot(None)
+    ):
+        own[location_id] |= _specializations(specializations)
+    shifts = [
+        shift for shift in db.query(Shift).filter(
+            Shift.location.in_(list(own)), Shift.endTime > start, Shift.startTime < end,
+        ).order_by(Shift.startTime, Shift.id)
+        if shift.specializationRequired.strip().lower() in own[shift.location]
+    ] if own else []
+    if not shifts:
+        return result
+
+    # Everyone who could cover these shifts, with their leave over the shifts' span
+    pool: Dict[int, Dict[int, Set[str]]] = defaultdict(lambda: defaultdict(set))  # location -> user -> specializations
+    for other_id, location_id, specializations in db.query(
+        UserAttributes.userId, UserAttributes.locationId, UserAttributes.specializations
+    ).filter(UserAttributes.locationId.in_({shift.location for shift in shifts})):
+        pool[location_id][other_id] |= _specializations(specializations)
+    user_ids = {other_id for users in pool.values() for other_id in users}
+    leaves = defaultdict(list)
+    for leave in overlapping_leaves(
+        db, min(shift.startTime for shift in shifts), max(shift.endTime for shift in shifts),
+        approved=None if include_pending else True, user_ids=user_ids, exclude_id=leave_id,
+    ):
+        if leave.approvedStatus or leave.radiologistID != user_id:
+            leaves[leave.radiologistID].append(leave)
+    locations = {row.id: row for row in db.query(Location.id, Location.name, Location.minStaffCount)
+                 .filter(Location.id.in_(list(pool)))}
+
+    for shift in shifts:
+        if _off(leaves[user_id], shift.startTime, shift.endTime):
+            continue  # already off: this leave changes nothing
+        result["shifts"] += 1
+        specialization = shift.specializationRequired.strip().lower()
+        available = sum(
+            1 for other_id, specializations in pool[shift.location].items()
+            if specialization in specializations and not _off(leaves[other_id], shift.startTime, shift.endTime)
+        )
+        location = locations.get(shift.location)
+        minimum = (location.minStaffCount if location else 0) or 0
+        if available - 1 < minimum:
+            result["shortfalls"].append({
+                "shiftId": shift.id,
+                "location": shift.location,
+                "locationName": location.name if location else "",
+                "startTime": shift.startTime,
+                "endTime": shift.endTime,
+                "specializationRequired": shift.specializationRequired,
+                "minStaffCount": minimum,
+                "available": available,
+                "availableWithLeave": available - 1,
+            })
+    return result
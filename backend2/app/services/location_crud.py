@@ -1,34 +1,22 @@
 from sqlalchemy.orm import Session
 from app.models.location import Location
 from app.schemas.location import LocationCreate, LocationUpdate
+from app.services.crud import CRUDBase
 from typing import List, Optional
 
+locations = CRUDBase(Location)
+
 def get_location(db: Session, location_id: int) -> Optional[Location]:
-    return db.query(Location).filter(Location.id == location_id).first()
+    return locations.get(db, location_id)
 
 def get_locations(db: Session, skip: int = 0, limit: int = 100) -> List[Location]:
-    return db.query(Location).offset(skip).limit(limit).all()
+    return locations.get_multi(db, skip=skip, limit=limit)
 
 def create_location(db: Session, location: LocationCreate) -> Location:
-    db_location = Location(**location.dict())
-    db.add(db_location)
-    db.commit()
-    db.refresh(db_location)
-    return db_location
+    return locations.create(db, location)
 
 def update_location(db: Session, location_id: int, location: LocationUpdate) -> Optional[Location]:
-    db_location = get_location(db, location_id)
-    if db_location:
-        for key, value in location.dict(exclude_unset=True).items():
-            setattr(db_location, key, value)
-        db.commit()
-        db.refresh(db_location)
-    return db_location
+    return locations.update(db, location_id, location)
 
 def delete_location(db: Session, location_id: int) -> bool:
-    db_location = get_location(db, location_id)
-    if db_location:
-        db.delete(db_location)
-        db.commit()
-        return True
-    return False 
\ No newline at end of file
+    return locations.delete(db, location_id)
@@ -1,34 +1,22 @@
 from sqlalchemy.orm import Session
 from app.models.shift import Shift
 from app.schemas.shift import ShiftCreate, ShiftUpdate
+from app.services.crud import CRUDBase
 from typing import List, Optional
 
+shifts = CRUDBase(Shift)
+
 def get_shift(db: Session, shift_id: int) -> Optional[Shift]:
-    return db.query(Shift).filter(Shift.id == shift_id).first()
+    return shifts.get(db, shift_id)
 
 def get_shifts(db: Session, skip: int = 0, limit: int = 100) -> List[Shift]:
-    return db.query(Shift).offset(skip).limit(limit).all()
+    return shifts.get_multi(db, skip=skip, limit=limit)
 
 def create_shift(db: Session, shift: ShiftCreate) -> Shift:
-    db_shift = Shift(**shift.dict())
-    db.add(db_shift)
-    db.commit()
-    db.refresh(db_shift)
-    return db_shift
+    return shifts.create(db, shift)
 
 def update_shift(db: Session, shift_id: int, shift: ShiftUpdate) -> Optional[Shift]:
-    db_shift = get_shift(db, shift_id)
-    if db_shift:
-        for key, value in shift.dict(exclude_unset=True).items():
-            setattr(db_shift, key, value)
-        db.commit()
-        db.refresh(db_shift)
-    return db_shift
+    return shifts.update(db, shift_id, shift)
 
 def delete_shift(db: Session, shift_id: int) -> bool:
-    db_shift = get_shift(db, shift_id)
-    if db_shift:
-        db.delete(db_shift)
-        db.commit()
-        return True
-    return False 
\ No newline at end of file
+    return shifts.delete(db, shift_id)
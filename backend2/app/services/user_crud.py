@@ -1,34 +1,22 @@
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
+from app.services.crud import CRUDBase
 from typing import List, Optional
 
+users = CRUDBase(User)
+
 def get_user(db: Session, user_id: int) -> Optional[User]:
-    return db.query(User).filter(User.id == user_id).first()
+    return users.get(db, user_id)
 
 def get_users(db: Session, skip: int = 0, limit: int = 100) -> List[User]:
-    return db.query(User).offset(skip).limit(limit).all()
+    return users.get_multi(db, skip=skip, limit=limit)
 
 def create_user(db: Session, user: UserCreate) -> User:
-    db_user = User(**user.dict())
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
-    return db_user
+    return users.create(db, user)
 
 def update_user(db: Session, user_id: int, user: UserUpdate) -> Optional[User]:
-    db_user = get_user(db, user_id)
-    if db_user:
-        for key, value in user.dict(exclude_unset=True).items():
-            setattr(db_user, key, value)
-        db.commit()
-        db.refresh(db_user)
-    return db_user
+    return users.update(db, user_id, user)
 
 def delete_user(db: Session, user_id: int) -> bool:
-    db_user = get_user(db, user_id)
-    if db_user:
-        db.delete(db_user)
-        db.commit()
-        return True
-    return False 
\ No newline at end of file
+    return users.delete(db, user_id)
@@ -0,0 +1,5 @@
+"""
+Benchmark harness for the Roster Monster backends.
+
+See benchmarks/README.md for usage.
+"""
@@ -0,0 +1,140 @@
+"""
+Synthetic dictation benchmark for the WebSocket audio pipeline.
+
+    python -m benchmarks.audio --clients 200 --seconds 20 --frame-ms 100 \
+        --transcribe-ms 40 --workers 4 --output results/audio.json
+
+Runs in-process against backend/app/routers/websocket_client.py: each
+simulated client streams a sine tone as 16-bit PCM frames at real-time pace
+(or faster with --speed), and a fake transcriber sleeps for --transcribe-ms
+per chunk. Reports end-to-end chunk latency and the memory held per client.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import List
+
+from .run import _git_commit, percentile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+
+
+def sine_pcm(seconds: float, sampling_rate: int = 16000, frequency: float = 440.0) -> bytes:
+    samples = int(seconds * sampling_rate)
+    return b"".join(
+        int(12000 * math.sin(2 * math.pi * frequency * i / sampling_rate)).to_bytes(2, "little", signed=True)
+        for i in range(samples)
+    )
+
+
+async def stream_client(client, pipeline, audio: bytes, frame_bytes: int, frame_interval: float):
+    for start in range(0, len(audio), frame_bytes):
+        began = time.perf_counter()
+        await client.feed(audio[start:start + frame_bytes], pipeline)
+        await asyncio.sleep(max(0.0, frame_interval - (time.perf_counter() - began)))
+
+
+async def run(args) -> dict:
+    sys.path.insert(0, BACKEND_DIR)
+    from app.routers.websocket_client import AudioPipeline, Client
+
+    async def transcribe(chunk):
+        await asyncio.sleep(args.transcribe_ms / 1000)
+        return "lorem ipsum"
+
+    latencies: List[float] = []
+    delivered = 0
+
+    def on_result(chunk, text):
+        nonlocal delivered
+        delivered += 1
+        latencies.append(time.perf_counter() - chunk.received_at)
+
+    # One second of tone, repeated, keeps generation out of the measurement
+    tone = sine_pcm(1.0)
+    audio = tone * int(args.seconds)
+    frame_bytes = int(16000 * 2 * args.frame_ms / 1000)
+    frame_interval = args.frame_ms / 1000 / args.speed
+
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    pipeline = AudioPipeline(transcribe, workers=args.workers, max_queue=args.queue)
+    clients = []
+    for i in range(args.clients):
+        client = Client(f"bench-{i}", max_pending_chunks=args.max_pending)
+        client.update_config({"processing_args": {"chunk_length_seconds": args.chunk_seconds,
+                                                  "chunk_offset_seconds": args.offset_seconds}})
+        client.on_result = on_result
+        clients.append(client)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(stream_client(c, pipeline, audio, frame_bytes, frame_interval) for c in clients))
+    await pipeline.join()
+    elapsed = time.perf_counter() - started
+    current, peak = tracemalloc.get_traced_memory()
+    retained = sum(stat.size_diff for stat in tracemalloc.take_snapshot().compare_to(baseline, "filename"))
+    tracemalloc.stop()
+    await pipeline.stop()
+
+    ordered = sorted(latencies)
+    return {
+        "clients": args.clients,
+        "audio_seconds_per_client": args.seconds,
+        "duration_s": round(elapsed, 3),
+        "chunks": delivered,
+        "chunk_latency_ms": {
+            "p50": round(percentile(ordered, 50) * 1000, 3),
+            "p95": round(percentile(ordered, 95) * 1000, 3),
+            "p99": round(percentile(ordered, 99) * 1000, 3),
+            "max": round(ordered[-1] * 1000, 3) if ordered else 0.0,
+        },
+        "memory_per_client_kb": round(retained / args.clients / 1024, 2),
+        "peak_memory_mb": round(peak / 1024 / 1024, 2),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the WebSocket audio pipeline with synthetic clients")
+    parser.add_argument("--clients", type=int, default=100)
+    parser.add_argument("--seconds", type=float, default=20, help="audio streamed per client")
+    parser.add_argument("--frame-ms", type=int, default=100, help="audio per WebSocket message")
+    parser.add_argument("--speed", type=float, default=1.0, help="stream faster than real time")
+    parser.add_argument("--chunk-seconds", type=float, default=5)
+    parser.add_argument("--offset-seconds", type=float, default=0.1)
+    parser.add_argument("--transcribe-ms", type=float, default=40, help="simulated model time per chunk")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--queue", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=2, help="chunks in flight per client")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    result = asyncio.run(run(args))
+    latency = result["chunk_latency_ms"]
+    print(f"{result['clients']} clients, {result['chunks']} chunks in {result['duration_s']:.1f}s  "
+          f"latency p50 {latency['p50']:.1f}ms p95 {latency['p95']:.1f}ms p99 {latency['p99']:.1f}ms  "
+          f"{result['memory_per_client_kb']:.1f} KiB/client")
+
+    if args.output:
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "args": vars(args),
+            },
+            "audio": result,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
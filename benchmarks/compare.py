@@ -0,0 +1,74 @@
+"""
+Compare two benchmark result files and flag regressions.
+
+    python -m benchmarks.compare baseline.json candidate.json --threshold 10
+
+Prints a Markdown table and exits with status 1 when any workload's p95
+latency grows, or its throughput drops, by more than the threshold percent.
+"""
+import argparse
+import json
+import sys
+from typing import List, Tuple
+
+
+def _change(before: float, after: float) -> float:
+    if not before:
+        return 0.0
+    return (after - before) / before * 100
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> Tuple[List[str], List[str]]:
+    lines = [
+        f"Baseline {baseline['meta'].get('commit')} vs candidate {candidate['meta'].get('commit')}",
+        "",
+        "| workload | rps | Δ rps | p50 ms | p95 ms | Δ p95 | p99 ms | errors |",
+        "|---|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    regressions = []
+    for name, after in candidate["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            lines.append(f"| {name} | {after['throughput_rps']:.1f} | new | {after['latency_ms']['p50']:.1f} | "
+                         f"{after['latency_ms']['p95']:.1f} | new | {after['latency_ms']['p99']:.1f} | "
+                         f"{after['errors']} |")
+            continue
+        rps_change = _change(before["throughput_rps"], after["throughput_rps"])
+        p95_change = _change(before["latency_ms"]["p95"], after["latency_ms"]["p95"])
+        lines.append(
+            f"| {name} | {after['throughput_rps']:.1f} | {rps_change:+.1f}% | {after['latency_ms']['p50']:.1f} | "
+            f"{after['latency_ms']['p95']:.1f} | {p95_change:+.1f}% | {after['latency_ms']['p99']:.1f} | "
+            f"{after['errors']} |"
+        )
+        if p95_change > threshold:
+            regressions.append(f"{name}: p95 {p95_change:+.1f}%")
+        if rps_change < -threshold:
+            regressions.append(f"{name}: throughput {rps_change:+.1f}%")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {after['errors']}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files")
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0, help="allowed change in percent")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.candidate) as f:
+        candidate = json.load(f)
+
+    lines, regressions = compare(baseline, candidate, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print("\nRegressions:")
+        for regression in regressions:
+            print(f"- {regression}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,176 @@
+"""
+Latency, throughput and accuracy of the report extraction models.
+
+    python -m benchmarks.extraction --models regex deepseek-vl2-int8 \
+        --batch-sizes 1 4 --repeat 3 --output results/extraction.json
+
+Runs each model from backend/app/infer.py in-process over labelled cases
+(benchmarks/fixtures/extraction_cases.json by default). A case has a
+report_type, report text and/or an image path, and the expected measurements.
+Models that need an image skip cases without one. Accuracy is scored on
+(value, unit) pairs, since labels differ between models.
+
+The summary suggests, per report type, the fastest model that reaches
+--min-accuracy, in the form INFERENCE_MODELS_BY_REPORT_TYPE expects.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from .run import _git_commit, percentile
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+DEFAULT_CASES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "extraction_cases.json")
+
+
+def _key(measurement) -> tuple:
+    value = measurement.get("value")
+    values = value if isinstance(value, list) else [value]
+    try:
+        values = tuple(round(float(v), 2) for v in values)
+    except (TypeError, ValueError):
+        values = tuple(str(v) for v in values)
+    return values, (measurement.get("unit") or "").lower()
+
+
+def score(expected: List[dict], found: List[dict]) -> Dict[str, int]:
+    expected_keys = Counter(_key(m) for m in expected)
+    found_keys = Counter(_key(m) for m in found)
+    matched = sum((expected_keys & found_keys).values())
+    return {"expected": len(expected), "found": len(found), "matched": matched}
+
+
+def load_cases(path: str) -> List[dict]:
+    with open(path) as f:
+        cases = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    for case in cases:
+        if case.get("image"):
+            with open(os.path.join(base, case["image"]), "rb") as image:
+                case["image_bytes"] = image.read()
+    return cases
+
+
+def bench_model(name: str, cases: List[dict], batch_sizes: List[int], repeat: int, settings) -> dict:
+    from app.infer import ExtractionRequest, create_model, parse_measurements
+
+    model = create_model(settings, name)
+    usable = [c for c in cases if c.get("image_bytes") or not model.needs_image]
+    if not usable:
+        return {"model": name, "skipped": "no cases with images"}
+
+    started = time.perf_counter()
+    model.load()
+    load_s = time.perf_counter() - started
+
+    runs = {}
+    outputs: List[str] = []
+    for batch_size in batch_sizes:
+        latencies: List[float] = []
+        elapsed = 0.0
+        for _ in range(repeat):
+            outputs = []
+            for start in range(0, len(usable), batch_size):
+                batch = usable[start:start + batch_size]
+                requests = [ExtractionRequest(image=c.get("image_bytes"), text=c.get("text")) for c in batch]
+                began = time.perf_counter()
+                outputs.extend(model.generate(requests))
+                took = time.perf_counter() - began
+                elapsed += took
+                # every request in a batch waits for the whole batch
+                latencies.extend([took] * len(batch))
+        ordered = sorted(latencies)
+        runs[str(batch_size)] = {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(ordered, 50) * 1000, 3),
+                "p95": round(percentile(ordered, 95) * 1000, 3),
+                "max": round(ordered[-1] * 1000, 3),
+            },
+        }
+
+    by_type: Dict[str, Counter] = defaultdict(Counter)
+    for case, output in zip(usable, outputs):
+        by_type[case["report_type"]].update(score(case["expected"], parse_measurements(output)))
+    accuracy = {}
+    for report_type, totals in sorted(by_type.items()):
+        recall = totals["matched"] / totals["expected"] if totals["expected"] else 1.0
+        precision = totals["matched"] / totals["found"] if totals["found"] else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+        accuracy[report_type] = {"recall": round(recall, 3), "precision": round(precision, 3), "f1": round(f1, 3)}
+
+    return {"model": name, "cases": len(usable), "load_s": round(load_s, 3), "runs": runs, "accuracy": accuracy}
+
+
+def recommend(results: List[dict], min_accuracy: float) -> Dict[str, str]:
+    """Fastest model (by single-request p50) per report type with f1 >= min_accuracy."""
+    choice: Dict[str, tuple] = {}
+    for result in results:
+        if "runs" not in result:
+            continue
+        p50 = min(run["latency_ms"]["p50"] for run in result["runs"].values())
+        for report_type, accuracy in result["accuracy"].items():
+            if accuracy["f1"] >= min_accuracy and (report_type not in choice or p50 < choice[report_type][0]):
+                choice[report_type] = (p50, result["model"])
+    return {report_type: model for report_type, (_, model) in sorted(choice.items())}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the report extraction models")
+    parser.add_argument("--models", nargs="+", default=["regex"])
+    parser.add_argument("--cases", default=DEFAULT_CASES)
+    parser.add_argument("--batch-sizes", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--device", default="auto", help="device for the VL model (auto, cpu or cuda)")
+    parser.add_argument("--min-accuracy", type=float, default=0.9, help="f1 a model needs to be recommended")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, BACKEND_DIR)
+    os.environ.setdefault("OPENAI_API_KEY", "")
+    from app.config.config import settings
+
+    settings.inference_device = args.device
+    cases = load_cases(args.cases)
+    results = []
+    for name in args.models:
+        result = bench_model(name, cases, args.batch_sizes, args.repeat, settings)
+        results.append(result)
+        if "skipped" in result:
+            print(f"{name}: skipped, {result['skipped']}")
+            continue
+        for batch_size, run in result["runs"].items():
+            print(f"{name} batch {batch_size}: {run['throughput_rps']:.1f} req/s  "
+                  f"p50 {run['latency_ms']['p50']:.1f}ms p95 {run['latency_ms']['p95']:.1f}ms")
+        for report_type, accuracy in result["accuracy"].items():
+            print(f"  {report_type}: f1 {accuracy['f1']:.2f} (recall {accuracy['recall']:.2f}, "
+                  f"precision {accuracy['precision']:.2f})")
+
+    suggestion = recommend(results, args.min_accuracy)
+    print(f"INFERENCE_MODELS_BY_REPORT_TYPE='{json.dumps(suggestion)}'")
+
+    if args.output:
+        report = {
+            "meta": {
+                "commit": _git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "args": vars(args),
+            },
+            "extraction": results,
+            "recommended": suggestion,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
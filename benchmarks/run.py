@@ -0,0 +1,183 @@
+"""
+Run benchmark workloads against a running server and write JSON results.
+
+    python -m benchmarks.run --base-url http://localhost:8000 \
+        --manifest benchmark_manifest.json --requests 500 --concurrency 10 \
+        --output results/backend-$(git rev-parse --short HEAD).json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+import httpx
+
+from .workloads import WORKLOADS, Context, Workload, login_request
+
+
+class BaselineError(RuntimeError):
+    """A workload's first request did not succeed, so its timings would measure an error path."""
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Linear-interpolated percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = (len(sorted_values) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (rank - low)
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float, status_codes: Dict[int, int]) -> dict:
+    ordered = sorted(latencies)
+    to_ms = 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": {str(code): count for code, count in sorted(status_codes.items())},
+        "duration_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "mean": round(statistics.fmean(ordered) * to_ms, 3) if ordered else 0.0,
+            "p50": round(percentile(ordered, 50) * to_ms, 3),
+            "p95": round(percentile(ordered, 95) * to_ms, 3),
+            "p99": round(percentile(ordered, 99) * to_ms, 3),
+            "max": round(ordered[-1] * to_ms, 3) if ordered else 0.0,
+        },
+    }
+
+
+async def login(client: httpx.AsyncClient, backend: str, email: str, password: str):
+    response = await _send(client, login_request(backend, email, password))
+    if response.status_code != 200:
+        return None
+    return response.json().get("access_token")
+
+
+async def run_workload(client: httpx.AsyncClient, workload: Workload, ctx: Context,
+                       requests: int, concurrency: int, warmup: int) -> dict:
+    baseline = workload.build(ctx)
+    try:
+        status = (await _send(client, baseline)).status_code
+    except httpx.HTTPError as exc:
+        raise BaselineError(f"{workload.name}: {baseline.method} {baseline.path} failed: {exc}") from exc
+    if not 200 <= status < 300:
+        raise BaselineError(f"{workload.name}: {baseline.method} {baseline.path} returned {status}")
+    for _ in range(warmup):
+        await _send(client, workload.build(ctx))
+
+    latencies: List[float] = []
+    status_codes: Dict[int, int] = {}
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            request = workload.build(ctx)
+            start = time.perf_counter()
+            try:
+                response = await _send(client, request)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            latencies.append(time.perf_counter() - start)
+            status_codes[status] = status_codes.get(status, 0) + 1
+            if not 200 <= status < 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started, status_codes)
+
+
+async def _send(client: httpx.AsyncClient, request) -> httpx.Response:
+    headers = {"Authorization": f"Bearer {request.token}"} if request.token else None
+    return await client.request(request.method, request.path, params=request.params,
+                                json=request.json, data=request.data, headers=headers)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run(args) -> dict:
+    with open(args.manifest) as f:
+        manifest = json.load(f)
+    backend = manifest["backend"]
+    names = args.workloads or list(WORKLOADS[backend])
+    ctx = Context(manifest=manifest, rng=random.Random(args.seed))
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=args.timeout) as client:
+        ctx.admin_token = await login(client, backend, manifest["admin_email"], manifest["password"])
+        for email in manifest["staff_emails"][:args.staff_logins]:
+            token = await login(client, backend, email, manifest["password"])
+            if token:
+                ctx.staff_tokens[email] = token
+
+        results = {}
+        for name in names:
+            results[name] = await run_workload(client, WORKLOADS[backend][name], ctx,
+                                               args.requests, args.concurrency, args.warmup)
+            print(f"{name:<20} {results[name]['throughput_rps']:>9.1f} req/s  "
+                  f"p50 {results[name]['latency_ms']['p50']:.1f}ms  "
+                  f"p95 {results[name]['latency_ms']['p95']:.1f}ms  "
+                  f"p99 {results[name]['latency_ms']['p99']:.1f}ms  "
+                  f"errors {results[name]['errors']}")
+
+    return {
+        "meta": {
+            "backend": backend,
+            "base_url": args.base_url,
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "dataset": manifest["counts"],
+        },
+        "results": results,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run backend benchmark workloads")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--manifest", default="benchmark_manifest.json")
+    parser.add_argument("--workloads", nargs="*", help="subset of workloads to run (default: all)")
+    parser.add_argument("--requests", type=int, default=500, help="requests per workload")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--staff-logins", type=int, default=5,
+                        help="staff users to log in for per-user endpoints")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args(argv)
+
+    try:
+        report = asyncio.run(run(args))
+    except BaselineError as exc:
+        print(f"Baseline request failed, no results written: {exc}")
+        sys.exit(1)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,335 @@
+"""
+Deterministic data seeder for benchmarks.
+
+Writes N staff, M locations and K weeks of assignments and leave into an
+existing database using reflected tables, so it works against any schema
+produced by the backend's migrations. With ``--create-schema`` the tables are
+created from the backend's own models first (useful for SQLite).
+
+    python -m benchmarks.seed --backend backend --database-url sqlite:///bench.db \
+        --create-schema --staff 200 --locations 20 --weeks 12
+"""
+import argparse
+import importlib
+import json
+import os
+import random
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from sqlalchemy import DefaultClause, MetaData, create_engine, insert, text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BENCHMARK_PASSWORD = "benchmark-password"
+ADMIN_EMAIL = "bench-admin@example.com"
+BATCH_SIZE = 1000
+
+ROLE_NAMES = ["Consultant", "Registrar", "Resident", "Fellow"]
+GROUP_NAMES = ["Neuro", "Body", "MSK", "Breast", "Paeds"]
+
+
+def staff_email(index: int) -> str:
+    return f"bench-staff-{index}@example.com"
+
+
+def _password_hash() -> str:
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto").hash(BENCHMARK_PASSWORD)
+
+
+def _load_backend_metadata(backend: str):
+    """Import the backend's declarative metadata (the app package must be importable)."""
+    sys.path.insert(0, os.path.join(ROOT, backend))
+    if backend == "backend2":
+        return importlib.import_module("app.models").Base.metadata
+    # backend/app/models.py is shadowed by the app/models/ package; app.roster_models loads it by path.
+    return importlib.import_module("app.roster_models").Base.metadata
+
+
+def _make_sqlite_compatible(metadata) -> None:
+    # MySQL-style now() defaults are not valid DDL on SQLite.
+    for table in metadata.tables.values():
+        for column in table.columns:
+            default = column.server_default
+            if default is not None and str(getattr(default, "arg", "")).strip().lower() == "now()":
+                column.server_default = DefaultClause(text("CURRENT_TIMESTAMP"))
+
+
+def create_schema(engine, backend: str) -> None:
+    metadata = _load_backend_metadata(backend)
+    if engine.dialect.name == "sqlite":
+        _make_sqlite_compatible(metadata)
+    metadata.create_all(bind=engine)
+
+
+def _insert(conn, table, rows: List[dict]) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+def _ids(conn, table) -> List[int]:
+    return [row[0] for row in conn.execute(table.select().with_only_columns(table.c.id).order_by(table.c.id))]
+
+
+def _weekdays(start: datetime, weeks: int):
+    for offset in range(weeks * 7):
+        day = start + timedelta(days=offset)
+        if day.weekday() < 5:
+            yield day
+
+
+def seed_backend(conn, tables: Dict, rng: random.Random, staff: int, locations: int,
+                 weeks: int, start: datetime) -> dict:
+    now = datetime.utcnow()
+    stamps = {"date_created": now, "date_modified": now, "active": True}
+    password = _password_hash()
+
+    _insert(conn, tables["roles"], [{"name": name, **stamps} for name in ROLE_NAMES])
+    _insert(conn, tables["staff_groups"], [{"name": name, **stamps} for name in GROUP_NAMES])
+    role_ids = _ids(conn, tables["roles"])
+    group_ids = _ids(conn, tables["staff_groups"])
+
+    users = [{"email": ADMIN_EMAIL, "password": password, "institution_id": "bench", "role": "admin", **stamps}]
+    users += [
+        {"email": staff_email(i), "password": password, "institution_id": "bench", "role": "staff", **stamps}
+        for i in range(staff)
+    ]
+    _insert(conn, tables["users"], users)
+    user_ids = _ids(conn, tables["users"])[-staff:]
+
+    _insert(conn, tables["staff"], [
+        {
+            "user_id": user_id,
+            "role_id": rng.choice(role_ids),
+            "group_id": rng.choice(group_ids),
+            "fte_clinical": 0.8,
+            "fte_research": 0.1,
+            "fte_admin": 0.1,
+            **stamps,
+        }
+        for user_id in user_ids
+    ])
+    staff_ids = _ids(conn, tables["staff"])[-staff:]
+
+    location_types = ["CLINICAL", "CLINICAL", "CLINICAL", "RESEARCH", "ADMIN"]
+    _insert(conn, tables["locations"], [
+        {
+            "name": f"Bench Location {i}",
+            "location_type": location_types[i % len(location_types)],
+            "priority": rng.randint(0, 5),
+            "min_staff_required": rng.randint(1, 3),
+            "fte_points": 0.1,
+            "allows_double_station": i % 4 == 0,
+            **stamps,
+        }
+        for i in range(locations)
+    ])
+    location_ids = _ids(conn, tables["locations"])[-locations:]
+
+    _insert(conn, tables["location_time_slots"], [
+        {"location_id": location_id, "start_time": start_time, "end_time": end_time,
+         "days_of_week": "1,2,3,4,5", **stamps}
+        for location_id in location_ids
+        for start_time, end_time in (("08:00", "13:00"), ("13:00", "18:00"))
+    ])
+    slot_rows = conn.execute(
+        tables["location_time_slots"].select().with_only_columns(
+            tables["location_time_slots"].c.id, tables["location_time_slots"].c.location_id
+        )
+    ).all()
+
+    assignments = []
+    for day in _weekdays(start, weeks):
+        available = staff_ids[:]
+        rng.shuffle(available)
+        for slot_id, location_id in slot_rows:
+            if not available:
+                break
+            assignments.append({
+                "staff_id": available.pop(),
+                "location_id": location_id,
+                "time_slot_id": slot_id,
+                "date": day,
+                "is_double_stationed": False,
+                "fte_contribution": 0.1,
+                **stamps,
+            })
+    _insert(conn, tables["roster_assignments"], assignments)
+
+    leave_types = ["FORECAST", "NON_URGENT", "URGENT"]
+    statuses = ["pending", "approved", "rejected"]
+    leaves = []
+    for staff_id in staff_ids:
+        for _ in range(max(1, weeks // 4)):
+            leave_start = start + timedelta(days=rng.randrange(weeks * 7))
+            leaves.append({
+                "staff_id": staff_id,
+                "leave_type": rng.choice(leave_types),
+                "start_date": leave_start,
+                "end_date": leave_start + timedelta(days=rng.randint(1, 5)),
+                "status": rng.choice(statuses),
+                **stamps,
+            })
+    _insert(conn, tables["leave_requests"], leaves)
+
+    availability = 0
+    if "staff_availability" in tables:
+        rows = [
+            {"staff_id": staff_id, "date": day, "shift_type": shift_type,
+             "is_available": rng.random() > 0.2, **stamps}
+            for staff_id in staff_ids
+            for day in _weekdays(start, weeks)
+            for shift_type in ("morning", "afternoon")
+        ]
+        _insert(conn, tables["staff_availability"], rows)
+        availability = len(rows)
+
+    return {
+        "staff_ids": staff_ids,
+        "location_ids": location_ids,
+        "staff_emails": [staff_email(i) for i in range(staff)],
+        "counts": {
+            "staff": len(staff_ids),
+            "locations": len(location_ids),
+            "roster_assignments": len(assignments),
+            "leave_requests": len(leaves),
+            "staff_availability": availability,
+        },
+    }
+
+
+def seed_backend2(conn, tables: Dict, rng: random.Random, staff: int, locations: int,
+                  weeks: int, start: datetime) -> dict:
+    now = datetime.utcnow()
+    password = _password_hash()
+
+    users = [{"name": "Bench Admin", "email": ADMIN_EMAIL, "password": password,
+              "userType": "ADMIN", "createDate": now, "lastActivateTime": now}]
+    users += [
+        {"name": f"Bench Staff {i}", "email": staff_email(i), "password": password,
+         "userType": "RADIOLOGIST", "createDate": now, "lastActivateTime": now}
+        for i in range(staff)
+    ]
+    _insert(conn, tables["users"], users)
+    user_ids = _ids(conn, tables["users"])[-staff:]
+
+    _insert(conn, tables["roles"], [{"name": name, "createDate": now} for name in ROLE_NAMES])
+    _insert(conn, tables["staff_groups"], [{"name": name, "createDate": now} for name in GROUP_NAMES])
+    role_ids = _ids(conn, tables["roles"])
+    group_ids = _ids(conn, tables["staff_groups"])
+
+    _insert(conn, tables["staff"], [
+        {"name": f"Bench Staff {i}", "email": staff_email(i), "group_id": rng.choice(group_ids),
+         "points_monthly": 0, "points_total": 0, "createDate": now}
+        for i in range(staff)
+    ])
+    staff_ids = _ids(conn, tables["staff"])[-staff:]
+    _insert(conn, tables["staff_roles"], [
+        {"staff_id": staff_id, "role_id": rng.choice(role_ids)} for staff_id in staff_ids
+    ])
+
+    _insert(conn, tables["locations"], [
+        {
+            "name": f"Bench Location {i}",
+            "department": "Radiology",
+            "type": "clinical",
+            "requiredUsers": [],
+            "requiredRoles": [],
+            "requiredGroups": [],
+            "minStaffCount": rng.randint(1, 3),
+            "priority": rng.randint(1, 5),
+            "sessions": [],
+            "dateOverrides": [],
+            "createDate": now,
+        }
+        for i in range(locations)
+    ])
+    location_ids = _ids(conn, tables["locations"])[-locations:]
+
+    shifts = [
+        {"startTime": day.replace(hour=hour), "endTime": day.replace(hour=hour + 5),
+         "location": location_id, "specializationRequired": "General", "createDate": now}
+        for day in _weekdays(start, weeks)
+        for location_id in location_ids
+        for hour in (8, 13)
+    ]
+    _insert(conn, tables["shifts"], shifts)
+
+    leaves = []
+    for user_id in user_ids:
+        for _ in range(max(1, weeks // 4)):
+            leave_start = start + timedelta(days=rng.randrange(weeks * 7))
+            leaves.append({
+                "radiologistID": user_id,
+                "startTime": leave_start,
+                "endTime": leave_start + timedelta(days=rng.randint(1, 5)),
+                "approvedStatus": rng.random() > 0.5,
+                "createDate": now,
+            })
+    _insert(conn, tables["leaves"], leaves)
+
+    return {
+        "staff_ids": staff_ids,
+        "location_ids": location_ids,
+        "staff_emails": [staff_email(i) for i in range(staff)],
+        "counts": {
+            "staff": len(staff_ids),
+            "locations": len(location_ids),
+            "shifts": len(shifts),
+            "leaves": len(leaves),
+        },
+    }
+
+
+SEEDERS = {"backend": seed_backend, "backend2": seed_backend2}
+
+
+def seed(database_url: str, backend: str, staff: int = 100, locations: int = 10, weeks: int = 8,
+         random_seed: int = 42, create: bool = False, start: datetime = None) -> dict:
+    """Seed the database and return the ids/credentials the workloads need."""
+    engine = create_engine(database_url)
+    if create:
+        create_schema(engine, backend)
+    metadata = MetaData()
+    metadata.reflect(bind=engine)
+    start = start or datetime(2025, 1, 6)  # a Monday, so runs are reproducible
+    rng = random.Random(random_seed)
+    with engine.begin() as conn:
+        manifest = SEEDERS[backend](conn, metadata.tables, rng, staff, locations, weeks, start)
+    engine.dispose()
+    manifest.update({
+        "backend": backend,
+        "admin_email": ADMIN_EMAIL,
+        "password": BENCHMARK_PASSWORD,
+        "start_date": start.isoformat(),
+        "weeks": weeks,
+        "random_seed": random_seed,
+    })
+    return manifest
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Seed a database for benchmarking")
+    parser.add_argument("--backend", choices=sorted(SEEDERS), default="backend")
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL", "sqlite:///./benchmark.db"))
+    parser.add_argument("--staff", type=int, default=100)
+    parser.add_argument("--locations", type=int, default=10)
+    parser.add_argument("--weeks", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--create-schema", action="store_true")
+    parser.add_argument("--manifest", default="benchmark_manifest.json",
+                        help="where to write the ids and credentials used by the workloads")
+    args = parser.parse_args(argv)
+
+    manifest = seed(args.database_url, args.backend, args.staff, args.locations, args.weeks,
+                    args.seed, args.create_schema)
+    with open(args.manifest, "w") as f:
+        json.dump(manifest, f, indent=2)
+    print(json.dumps(manifest["counts"]))
+
+
+if __name__ == "__main__":
+    main()
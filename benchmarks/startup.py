@@ -0,0 +1,114 @@
+"""
+Measure application startup time in fresh interpreters.
+
+    python -m benchmarks.startup --app-dir backend2 --runs 10 \
+        --env DB_CREATE_ALL=false --output results/startup-backend2.json
+
+Each run imports app.main in a new process and then drives the ASGI lifespan
+startup and shutdown, so import cost, create_all and startup hooks are timed
+the way a freshly forked worker would see them.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from .run import _git_commit, percentile
+
+PROBE = r"""
+import asyncio, json, sys, time
+started = time.perf_counter()
+modules_before = len(sys.modules)
+import app.main as main
+imported = time.perf_counter()
+
+async def lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        pass
+
+asyncio.run(lifespan())
+ready = time.perf_counter()
+print("__STARTUP__" + json.dumps({
+    "import_s": imported - started,
+    "lifespan_s": ready - imported,
+    "total_s": ready - started,
+    "modules": len(sys.modules) - modules_before,
+}))
+"""
+
+
+def probe(app_dir: str, env: Dict[str, str]) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE],
+        cwd=app_dir,
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"startup probe failed:\n{completed.stderr.strip()}")
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith("__STARTUP__"):
+            return json.loads(line[len("__STARTUP__"):])
+    raise RuntimeError("startup probe produced no timings")
+
+
+def summarize(samples: List[dict]) -> dict:
+    summary = {}
+    for key in ("import_s", "lifespan_s", "total_s"):
+        ordered = sorted(sample[key] * 1000 for sample in samples)
+        summary[key.replace("_s", "_ms")] = {
+            "min": round(ordered[0], 3),
+            "median": round(statistics.median(ordered), 3),
+            "p95": round(percentile(ordered, 95), 3),
+            "max": round(ordered[-1], 3),
+        }
+    summary["modules_imported"] = samples[-1]["modules"]
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold application startup time")
+    parser.add_argument("--app-dir", default="backend2", help="directory containing the app package")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--env", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="extra environment for the probe processes")
+    parser.add_argument("--output", default=None)
+    args = parser.parse_args(argv)
+
+    env = dict(item.split("=", 1) for item in args.env)
+    samples = []
+    for _ in range(args.runs):
+        samples.append(probe(args.app_dir, env))
+    summary = summarize(samples)
+
+    total = summary["total_ms"]
+    print(f"{args.app_dir}: import median {summary['import_ms']['median']:.1f}ms  "
+          f"lifespan median {summary['lifespan_ms']['median']:.1f}ms  "
+          f"total median {total['median']:.1f}ms  p95 {total['p95']:.1f}ms  "
+          f"({summary['modules_imported']} modules)")
+
+    if args.output:
+        report = {
+            "meta": {
+                "app_dir": args.app_dir,
+                "commit": _git_commit(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "runs": args.runs,
+                "env": env,
+            },
+            "startup": summary,
+        }
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Scripted request workloads for the hot endpoints of each backend.
+
+A workload builds one request at a time from the seed manifest; the runner
+drives it from several concurrent clients. backend's workloads hit the
+routers on the roster schema (app.roster_models), the tables benchmarks.seed
+fills; backend2 serves its API under /api/<resource>.
+"""
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    params: Optional[dict] = None
+    json: Optional[dict] = None
+    data: Optional[dict] = None
+    token: Optional[str] = None
+
+
+@dataclass
+class Workload:
+    name: str
+    build: Callable[["Context"], Request]
+    description: str = ""
+
+
+@dataclass
+class Context:
+    manifest: dict
+    rng: random.Random
+    admin_token: Optional[str] = None
+    staff_tokens: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def start(self) -> datetime:
+        return datetime.fromisoformat(self.manifest["start_date"])
+
+    def random_week(self):
+        week = self.rng.randrange(self.manifest["weeks"])
+        start = self.start + timedelta(weeks=week)
+        return start.isoformat(), (start + timedelta(days=6)).isoformat()
+
+    def random_staff_token(self) -> Optional[str]:
+        if not self.staff_tokens:
+            return self.admin_token
+        return self.staff_tokens[self.rng.choice(sorted(self.staff_tokens))]
+
+
+LOGIN_PATHS = {"backend": "/api/login/", "backend2": "/api/auth/login/"}
+
+
+def login_request(backend: str, email: str, password: str) -> Request:
+    return Request("POST", LOGIN_PATHS[backend], json={"username": email, "password": password})
+
+
+def _login(backend: str):
+    def build(ctx: Context) -> Request:
+        email = ctx.rng.choice(ctx.manifest["staff_emails"])
+        return login_request(backend, email, ctx.manifest["password"])
+    return build
+
+
+def _backend_health(ctx: Context) -> Request:
+    return Request("GET", "/health")
+
+
+def _roster_assignments(ctx: Context) -> Request:
+    start_date, end_date = ctx.random_week()
+    params = {"start_date": start_date, "end_date": end_date, "limit": 500}
+    if ctx.rng.random() < 0.5:
+        params["location_id"] = ctx.rng.choice(ctx.manifest["location_ids"])
+    return Request("GET", "/roster/assignments/", params=params)
+
+
+def _fte_contribution(ctx: Context) -> Request:
+    start_date, _ = ctx.random_week()
+    end_date = (datetime.fromisoformat(start_date) + timedelta(weeks=4)).isoformat()
+    staff_id = ctx.rng.choice(ctx.manifest["staff_ids"])
+    return Request("GET", f"/fte/contributions/{staff_id}",
+                   params={"start_date": start_date, "end_date": end_date})
+
+
+def _availability(ctx: Context) -> Request:
+    start_date, end_date = ctx.random_week()
+    return Request("GET", "/availability/", params={"start_date": start_date, "end_date": end_date},
+                   token=ctx.random_staff_token())
+
+
+def _backend_staff_list(ctx: Context) -> Request:
+    return Request("GET", "/api/staff/", token=ctx.admin_token)
+
+
+def _backend2_staff_list(ctx: Context) -> Request:
+    return Request("GET", "/api/staff/")
+
+
+def _backend2_shifts(ctx: Context) -> Request:
+    return Request("GET", "/api/shifts/", params={"skip": ctx.rng.randrange(0, 500), "limit": 100})
+
+
+def _backend2_fte_assignments(ctx: Context) -> Request:
+    staff_id = ctx.rng.choice(ctx.manifest["staff_ids"])
+    return Request("GET", "/api/fte/assignments", params={"staff_id": staff_id, "limit": 100})
+
+
+def _backend2_leaves(ctx: Context) -> Request:
+    return Request("GET", "/api/leaves/", params={"limit": 100})
+
+
+WORKLOADS: Dict[str, Dict[str, Workload]] = {
+    "backend": {
+        "login": Workload("login", _login("backend"), "password login (bcrypt bound)"),
+        "health": Workload("health", _backend_health, "health check, the framework floor"),
+        "roster_assignments": Workload("roster_assignments", _roster_assignments,
+                                       "one week of roster assignments, optionally per location"),
+        "fte_contribution": Workload("fte_contribution", _fte_contribution,
+                                     "four-week FTE contribution for one staff member"),
+        "availability": Workload("availability", _availability, "one week of a staff member's availability"),
+        "staff_list": Workload("staff_list", _backend_staff_list, "all active staff"),
+    },
+    "backend2": {
+        "login": Workload("login", _login("backend2"), "password login (bcrypt bound)"),
+        "shifts": Workload("shifts", _backend2_shifts, "a page of shifts"),
+        "fte_assignments": Workload("fte_assignments", _backend2_fte_assignments,
+                                    "FTE assignments for one staff member"),
+        "leaves": Workload("leaves", _backend2_leaves, "a page of leaves"),
+        "staff_list": Workload("staff_list", _backend2_staff_list, "all staff with roles and departments"),
+    },
+}
@@ -11,6 +11,9 @@ echo "MySQL is ready!"
 echo "Running database migrations..."
 alembic upgrade head
 
+# The schema is managed by Alembic, so skip create_all in the app
+export DB_CREATE_ALL=false
+
 # Start the application
 echo "Starting the application..."
 uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload 
\ No newline at end of file